@@ -84,8 +84,22 @@ EVENT = collections.namedtuple('EVENT', ['algref', 'moment'])
 # pages  : number of page faults serviced that required I/O     [ru_majflt]
 # sys    : total amount of time spent executing in kernel mode  [ru_stime]
 # user   : total amount of time spent executing in user mode    [ru_utime]
+# hits   : number of blobs decoded from memory                  [dawgie.db.util]
+# misses : number of blobs decoded from disk                    [dawgie.db.util]
 METRIC = collections.namedtuple(
-    'METRIC', ['input', 'mem', 'output', 'pages', 'sys', 'user', 'wall']
+    'METRIC',
+    [
+        'input',
+        'mem',
+        'output',
+        'pages',
+        'sys',
+        'user',
+        'wall',
+        'hits',
+        'misses',
+    ],
+    defaults=(0, 0),
 )
 # day : an instance of an object that describes a calendar date
 #       known working instances are:
@@ -237,15 +251,21 @@ class _Metric:
         )
 
     def measure(self, func, args=(), ds: 'Dataset' = None):
+        # pylint: disable=too-many-locals
+        blobs = importlib.import_module('dawgie.db.util')
+        b0 = blobs.stats()
         c0 = resource.getrusage(resource.RUSAGE_CHILDREN)
         s0 = resource.getrusage(resource.RUSAGE_SELF)
         t0 = datetime.datetime.now(datetime.UTC)
         value = func(*args)
         c1 = resource.getrusage(resource.RUSAGE_CHILDREN)
         s1 = resource.getrusage(resource.RUSAGE_SELF)
+        b1 = blobs.stats()
         child = _Metric.diff(c1, c0, 0)
         task = _Metric.diff(
             s1, s0, (datetime.datetime.now(datetime.UTC) - t0).total_seconds()
+        )._replace(
+            hits=b1['hits'] - b0['hits'], misses=b1['misses'] - b0['misses']
         )
         self.__history.append({'child': child, 'task': task})
 
@@ -270,6 +290,8 @@ class _Metric:
                 sys=s.sys + h['child'].sys + h['task'].sys,
                 user=s.user + h['child'].user + h['task'].user,
                 wall=s.wall + h['child'].wall + h['task'].wall,
+                hits=s.hits + h['child'].hits + h['task'].hits,
+                misses=s.misses + h['child'].misses + h['task'].misses,
             )
         return s
 
@@ -1052,12 +1074,20 @@ class StateVector(Version, dict):
 
     name() -> the unique name of the state vector
     view() -> use the visitee to convert the content to a nice view
+
+    The implementer may also override:
+
+    codec() -> the dawgie.db.util.codec name of the compression to store the
+               Values with or None for dawgie.context.data_dbs_codec
     '''
 
     # pylint: disable=unused-argument
     def clear(self):
         return
 
+    def codec(self) -> str:
+        return None
+
     def name(self) -> str:
         raise NotImplementedError()
 
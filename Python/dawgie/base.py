@@ -82,15 +82,21 @@ class _Metric:
         )
 
     def measure(self, func, args=(), ds: 'Dataset' = None):
+        # pylint: disable=too-many-locals
+        blobs = importlib.import_module('dawgie.db.util')
+        b0 = blobs.stats()
         c0 = resource.getrusage(resource.RUSAGE_CHILDREN)
         s0 = resource.getrusage(resource.RUSAGE_SELF)
         t0 = datetime.datetime.now(datetime.UTC)
         value = func(*args)
         c1 = resource.getrusage(resource.RUSAGE_CHILDREN)
         s1 = resource.getrusage(resource.RUSAGE_SELF)
+        b1 = blobs.stats()
         child = _Metric.diff(c1, c0, 0)
         task = _Metric.diff(
             s1, s0, (datetime.datetime.now(datetime.UTC) - t0).total_seconds()
+        )._replace(
+            hits=b1['hits'] - b0['hits'], misses=b1['misses'] - b0['misses']
         )
         self.__history.append({'child': child, 'task': task})
 
@@ -115,6 +121,8 @@ class _Metric:
                 sys=s.sys + h['child'].sys + h['task'].sys,
                 user=s.user + h['child'].user + h['task'].user,
                 wall=s.wall + h['child'].wall + h['task'].wall,
+                hits=s.hits + h['child'].hits + h['task'].hits,
+                misses=s.misses + h['child'].misses + h['task'].misses,
             )
         return s
 
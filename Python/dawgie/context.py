@@ -99,10 +99,17 @@ cloud_provider = CloudProvider.none
 cpu_threshold = int(os.environ.get('DAWGIE_CPU_THRESH', 30))
 
 data_dbs = os.environ.get('DAWGIE_DATA_DBSTOR', '/proj/data/dbs')
+data_dbs_cache = int(os.environ.get('DAWGIE_DATA_DBSTOR_CACHE', 2**28))
+data_dbs_codec = os.environ.get('DAWGIE_DATA_DBSTOR_CODEC', 'none')
+data_dbs_levels = int(os.environ.get('DAWGIE_DATA_DBSTOR_LEVELS', 0))
 data_log = os.environ.get('DAWGIE_DATA_LOGDIR', '/proj/data/logs')
 data_per = os.environ.get('DAWGIE_DATA_PERSONAL', '/proj/data/db')
 data_stg = os.environ.get('DAWGIE_DATA_STAGED', '/proj/data/stg')
 
+db_archive_incremental = int(os.environ.get('DAWGIE_DB_ARCHIVE_INCREMENTAL', 0))
+db_archive_jobs = int(os.environ.get('DAWGIE_DB_ARCHIVE_JOBS', 4))
+db_cache_size = int(os.environ.get('DAWGIE_DB_CACHE_SIZE', 250000))
+db_fetch_size = int(os.environ.get('DAWGIE_DB_FETCH_SIZE', 10000))
 db_host = os.environ.get('DAWGIE_DB_HOST', 'localhost')
 db_impl = os.environ.get('DAWGIE_DB_IMPL', 'shelve')
 db_name = os.environ.get('DAWGIE_DB_NAME', 'undefined')
@@ -113,7 +120,15 @@ db_post2shelve_prefix = os.environ.get(
 db_rotate_path = os.environ.get('DAWGIE_DB_ROTATE_PATH', '/proj/data/db')
 db_copy_path = os.environ.get('DAWGIE_DB_COPY_PATH', '/tmp')
 db_port = int(os.environ.get('DAWGIE_DB_PORT', 8080 + PortOffset.shelve.value))
+db_partition_size = int(os.environ.get('DAWGIE_DB_PARTITION_SIZE', 0))
+db_pool_lifetime = float(os.environ.get('DAWGIE_DB_POOL_LIFETIME', 3600))
+db_pool_max = int(os.environ.get('DAWGIE_DB_POOL_MAX', 4))
+db_pool_min = int(os.environ.get('DAWGIE_DB_POOL_MIN', 1))
+db_pool_timeout = float(os.environ.get('DAWGIE_DB_POOL_TIMEOUT', 30))
+db_prefetch_workers = int(os.environ.get('DAWGIE_DB_PREFETCH_WORKERS', 4))
 db_rotate = os.environ.get('DAWGIE_DB_ROTATES', 10)
+db_search_cache_size = int(os.environ.get('DAWGIE_DB_SEARCH_CACHE_SIZE', 256))
+db_search_cache_ttl = float(os.environ.get('DAWGIE_DB_SEARCH_CACHE_TTL', 300))
 db_lock = False
 
 display = os.environ.get('DAWGIE_DISPLAY_TYPE', 'html')
@@ -170,6 +185,7 @@ def add_arguments(ap):
 
     ap - an instance of argparse.ArgumentParser that is being used
     '''
+    # pylint: disable=too-many-statements
     ap.add_argument(
         '--context',
         default=None,
@@ -258,6 +274,26 @@ def add_arguments(ap):
         required=False,
         help='location of the DB data store [%(default)s]',
     )
+    ap.add_argument(
+        '--context-data-dbs-cache',
+        default=data_dbs_cache,
+        required=False,
+        type=int,
+        help='the bytes of the most recently decoded blobs of the DB data store that a process keeps in memory to decode them again without reading them with 0 keeping none [%(default)s]',
+    )
+    ap.add_argument(
+        '--context-data-dbs-codec',
+        default=data_dbs_codec,
+        required=False,
+        help='the compression, one of none, lzma, zlib, and lz4 or zstd when installed, of new blobs in the DB data store unless their StateVector.codec() says otherwise or oob to map their large buffers into memory as read-only arrays when they are read [%(default)s]',
+    )
+    ap.add_argument(
+        '--context-data-dbs-levels',
+        default=data_dbs_levels,
+        required=False,
+        type=int,
+        help='the levels of subdirectories, each named by the next two characters of the blob name, that the DB data store spreads its blobs over with 0 keeping them all in one directory [%(default)s]',
+    )
     ap.add_argument(
         '--context-data-log',
         default=data_log,
@@ -276,12 +312,40 @@ def add_arguments(ap):
         required=False,
         help='location of the staging store [%(default)s]',
     )
+    ap.add_argument(
+        '--context-db-archive-incremental',
+        default=db_archive_incremental,
+        required=False,
+        type=int,
+        help='the number of incremental archives, which hold only what is new since the archive before it, between full archives of the postgres database with 0 making every archive full [%(default)s]',
+    )
+    ap.add_argument(
+        '--context-db-archive-jobs',
+        default=db_archive_jobs,
+        required=False,
+        type=int,
+        help='the parallel jobs of pg_dump and the threads that copy files when archiving the database [%(default)s]',
+    )
+    ap.add_argument(
+        '--context-db-cache-size',
+        default=db_cache_size,
+        required=False,
+        type=int,
+        help='the most dimension table primary keys to cache with 0 disabling the cache [%(default)s]',
+    )
     ap.add_argument(
         '--context-db-copy-path',
         default=db_copy_path,
         required=False,
         help='where to copy the database [%(default)s]',
     )
+    ap.add_argument(
+        '--context-db-fetch-size',
+        default=db_fetch_size,
+        required=False,
+        type=int,
+        help='the rows fetched at a time when a whole table is streamed from the database [%(default)s]',
+    )
     ap.add_argument(
         '--context-db-host',
         default=db_host,
@@ -313,6 +377,48 @@ def add_arguments(ap):
         type=int,
         help='the port to the database [%(default)s]',
     )
+    ap.add_argument(
+        '--context-db-partition-size',
+        default=db_partition_size,
+        required=False,
+        type=int,
+        help='the run IDs in each partition of the postgres Prime table with 0 leaving it unpartitioned [%(default)s]',
+    )
+    ap.add_argument(
+        '--context-db-pool-lifetime',
+        default=db_pool_lifetime,
+        required=False,
+        type=float,
+        help='seconds a pooled postgres connection lives before it is replaced [%(default)s]',
+    )
+    ap.add_argument(
+        '--context-db-pool-max',
+        default=db_pool_max,
+        required=False,
+        type=int,
+        help='the most postgres connections a process may pool [%(default)s]',
+    )
+    ap.add_argument(
+        '--context-db-pool-min',
+        default=db_pool_min,
+        required=False,
+        type=int,
+        help='the postgres connections a process keeps pooled when idle [%(default)s]',
+    )
+    ap.add_argument(
+        '--context-db-pool-timeout',
+        default=db_pool_timeout,
+        required=False,
+        type=float,
+        help='seconds to wait for a pooled postgres connection before failing [%(default)s]',
+    )
+    ap.add_argument(
+        '--context-db-prefetch-workers',
+        default=db_prefetch_workers,
+        required=False,
+        type=int,
+        help='the threads that decode values when an Aspect or Timeline is prefetched with 0 disabling prefetch [%(default)s]',
+    )
     ap.add_argument(
         '--context-db-rotate',
         default=db_rotate,
@@ -326,6 +432,20 @@ def add_arguments(ap):
         required=False,
         help='the path of where the rotated db will be located [%(default)s]',
     )
+    ap.add_argument(
+        '--context-db-search-cache-size',
+        default=db_search_cache_size,
+        required=False,
+        type=int,
+        help='the search totals and name lookups cached with 0 disabling the cache [%(default)s]',
+    )
+    ap.add_argument(
+        '--context-db-search-cache-ttl',
+        default=db_search_cache_ttl,
+        required=False,
+        type=float,
+        help='seconds a cached search total or name lookup is used [%(default)s]',
+    )
     ap.add_argument(
         '--context-display-type',
         choices=[d.name for d in dawgie.types.DisplayType],
@@ -511,17 +631,32 @@ def override(args):
     dawgie.context.cloud_provider = CloudProvider[args.context_cloud_provider]
     dawgie.context.cpu_threshold = args.context_cpu_threshold
     dawgie.context.data_dbs = args.context_data_dbs
+    dawgie.context.data_dbs_cache = args.context_data_dbs_cache
+    dawgie.context.data_dbs_codec = args.context_data_dbs_codec
+    dawgie.context.data_dbs_levels = args.context_data_dbs_levels
     dawgie.context.data_log = args.context_data_log
     dawgie.context.data_per = args.context_data_per
     dawgie.context.data_stg = args.context_data_stg
+    dawgie.context.db_archive_incremental = args.context_db_archive_incremental
+    dawgie.context.db_archive_jobs = args.context_db_archive_jobs
+    dawgie.context.db_cache_size = args.context_db_cache_size
     dawgie.context.db_copy_path = args.context_db_copy_path
+    dawgie.context.db_fetch_size = args.context_db_fetch_size
     dawgie.context.db_host = args.context_db_host
     dawgie.context.db_impl = args.context_db_impl
     dawgie.context.db_name = args.context_db_name
     dawgie.context.db_path = args.context_db_path
     dawgie.context.db_port = args.context_db_port
+    dawgie.context.db_partition_size = args.context_db_partition_size
+    dawgie.context.db_pool_lifetime = args.context_db_pool_lifetime
+    dawgie.context.db_pool_max = args.context_db_pool_max
+    dawgie.context.db_pool_min = args.context_db_pool_min
+    dawgie.context.db_pool_timeout = args.context_db_pool_timeout
+    dawgie.context.db_prefetch_workers = args.context_db_prefetch_workers
     dawgie.context.db_rotate = args.context_db_rotate
     dawgie.context.db_rotate_path = args.context_db_rotate_path
+    dawgie.context.db_search_cache_size = args.context_db_search_cache_size
+    dawgie.context.db_search_cache_ttl = args.context_db_search_cache_ttl
     dawgie.context.display = dawgie.types.DisplayType[args.context_display_type]
     dawgie.context.email_alerts_to = args.context_email_alerts_to
     dawgie.context.email_signature = args.context_email_signature
@@ -66,6 +66,9 @@ REF = collections.namedtuple('REF', ['tid', 'aid', 'sid', 'vid'])
 MetricData = collections.namedtuple(
     'MetricData', ['alg_name', 'alg_ver', 'sv', 'run_id', 'target', 'task']
 )
+RunData = collections.namedtuple(
+    'RunData', ['run_id', 'event', 'revision', 'created']
+)
 
 
 def _db_in_use():
@@ -74,6 +77,20 @@ def _db_in_use():
     return m
 
 
+def _iter_prime_keys():
+    '''stream the keys of _prime_keys() one at a time
+
+    Use it rather than _prime_keys() when the whole Prime table does not need
+    to be in memory at the same time.
+    '''
+    return _db_in_use()._iter_prime_keys()
+
+
+def _iter_prime_values():
+    '''stream the blob names of _prime_values() one at a time'''
+    return _db_in_use()._iter_prime_values()
+
+
 def _prime_keys() -> [str]:
     '''return all the kyes in the form runid.targetname.task.alg.sv.valname'''
     return _db_in_use()._prime_keys()
@@ -84,6 +101,11 @@ def _prime_values() -> [str]:
     return _db_in_use()._prime_values()
 
 
+def _referenced(names: [str]) -> {str}:
+    '''return the blob names in names that are referenced by the Prime table'''
+    return _db_in_use()._referenced(names)
+
+
 def add(target_name: str) -> bool:
     '''Add a new target to the known list
 
@@ -136,6 +158,17 @@ def consistent(inputs: [REF], outputs: [REF], target_name: str) -> ():
     return _db_in_use().consistent(inputs, outputs, target_name)
 
 
+def consistent_many(
+    inputs: [REF], outputs: [REF], target_names: [str]
+) -> {str: ()}:
+    '''consistent() for many targets at once
+
+    Returns a dictionary of target name to what consistent() would return for
+    it. All of the junctures can be given to a single promote() call.
+    '''
+    return _db_in_use().consistent_many(inputs, outputs, target_names)
+
+
 def copy(dst, method, gateway):
     '''Copy database to destination.'''
     return _db_in_use().copy(dst, method, gateway)
@@ -150,13 +183,30 @@ def gather(anz, ans) -> dawgie.Aspect:
     return _db_in_use().gather(anz, ans)
 
 
+def iter_metrics(after_runid: int = -1):
+    '''stream the MetricData of metrics() one at a time'''
+    return _db_in_use().iter_metrics(after_runid)
+
+
+def last_runid() -> int:
+    '''Return the newest run ID allocated or written and 0 if there is none'''
+    return _db_in_use().last_runid()
+
+
 def metrics(after_runid: int = -1) -> [MetricData]:
     return _db_in_use().metrics(after_runid)
 
 
-def next():
-    '''Return the next run ID'''
-    return _db_in_use().next()
+def next(event: str = None) -> int:
+    '''Allocate and return the next run ID
+
+    event : what triggered the run and is recorded with the run ID along with
+            dawgie.context.git_rev and the time of the allocation
+
+    Every call returns a new run ID even if nothing has been written with the
+    previous one. Use last_runid() to look at the newest run ID instead.
+    '''
+    return _db_in_use().next(event)
 
 
 def open():
@@ -167,7 +217,8 @@ def open():
 def promote(juncture: (), runid: int):
     '''Promote the junctures to the given runid
 
-    juncture : a list of results from dawgie.db.consistent
+    juncture : a list of results from dawgie.db.consistent or the results
+               of dawgie.db.consistent_many for many targets joined together
 
     retuns the full value names promoted as
     runid.target name.task name.alg name.state vector name.value name'''
@@ -216,11 +267,21 @@ def retreat(reg, ret) -> dawgie.Timeline:
     return _db_in_use().retreat(reg, ret)
 
 
+def runs(after_runid: int = -1) -> [RunData]:
+    '''Return the RunData of the run IDs allocated after after_runid'''
+    return _db_in_use().runs(after_runid)
+
+
 def search() -> SearchFacade:
     '''Get an implementation of Facade for the specific DB to allow for search'''
     return _db_in_use().search()
 
 
+def stats() -> {}:
+    '''Statistics about the database backend for sizing and tuning it'''
+    return _db_in_use().stats()
+
+
 def targets(fulllist: bool = False):
     return list(
         filter(
@@ -252,6 +313,16 @@ def update(tsk, alg, sv, vn, v):
     return _db_in_use().update(tsk, alg, sv, vn, v)
 
 
+def update_many(tsk, items: [tuple]):
+    '''Update the database with the version information of a whole task
+
+    tsk
+    items - list of (alg, sv, vn, v) as described in update() where sv, vn,
+            and v are None for an algorithm without state vectors
+    '''
+    return _db_in_use().update_many(tsk, items)
+
+
 def versions():
     '''Collate all of the known versions
 
@@ -39,7 +39,10 @@ NTR: 49811
 '''
 
 import abc
+import base64
 import dataclasses
+import hashlib
+import json
 import typing
 
 
@@ -69,6 +72,7 @@ class Params(typing.NamedTuple):
 class SearchResults(typing.NamedTuple):
     items: [str] = []
     total: int = -1
+    token: str = None  # continues after items and None when nothing follows
 
 
 class SearchFacade(abc.ABC):
@@ -84,7 +88,11 @@ class SearchFacade(abc.ABC):
 
     @abc.abstractmethod
     def _find(
-        self, parameters: Params, index: int = 0, limit: int = None
+        self,
+        parameters: Params,
+        index: int = 0,
+        limit: int = None,
+        token: str = None,
     ) -> SearchResults:
         pass
 
@@ -123,6 +131,30 @@ class SearchFacade(abc.ABC):
                     indices.add(runids)
         return indices, ranges
 
+    @staticmethod
+    def _fingerprint(parameters: Params) -> str:
+        return hashlib.sha256(repr(parameters).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _token(parameters: Params, key: tuple) -> str:
+        '''opaque token for the page that follows the item with key'''
+        return base64.urlsafe_b64encode(
+            json.dumps(
+                [SearchFacade._fingerprint(parameters), list(key)]
+            ).encode()
+        ).decode()
+
+    @staticmethod
+    def _untoken(parameters: Params, token: str) -> tuple:
+        '''the key given to _token() when it made token for parameters'''
+        try:
+            fingerprint, key = json.loads(base64.urlsafe_b64decode(token))
+        except (TypeError, ValueError) as err:
+            raise ValueError(f'Not a search token: {token}') from err
+        if fingerprint != SearchFacade._fingerprint(parameters):
+            raise ValueError('The search token is for different parameters')
+        return tuple(key)
+
     @staticmethod
     def _scrub(parameters: Params):
         '''scrub the parameters from overly complex requests
@@ -189,13 +221,18 @@ class SearchFacade(abc.ABC):
 
     @typing.final
     def find(
-        self, parameters: Params, index: int = 0, limit: int = None
+        self,
+        parameters: Params,
+        index: int = 0,
+        limit: int = None,
+        token: str = None,
     ) -> SearchResults:
         '''Find all of the primary table entries that meet the constraints
 
         The return strings will be in runid order. For large lists, use the
-        pagination index and limit. Each page will require a new DB search
-        as no caching is done for simplicity reasons. Hence large searches
-        are expensive.
+        pagination limit. The first page starts at index and the token of its
+        results gives the next page, and so on, until the token is None. A
+        page started from a token picks up right after the previous page
+        rather than skipping index entries, which keeps deep pages cheap.
         '''
-        return self._find(SearchFacade._scrub(parameters), index, limit)
+        return self._find(SearchFacade._scrub(parameters), index, limit, token)
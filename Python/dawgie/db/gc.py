@@ -0,0 +1,182 @@
+'''incremental garbage collection of the blobs in the DB data store
+
+A blob is garbage once no row of the Prime table refers to it. The store is
+swept a batch of blobs at a time in the order of their names, asking the
+database which of each batch are referenced, so a sweep can stop after any
+batch and be resumed after the last name that it examined.
+
+A sweep may run while the pipeline does. A blob lands in the store before
+the row that refers to it is written, and dawgie.db.util.encode() touches a
+blob that it finds already in the store rather than writing it again, so
+blobs modified within the grace are never taken for garbage. A garbage blob
+is renamed aside before it is deleted and put back if it was touched in the
+meantime.
+
+--
+COPYRIGHT:
+Copyright (c) 2015-2026, California Institute of Technology ("Caltech").
+U.S. Government sponsorship acknowledged.
+
+All rights reserved.
+
+LICENSE:
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+- Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+- Neither the name of Caltech nor its operating division, the Jet
+Propulsion Laboratory, nor the names of its contributors may be used to
+endorse or promote products derived from this software without specific prior
+written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+
+NTR:
+'''
+
+import dawgie.db
+import dawgie.db.util
+import itertools
+
+import logging; log = logging.getLogger(__name__)  # fmt: skip # noqa: E702 # pylint: disable=multiple-statements
+import os
+import re
+import time
+
+ASIDE = '.gc'  # suffix of a blob while it is being deleted
+BLOB = re.compile('[0-9a-f]{32}_[0-9a-f]{40}')
+
+
+def _delete(path: str, cutoff: float) -> bool:
+    aside = path + ASIDE
+
+    try:
+        os.rename(path, aside)
+    except FileNotFoundError:
+        return False
+
+    if cutoff < os.stat(aside).st_mtime:
+        os.rename(aside, path)
+        return False
+
+    os.unlink(aside)
+    return True
+
+
+def _restore(name: str, path: str) -> bool:
+    '''put back a blob left aside by a sweep that was interrupted'''
+    if not name.endswith(ASIDE) or not BLOB.fullmatch(name[: -len(ASIDE)]):
+        return False
+
+    log.warning('restoring the blob %s left aside', name[: -len(ASIDE)])
+    os.rename(path, path[: -len(ASIDE)])
+    return True
+
+
+def _examine(chunk: [(str, str)], cutoff: float, dry: bool, report: {}):
+    '''the {name: (path, size)} of the blobs in chunk older than cutoff'''
+    result = {}
+    for name, path in chunk:
+        if (dry or not _restore(name, path)) and BLOB.fullmatch(name):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:  # moved by dawgie.db.tools.shard
+                continue
+
+            if cutoff < stat.st_mtime:
+                report['young'] += 1
+            else:
+                result[name] = (path, stat.st_size)
+        pass
+    return result
+
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+def sweep(
+    after: str = None,
+    batch: int = 10000,
+    dry: bool = False,
+    grace: float = 86400,
+    limit: int = None,
+    rate: float = 0,
+) -> {}:
+    '''delete the garbage blobs in the store and report what was done
+
+    after  : name of the last blob examined by an earlier sweep
+    batch  : number of blobs examined at a time
+    dry    : report the garbage without deleting it
+    grace  : seconds since a blob was modified before it can be garbage
+    limit  : number of blobs to examine before stopping or None for all
+    rate   : maximum blobs examined per second or 0 for as fast as possible
+
+    The report counts the blobs examined, those that are young, those that
+    are referenced, and the garbage found with its total size in bytes. Its
+    cursor is the name of the last blob examined to resume from or None when
+    the sweep reached the end of the store.
+    '''
+    # internal dawgie work # pylint: disable=protected-access
+    report = {
+        'bytes': 0,
+        'cursor': after,
+        'examined': 0,
+        'garbage': 0,
+        'referenced': 0,
+        'young': 0,
+    }
+    start = time.monotonic()
+    walk = dawgie.db.util.blobs(after)
+    while limit is None or report['examined'] < limit:
+        chunk = list(
+            itertools.islice(
+                walk,
+                (
+                    batch
+                    if limit is None
+                    else min(batch, limit - report['examined'])
+                ),
+            )
+        )
+
+        if not chunk:
+            report['cursor'] = None
+            break
+
+        cutoff = time.time() - grace
+        old = _examine(chunk, cutoff, dry, report)
+        referenced = dawgie.db._referenced(list(old)) if old else set()
+        report['referenced'] += len(referenced)
+        for name in sorted(set(old) - referenced):
+            if dry or _delete(old[name][0], cutoff):
+                log.info(
+                    '%s the garbage blob %s',
+                    'found' if dry else 'deleted',
+                    name,
+                )
+                report['bytes'] += old[name][1]
+                report['garbage'] += 1
+            pass
+
+        report['cursor'] = chunk[-1][0]
+        report['examined'] += len(chunk)
+        if 0 < rate:
+            time.sleep(
+                max(0, report['examined'] / rate - (time.monotonic() - start))
+            )
+        pass
+    return report
@@ -51,6 +51,7 @@ NTR:
 # pylint: disable=invalid-name
 
 import collections
+import concurrent.futures
 import dawgie
 import dawgie.context
 import dawgie.db
@@ -60,6 +61,7 @@ import dawgie.db.util
 import dawgie.db.util.wraps
 import dawgie.util
 import dawgie.util.metrics
+import itertools
 
 import logging; log = logging.getLogger(__name__)  # fmt: skip # noqa: E702 # pylint: disable=multiple-statements
 import os
@@ -67,12 +69,14 @@ import random
 import pickle
 import psycopg
 import psycopg.rows
-import shutil
 import time
-import twisted.internet.error
-import twisted.internet.protocol
-import twisted.internet.reactor
 
+from . import backup
+from . import cache
+from . import partition
+from . import pool
+from . import schema
+from . import statements
 from .search import SearchImplementation
 from ..basis import SearchFacade
 
@@ -83,32 +87,6 @@ ENTRY = collections.namedtuple(
 )
 
 
-class ArchiveHandler(twisted.internet.protocol.ProcessProtocol):
-    def __init__(self, command, done):
-        self.__command = command
-        self.__done = done
-        return
-
-    def processEnded(self, reason):
-        if isinstance(reason.value, twisted.internet.error.ProcessTerminated):
-            # more readable this way so pylint: disable=logging-not-lazy
-            # exceptions always look the same; pylint: disable=duplicate-code
-            log.critical(
-                'Error in archiving of data.    EXIT CODE: %s'
-                + '   SIGNAL: %s    STATUS: %s   COMMAND: "%s"',
-                str(reason.value.exitCode),
-                str(reason.value.signal),
-                str(reason.value.status),
-                self.__command,
-            )
-            pass
-
-        self.__done()
-        return
-
-    pass
-
-
 class Interface(
     dawgie.db.util.wraps.Container,
     dawgie.Aspect,
@@ -125,22 +103,17 @@ class Interface(
     @staticmethod
     def __fill(cur, sv, alg_ID, run_ID, task_ID, tn_ID, sv_ID):
         # Get rows from prime table that have these algorithm primary keys
-        cur.execute(
-            'SELECT val_ID,blob_name from Prime WHERE run_ID = %s '
-            + 'and alg_ID = %s and tn_ID = %s '
-            + 'and task_ID = %s and sv_ID = %s;',
-            (run_ID, alg_ID, tn_ID, task_ID, sv_ID),
-        )
-        runs = cur.fetchall()
+        statements.execute(cur, 'fill', (run_ID, alg_ID, tn_ID, task_ID, sv_ID))
+        rows = cur.fetchall()
 
-        if not runs:
+        if not rows:
             log.info(
                 'Dataset load: Could not find any runs that match given values'
             )
 
-        for r in runs:
+        for r in rows:
             val_ID = r[0]
-            cur.execute('SELECT name from Value WHERE PK = %s;', [val_ID])
+            statements.execute(cur, 'value_name', [val_ID])
             val_name = cur.fetchone()[0]
             data_valPickle = r[1]
             sv[val_name] = dawgie.db.util.decode(data_valPickle)
@@ -171,12 +144,11 @@ class Interface(
     def __tn_id(self, cur, tn=None):
         tn = tn if tn else self._tn()
         # Get target id that matches target name or create it if not there
-        _insert(
-            'INSERT INTO Target (name) VALUES (%s) ON CONFLICT (name) DO NOTHING;',
-            [tn],
+        tn_ID = _new_ID(
+            cur,
+            cache.target(tn),
+            f'Dataset: Could not find target ID for "{tn}"',
         )
-        cur.execute('SELECT * from Target WHERE name = %s;', [tn])
-        tn_ID = _fetchone(cur, f'Dataset: Could not find target ID for "{tn}"')
         return tn_ID
 
     def _ckeys(self, l1k, l2k):
@@ -207,40 +179,45 @@ class Interface(
             },
             'table': {},
         }
-        cur.execute('SELECT PK,name from Target;')
-        tnl = cur.fetchall()
+        wanted = {}
         for ref in refs:
-            cur.execute(
-                'SELECT PK FROM Task WHERE name = %s;',
-                [dawgie.util.task_name(ref.factory)],
+            if not isinstance(ref, (dawgie.SV_REF, dawgie.V_REF)):
+                # long message more readable so pylint: disable=logging-not-lazy
+                log.critical(
+                    'Need to improve compliant because '
+                    + 'received soemthing that was neither '
+                    + 'SV_REF or V_REF: '
+                    + str(type(ref))
+                )
+                continue
+
+            task_ID = _dim_ID(
+                cur,
+                cache.task(dawgie.util.task_name(ref.factory)),
+                f'Aspect collect: Could not find task ID for {ref}',
             )
-            task_ID = cur.fetchone()[0]
-            cur.execute(
-                'SELECT PK from Algorithm WHERE name = %s and '
-                + 'task_ID = %s and '
-                + 'design = %s and implementation = %s and bugfix = %s;',
-                (
+            alg_ID = _dim_ID(
+                cur,
+                cache.algorithm(
                     ref.impl.name(),
                     task_ID,
                     ref.impl.design(),
                     ref.impl.implementation(),
                     ref.impl.bugfix(),
                 ),
+                f'Aspect collect: Could not find algorithm ID for {ref}',
             )
-            alg_ID = cur.fetchone()[0]
-            cur.execute(
-                'SELECT PK FROM StateVector WHERE name = %s and '
-                + 'alg_ID = %s and '
-                + 'design = %s and implementation = %s and bugfix = %s;',
-                (
+            sv_ID = _dim_ID(
+                cur,
+                cache.statevector(
                     ref.item.name(),
                     alg_ID,
                     ref.item.design(),
                     ref.item.implementation(),
                     ref.item.bugfix(),
                 ),
+                f'Aspect collect: Could not find state vector ID for {ref}',
             )
-            sv_ID = cur.fetchone()[0]
             fsvn = '.'.join(
                 [
                     dawgie.util.task_name(ref.factory),
@@ -248,92 +225,55 @@ class Interface(
                     ref.item.name(),
                 ]
             )
-            for tn in tnl:
-                cur.execute(
-                    'SELECT run_ID FROM Prime WHERE tn_ID = %s AND '
-                    + 'task_ID = %s AND alg_ID = %s AND sv_ID = %s;',
-                    [tn[0], task_ID, alg_ID, sv_ID],
-                )
-                run_ID = {rid[0] for rid in cur.fetchall()}
-
-                if not run_ID:
-                    # long message more readable pylint: disable=logging-not-lazy
-                    log.warning(
-                        'Aspect collect: Could not find any runids '
-                        + 'for target %s and %s',
-                        tn,
-                        str(ref),
-                    )
-                    continue
-
-                run_ID = max(run_ID) if 1 < len(run_ID) else run_ID.pop()
-                # long message more readable so pylint: disable=logging-not-lazy
-                cur.execute(
-                    'SELECT val_ID from Prime WHERE run_ID = %s AND '
-                    + 'alg_ID = %s AND tn_ID = %s and task_ID = %s and '
-                    + 'sv_ID = %s;',
-                    (run_ID, alg_ID, tn[0], task_ID, sv_ID),
-                )
-                vids = [vid[0] for vid in cur.fetchall()]
-
-                if not vids:
-                    log.warning(
-                        'Aspect collect: Could not find any '
-                        + 'values for '
-                        + str(ref)
-                    )
-                elif tn[1] not in self.__span['table']:
-                    self.__span['table'][tn[1]] = {}
-                    pass
-
-                for vid in vids:
-                    cur.execute('SELECT name FROM Value WHERE pk = %s;', [vid])
-                    vn = cur.fetchone()[0]
-                    entry = ENTRY(run_ID, tn[0], task_ID, alg_ID, sv_ID, vid)
-
-                    if fsvn not in self.__span['table'][tn[1]]:
-                        self.__span['table'][tn[1]][fsvn] = {}
+            wanted.setdefault((task_ID, alg_ID, sv_ID), []).append(
+                (fsvn, ref.feat if isinstance(ref, dawgie.V_REF) else None)
+            )
+            pass
 
-                    if isinstance(ref, dawgie.SV_REF):
-                        self.__span['table'][tn[1]][fsvn][vn] = entry
-                    elif isinstance(ref, dawgie.V_REF):
-                        if ref.feat == vn:
-                            self.__span['table'][tn[1]][fsvn][vn] = entry
-                            pass
-                        pass
-                    else:
-                        # long msg readable so pylint: disable=logging-not-lazy
-                        log.critical(
-                            'Need to improve compliant because '
-                            + 'received soemthing that was neither '
-                            + 'SV_REF or V_REF: '
-                            + str(type(ref))
-                        )
-                        pass
+        # latest run_ID for each target and state vector then every value that
+        # was written in that run
+        keys = list(wanted)
+        statements.execute(
+            cur,
+            'collect',
+            [[k[0] for k in keys], [k[1] for k in keys], [k[2] for k in keys]],
+        )
+        table = self.__span['table']
+        for row in cur:
+            entry = ENTRY(*row[:6])
+            tn, vn = row[6:]
+            for fsvn, feat in wanted[row[2:5]]:
+                if feat is None or feat == vn:
+                    table.setdefault(tn, {}).setdefault(fsvn, {})[vn] = entry
                     pass
                 pass
             pass
         conn.commit()  # psycopg3 problem # pylint:disable=no-member
         cur.close()
         conn.close()  # psycopg3 problem # pylint:disable=no-member
+        log.debug(
+            'Aspect collect: found %d targets for %d references',
+            len(table),
+            len(refs),
+        )
         self.__purge()
         return
 
     def _fill_item(self, l1k, l2k, l3k):
-        if isinstance(self.__span['table'][l1k][l2k][l3k], ENTRY):
+        if isinstance(
+            self.__span['table'][l1k][l2k][l3k], concurrent.futures.Future
+        ):
+            value = self.__span['table'][l1k][l2k][l3k].result()
+            self.__span['table'][l1k][l2k][l3k] = value
+        elif isinstance(self.__span['table'][l1k][l2k][l3k], ENTRY):
             conn = dawgie.db.post._conn()
             cur = dawgie.db.post._cur(conn)
-            cur.execute(
-                'SELECT blob_name from Prime WHERE run_ID = %s and '
-                + 'tn_ID = %s and task_ID = %s and alg_ID = %s and '
-                + 'sv_ID = %s and val_ID = %s;',
-                self.__span['table'][l1k][l2k][l3k],
+            statements.execute(
+                cur, 'entry_blob', self.__span['table'][l1k][l2k][l3k]
             )
             value = dawgie.db.util.decode(*cur.fetchone())
-            cur.execute(
-                'SELECT design,implementation,bugfix '
-                + 'FROM StateVector WHERE pk= %s;',
-                [self.__span['table'][l1k][l2k][l3k].sv_ID],
+            statements.execute(
+                cur, 'sv_version', [self.__span['table'][l1k][l2k][l3k].sv_ID]
             )
             value._set_ver(dawgie.VERSION(*cur.fetchone()))
             self.__span['table'][l1k][l2k][l3k] = value
@@ -392,33 +332,25 @@ class Interface(
             # get the target
             tn_ID = self.__tn_id(cur)
             # Get task id that matches task name
-            cur.execute('SELECT * from TASK WHERE name = %s;', [self._task()])
-            task_ID = _fetchone(cur, 'Dataset load: Could not find task ID')
-            cur.execute(
-                'SELECT pk FROM Algorithm WHERE name = %s AND '
-                + 'task_ID = %s;',
-                [self._alg().name(), task_ID],
+            task_ID = _dim_ID(
+                cur,
+                cache.task(self._task()),
+                'Dataset load: Could not find task ID',
             )
+            statements.execute(cur, 'alg_pks', [self._alg().name(), task_ID])
             alg_ID = list({pk[0] for pk in cur.fetchall()})
             msv = dawgie.util.MetricStateVector(
                 dawgie.util.metrics.filled(-1), dawgie.util.metrics.filled(-1)
             )
             for sv in self._alg().state_vectors() + [msv]:
-                cur.execute(
-                    'SELECT pk FROM StateVector WHERE name = %s AND '
-                    + 'alg_ID = ANY(%s);',
-                    [sv.name(), alg_ID],
-                )
+                statements.execute(cur, 'sv_pks', [sv.name(), alg_ID])
                 sv_ID = list({pk[0] for pk in cur.fetchall()})
-                cur.execute(
-                    'SELECT run_ID FROM Prime WHERE tn_ID = %s AND '
-                    + 'task_ID = %s AND alg_ID = ANY(%s) AND '
-                    + 'sv_ID = ANY(%s);',
-                    [tn_ID, task_ID, alg_ID, sv_ID],
+                statements.execute(
+                    cur, 'latest_sv_run', [tn_ID, task_ID, alg_ID, sv_ID]
                 )
-                run_ID = {pk[0] for pk in cur.fetchall()}
+                latest = cur.fetchone()[0]
 
-                if not run_ID:
+                if latest is None:
                     # long msg more readable so pylint: disable=logging-not-lazy
                     log.debug(
                         'Dataset load: Could not find any runs that '
@@ -426,17 +358,25 @@ class Interface(
                     )
                     continue
 
-                run_ID = (
-                    self._runid() if self._runid() in run_ID else max(run_ID)
-                )
-                cur.execute(
-                    'SELECT alg_ID,sv_ID FROM Prime WHERE '
-                    + 'run_ID = %s AND tn_ID = %s AND task_ID = %s '
-                    + ' AND alg_ID = ANY(%s) and sv_ID = ANY(%s);',
+                # prefer this run when it wrote the state vector
+                run_ID = self._runid()
+                statements.execute(
+                    cur,
+                    'prime_narrow',
                     [run_ID, tn_ID, task_ID, alg_ID, sv_ID],
                 )
                 narrowed = set(cur.fetchall())
 
+                if not narrowed:
+                    run_ID = latest
+                    statements.execute(
+                        cur,
+                        'prime_narrow',
+                        [run_ID, tn_ID, task_ID, alg_ID, sv_ID],
+                    )
+                    narrowed = set(cur.fetchall())
+                    pass
+
                 if len(narrowed) != 1:
                     # long msg more readable so pylint: disable=logging-not-lazy
                     log.critical(
@@ -448,17 +388,9 @@ class Interface(
 
                 na_ID, nsv_ID = narrowed.pop()
                 self.__fill(cur, sv, na_ID, run_ID, task_ID, tn_ID, nsv_ID)
-                cur.execute(
-                    'SELECT design,implementation,bugfix '
-                    + 'FROM Algorithm WHERE pk = %s;',
-                    [na_ID],
-                )
+                statements.execute(cur, 'alg_version', [na_ID])
                 av = cur.fetchone()
-                cur.execute(
-                    'SELECT design,implementation,bugfix '
-                    + 'FROM StateVector WHERE pk= %s;',
-                    [nsv_ID],
-                )
+                statements.execute(cur, 'sv_version', [nsv_ID])
                 svv = cur.fetchone()
                 self._alg()._version_seal_ = dawgie.VERSION(*av)
                 sv._version_seal_ = dawgie.VERSION(*svv)
@@ -471,6 +403,13 @@ class Interface(
         conn.close()  # psycopg3 problem # pylint:disable=no-member
         return
 
+    def _prefetch(self, l1k, l2k):
+        count = dawgie.db.util.prefetch_span(
+            self.__span.get('table', {}), l1k, l2k, ENTRY, _prefetch_blobs
+        )
+        log.debug('prefetching %d values', count)
+        return
+
     def _recede(self, refs: [(dawgie.SV_REF, dawgie.V_REF)]) -> None:
         # pylint: disable=too-many-locals,too-many-statements
         conn = dawgie.db.post._conn()
@@ -488,31 +427,20 @@ class Interface(
             },
             'table': collections.OrderedDict(),
         }
-        cur.execute('SELECT PK FROM Target WHERE name = %s;', [self._tn()])
-        tnid = cur.fetchone()[0]
+        tnid = _dim_ID(
+            cur,
+            cache.target(self._tn()),
+            f'Regress recede: Could not find target ID for "{self._tn()}"',
+        )
         for ref in refs:
-            cur.execute(
-                'SELECT PK FROM Task WHERE name = %s;',
-                [dawgie.util.task_name(ref.factory)],
-            )
-            task_ID = cur.fetchone()[0]
-            cur.execute(
-                'SELECT PK from Algorithm WHERE name = %s and '
-                + 'task_ID = %s;',
-                (
-                    ref.impl.name(),
-                    task_ID,
-                ),
+            task_ID = _dim_ID(
+                cur,
+                cache.task(dawgie.util.task_name(ref.factory)),
+                f'Regress recede: Could not find task ID for {ref}',
             )
+            statements.execute(cur, 'alg_pks', (ref.impl.name(), task_ID))
             alg_IDs = [aid[0] for aid in cur.fetchall()]
-            cur.execute(
-                'SELECT PK FROM StateVector WHERE name = %s and '
-                + 'alg_ID = ANY(%s);',
-                (
-                    ref.item.name(),
-                    alg_IDs,
-                ),
-            )
+            statements.execute(cur, 'sv_pks', (ref.item.name(), alg_IDs))
             sv_IDs = [svid[0] for svid in cur.fetchall()]
             fsvn = '.'.join(
                 [
@@ -521,29 +449,19 @@ class Interface(
                     ref.item.name(),
                 ]
             )
-            cur.execute(
-                'SELECT run_ID FROM Prime WHERE tn_ID = %s AND '
-                + 'task_ID = %s AND alg_ID = ANY(%s) AND '
-                + 'sv_ID = ANY(%s);',
-                [tnid, task_ID, alg_IDs, sv_IDs],
+            statements.execute(
+                cur, 'prime_runs', [tnid, task_ID, alg_IDs, sv_IDs]
             )
             rids = sorted({r[0] for r in cur.fetchall()}, reverse=True)
             for rid in rids:
-                cur.execute(
-                    'SELECT PK,alg_ID,sv_ID FROM Prime WHERE '
-                    + 'run_ID = %s AND  tn_ID = %s AND '
-                    + 'task_ID = %s AND alg_ID = ANY(%s) AND '
-                    + 'sv_ID = ANY(%s);',
-                    [rid, tnid, task_ID, alg_IDs, sv_IDs],
+                statements.execute(
+                    cur, 'prime_ids', [rid, tnid, task_ID, alg_IDs, sv_IDs]
                 )
                 ids = cur.fetchall()
                 pks = [id[0] for id in ids]
                 alg_ID, sv_ID = ids[pks.index(max(pks))][1:]
-                cur.execute(
-                    'SELECT val_ID from Prime WHERE run_ID = %s AND '
-                    + 'alg_ID = %s AND tn_ID = %s and task_ID = %s and '
-                    + 'sv_ID = %s;',
-                    (rid, alg_ID, tnid, task_ID, sv_ID),
+                statements.execute(
+                    cur, 'prime_val_IDs', (rid, alg_ID, tnid, task_ID, sv_ID)
                 )
                 vids = [vid[0] for vid in cur.fetchall()]
 
@@ -559,7 +477,7 @@ class Interface(
                     pass
 
                 for vid in vids:
-                    cur.execute('SELECT name FROM Value WHERE pk = %s;', [vid])
+                    statements.execute(cur, 'value_name', [vid])
                     vn = cur.fetchone()[0]
                     entry = ENTRY(rid, tnid, task_ID, alg_ID, sv_ID, vid)
 
@@ -602,42 +520,33 @@ class Interface(
             subname_ID,
         )
         for ref in upstream:
-            cur.execute(
-                'SELECT PK FROM Task WHERE name = %s;',
-                [dawgie.util.task_name(ref.factory)],
+            task_ID = _dim_ID(
+                cur,
+                cache.task(dawgie.util.task_name(ref.factory)),
+                f'retarget: Could not find task ID for {ref}',
             )
-            task_ID = cur.fetchone()[0]
-            cur.execute(
-                'SELECT PK from Algorithm WHERE name = %s and '
-                + 'task_ID = %s and '
-                + 'design = %s and implementation = %s and bugfix = %s;',
-                (
+            alg_ID = _dim_ID(
+                cur,
+                cache.algorithm(
                     ref.impl.name(),
                     task_ID,
                     ref.impl.design(),
                     ref.impl.implementation(),
                     ref.impl.bugfix(),
                 ),
+                f'retarget: Could not find algorithm ID for {ref}',
             )
-            alg_ID = cur.fetchone()[0]
-            cur.execute(
-                'SELECT run_ID FROM Prime WHERE tn_ID = %s AND '
-                + 'task_ID = %s AND alg_ID = %s;',
-                [target_ID, task_ID, alg_ID],
+            statements.execute(
+                cur, 'latest_alg_run', [target_ID, task_ID, alg_ID]
             )
-            rid = max(r[0] for r in cur.fetchall())
-            cur.execute(
-                'SELECT sv_ID,val_ID,blob_name FROM Prime WHERE '
-                + 'run_ID = %s AND tn_ID = %s AND task_ID = %s AND '
-                + 'alg_ID = %s;',
-                [rid, target_ID, task_ID, alg_ID],
+            rid = cur.fetchone()[0]
+            statements.execute(
+                cur, 'prime_alg_rows', [rid, target_ID, task_ID, alg_ID]
             )
             for sv_ID, val_ID, bn in cur.fetchall():
-                cur.execute(
-                    'SELECT EXISTS (SELECT 1 FROM Prime WHERE '
-                    + 'run_ID = %s AND tn_ID = %s AND task_ID = %s '
-                    + 'AND alg_ID = %s AND sv_ID = %s AND val_ID = %s '
-                    + 'AND blob_name = %s);',
+                statements.execute(
+                    cur,
+                    'prime_exists',
                     [rid, subname_ID, task_ID, alg_ID, sv_ID, val_ID, bn],
                 )
                 already_exists = cur.fetchone()[0]
@@ -647,13 +556,24 @@ class Interface(
                     str([rid, subname_ID, task_ID, alg_ID, sv_ID, val_ID, bn]),
                 )
                 if not already_exists:
-                    cur.execute(
-                        'INSERT INTO Prime '
-                        + '(run_ID, tn_ID, task_ID, alg_ID, sv_ID, '
-                        + 'val_ID, blob_name) values '
-                        + '(%s, %s, %s, %s, %s, %s, %s);',
-                        [rid, subname_ID, task_ID, alg_ID, sv_ID, val_ID, bn],
-                    )
+                    with conn.transaction():
+                        statements.execute(
+                            cur,
+                            'retarget_insert',
+                            [
+                                rid,
+                                subname_ID,
+                                task_ID,
+                                alg_ID,
+                                sv_ID,
+                                val_ID,
+                                bn,
+                            ],
+                        )
+                        _advance_latest(
+                            cur, [(subname_ID, task_ID, alg_ID, sv_ID, rid)]
+                        )
+                        pass
                     conn.commit()  # psycopg3 problem # pylint:disable=no-member
                     pass
                 pass
@@ -664,155 +584,107 @@ class Interface(
         return Interface(self._alg(), self._bot(), subname)
 
     def _update(self):
-        # pylint: disable=too-many-branches,too-many-locals,too-many-statements
+        # pylint: disable=too-many-locals
         if self._alg().abort():
             raise dawgie.AbortAEError()
 
         log.debug("in Interface update")
-        conn = _conn()
-        cur = _cur(conn)
-        primes = []
-        valid = True
+        blobs = []
         for sv in self._alg().state_vectors():
             for vn, val in sv.items():
-                result, exists = dawgie.db.util.move(
-                    *dawgie.db.util.encode(val)
-                )
-                cur.execute(
-                    'SELECT EXISTS (SELECT * from Prime where '
-                    + 'blob_name = %s);',
-                    [result],
-                )
-                exists &= cur.fetchone()[0]
-                self._bot().new_values(
-                    (
-                        '.'.join(
-                            [
-                                str(self._runid()),
-                                self._tn(),
-                                self._task(),
-                                self._alg().name(),
-                                sv.name(),
-                                vn,
-                            ]
-                        ),
-                        not exists,
+                blobs.append(
+                    (sv, vn, val)
+                    + dawgie.db.util.move(
+                        *dawgie.db.util.encode(val, sv.codec())
                     )
                 )
+                pass
+            pass
 
-                # Put result in primary. Make sure to get task_ID and other
-                # primary keys from their respective tables
-
-                # get the target ID
-                tn_ID = self.__tn_id(cur)
-
-                # Get task id that matches task name
-                cur.execute(
-                    'SELECT * from TASK WHERE name = %s;', [self._task()]
-                )
-                task_ID = _fetchone(
-                    cur, 'Dataset update: Could not find task ID'
-                )
+        if not blobs:
+            return
 
-                # Get Alg id
-                cur.execute(
-                    'SELECT * from Algorithm WHERE name = %s and '
-                    + 'task_ID = %s and '
-                    + 'design = %s and bugfix = %s and implementation = %s;',
-                    (
-                        self._alg().name(),
-                        task_ID,
-                        self._alg().design(),
-                        self._alg().bugfix(),
-                        self._alg().implementation(),
+        conn = _conn()
+        cur = _cur(conn)
+        statements.execute(cur, 'known_blobs', [[blob[3] for blob in blobs]])
+        known = {row[0] for row in cur}
+        tn_ID = self.__tn_id(cur)
+        task_ID = _dim_ID(
+            cur,
+            cache.task(self._task()),
+            'Dataset update: Could not find task ID',
+        )
+        alg_ID = _dim_ID(
+            cur,
+            cache.algorithm(
+                self._alg().name(),
+                task_ID,
+                self._alg().design(),
+                self._alg().implementation(),
+                self._alg().bugfix(),
+            ),
+            'Dataset update: Could not find algorithm ID',
+        )
+        primes = []
+        sv_IDs = {}
+        valid = True
+        for sv, vn, val, result, exists in blobs:
+            self._bot().new_values(
+                (
+                    '.'.join(
+                        [
+                            str(self._runid()),
+                            self._tn(),
+                            self._task(),
+                            self._alg().name(),
+                            sv.name(),
+                            vn,
+                        ]
                     ),
+                    not (exists and result in known),
                 )
-                alg_ID = _fetchone(
-                    cur, 'Dataset update: Could not find ' + 'algorithm ID'
-                )
+            )
 
-                # Get state vector id that matches sv name
-                cur.execute(
-                    'SELECT * from StateVector WHERE name = %s and '
-                    + 'alg_ID = %s and '
-                    + 'design = %s and bugfix = %s and implementation = %s;',
-                    [
+            if sv.name() not in sv_IDs:
+                sv_IDs[sv.name()] = _dim_ID(
+                    cur,
+                    cache.statevector(
                         sv.name(),
                         alg_ID,
                         sv.design(),
-                        sv.bugfix(),
                         sv.implementation(),
-                    ],
-                )
-                sv_ID = _fetchone(
-                    cur, 'Dataset load: Could not find ' + 'state vector ID'
+                        sv.bugfix(),
+                    ),
+                    'Dataset load: Could not find state vector ID',
                 )
+                pass
 
-                # Get the value id that matches the value
-                if not dawgie.db.util.verify(val):
-                    log.critical(
-                        'offending item is %s',
-                        '.'.join(
-                            [self._task(), self._alg().name(), sv.name(), vn]
-                        ),
-                    )
-                    valid = False
-                    continue
+            if not dawgie.db.util.verify(val):
+                log.critical(
+                    'offending item is %s',
+                    '.'.join([self._task(), self._alg().name(), sv.name(), vn]),
+                )
+                valid = False
+                continue
 
-                args = (
-                    'SELECT * from value where name = %s and '
-                    + 'sv_ID = %s and '
-                    + 'design = %s and bugfix = %s and implementation = %s;',
-                    (
+            primes.append(
+                (
+                    cache.value(
                         vn,
-                        sv_ID,
+                        sv_IDs[sv.name()],
                         val.design(),
-                        val.bugfix(),
                         val.implementation(),
+                        val.bugfix(),
                     ),
+                    result,
                 )
-                cur.execute(*args)
-                val_ID = cur.fetchone()
-                if val_ID is None:
-                    _insert(
-                        'INSERT into Value (name, sv_id, design, '
-                        + 'bugfix, implementation) values '
-                        + '(%s, %s, %s, %s, %s);',
-                        (
-                            vn,
-                            sv_ID,
-                            val.design(),
-                            val.bugfix(),
-                            val.implementation(),
-                        ),
-                    )
-                    cur.execute(*args)
-                    val_ID = cur.fetchone()
-                    pass
-                primes.append(
-                    (
-                        'INSERT into Prime (run_ID, task_ID, tn_ID, '
-                        + 'alg_ID, sv_ID, val_ID, blob_name) values '
-                        + '(%s, %s, %s, %s, %s, %s, %s)'
-                        + (
-                            ';'
-                            if self._runid()
-                            else ' ON CONFLICT ON CONSTRAINT prime_run_id_task_id_tn_id_alg_id_sv_id_val_id_key DO UPDATE SET blob_name = EXCLUDED.blob_name;'
-                        ),
-                        (
-                            self._runid(),
-                            task_ID,
-                            tn_ID,
-                            alg_ID,
-                            sv_ID,
-                            val_ID[0],
-                            result,
-                        ),
-                    )
-                )
-                pass
+            )
             pass
 
+        val_IDs = _new_IDs(
+            [key for key, _result in primes],
+            'Dataset update: Could not find value ID',
+        )
         cur.close()
         conn.close()  # psycopg3 problem # pylint:disable=no-member
 
@@ -823,109 +695,65 @@ class Interface(
                 + 'dawgie.Value correctly. See log for details.'
             )
 
-        conn = _conn(False)
-        cur = _cur(conn)
-        while primes:
-            try:
-                for args in primes:
-                    cur.execute(*args)
-                conn.commit()  # psycopg3 problem # pylint:disable=no-member
-                primes.clear()
-            except psycopg.errors.DeadlockDetected:
-                log.warning('Insert had a shared lock detected. Trying again')
-                conn.rollback()  # psycopg3 problem # pylint:disable=no-member
-                time.sleep(random.uniform(0.250, 0.750))
-            except psycopg.errors.UniqueViolation as err:
-                conn.rollback()  # psycopg3 problem # pylint:disable=no-member
-                if err.diag.constraint_name == 'prime_pkey':
-                    log.debug(
-                        'Insertion collision with another worker. Trying again'
-                    )
-                else:
-                    log.exception(
-                        'Trying to insert a duplicate row in the prime table'
-                    )
-                    raise
-            except psycopg.IntegrityError:
-                log.exception('Could not update because:')
-                conn.rollback()  # psycopg3 problem # pylint:disable=no-member
-        cur.close()
-        conn.close()  # psycopg3 problem # pylint:disable=no-member
+        _insert_primes(
+            [
+                (
+                    self._runid(),
+                    task_ID,
+                    tn_ID,
+                    alg_ID,
+                    key[2],
+                    val_IDs[key],
+                    result,
+                )
+                for key, result in primes
+            ],
+            'Insert',
+        )
         return
 
     def _update_msv(self, msv):
-        # pylint: disable=too-many-branches,too-many-locals,too-many-statements
         if self._alg().abort():
             raise dawgie.AbortAEError()
 
         log.debug("in Interface update process metrics")
-        conn = dawgie.db.post._conn()
-        cur = dawgie.db.post._cur(conn)
+        conn = _conn()
+        cur = _cur(conn)
+        tn_ID = self.__tn_id(cur)
+        task_ID = _dim_ID(
+            cur,
+            cache.task(self._task()),
+            'Dataset update: Could not find task ID',
+        )
+        alg_ID = _dim_ID(
+            cur,
+            cache.algorithm(
+                self._alg().name(),
+                task_ID,
+                self._alg().design(),
+                self._alg().implementation(),
+                self._alg().bugfix(),
+            ),
+            'Dataset update: Could not find algorithm ID',
+        )
+        sv_ID = _new_ID(
+            cur,
+            cache.statevector(
+                msv.name(),
+                alg_ID,
+                msv.design(),
+                msv.implementation(),
+                msv.bugfix(),
+            ),
+            'Update MSV: Could not find state vector ID',
+        )
         primes = []
         valid = True
         for vn, val in msv.items():
-            result = dawgie.db.util.move(*dawgie.db.util.encode(val))[0]
-            # Put result in primary. Make sure to get task_ID and other
-            # primary keys from their respective tables
-
-            # get the target ID
-            tn_ID = self.__tn_id(cur)
-
-            # Get task id that matches task name
-            cur.execute('SELECT * from TASK WHERE name = %s;', [self._task()])
-            task_ID = _fetchone(cur, 'Dataset update: Could not find task ID')
-
-            # Get Alg id
-            cur.execute(
-                'SELECT * from Algorithm WHERE name = %s and '
-                + 'task_ID = %s and '
-                + 'design = %s and bugfix = %s and implementation = %s;',
-                (
-                    self._alg().name(),
-                    task_ID,
-                    self._alg().design(),
-                    self._alg().bugfix(),
-                    self._alg().implementation(),
-                ),
-            )
-            alg_ID = _fetchone(
-                cur, 'Dataset update: Could not find ' + 'algorithm ID'
-            )
-
-            # Get state vector id that matches msv name
-            args = (
-                'SELECT * from StateVector WHERE name = %s and '
-                + 'alg_ID = %s and '
-                + 'design = %s and bugfix = %s and implementation = %s;',
-                (
-                    msv.name(),
-                    alg_ID,
-                    msv.design(),
-                    msv.bugfix(),
-                    msv.implementation(),
-                ),
-            )
-            cur.execute(*args)
-            sv_ID = cur.fetchone()
-
-            if sv_ID is None:
-                _insert(
-                    'INSERT into StateVector '
-                    + '(name, alg_ID, design, bugfix, '
-                    + 'implementation) values (%s, %s, %s, %s, %s);',
-                    (
-                        msv.name(),
-                        alg_ID,
-                        msv.design(),
-                        msv.bugfix(),
-                        msv.implementation(),
-                    ),
-                )
-                cur.execute(*args)
-                sv_ID = cur.fetchone()
-                pass
+            result = dawgie.db.util.move(
+                *dawgie.db.util.encode(val, msv.codec())
+            )[0]
 
-            # Get the value id that matches the value
             if not dawgie.db.util.verify(val):
                 log.critical(
                     'offending item is %s',
@@ -936,59 +764,24 @@ class Interface(
                 valid = False
                 continue
 
-            args = (
-                'SELECT * from Value where name = %s and '
-                + 'sv_ID = %s and '
-                + 'design = %s and bugfix = %s and implementation = %s;',
+            primes.append(
                 (
-                    vn,
-                    sv_ID[0],
-                    val.design(),
-                    val.bugfix(),
-                    val.implementation(),
-                ),
-            )
-            cur.execute(*args)
-            val_ID = cur.fetchone()
-
-            if val_ID is None:
-                _insert(
-                    'INSERT into Value (name, sv_id, design, '
-                    + 'bugfix, implementation) values '
-                    + '(%s, %s, %s, %s, %s);',
-                    (
+                    cache.value(
                         vn,
-                        sv_ID[0],
+                        sv_ID,
                         val.design(),
-                        val.bugfix(),
                         val.implementation(),
+                        val.bugfix(),
                     ),
-                )
-                cur.execute(*args)
-                val_ID = cur.fetchone()
-                pass
-            primes.append(
-                (
-                    'INSERT into Prime (run_ID, task_ID, tn_ID, '
-                    + 'alg_ID, sv_ID, val_ID, blob_name) values '
-                    + '(%s, %s, %s, %s, %s, %s, %s)'
-                    + (
-                        ';'
-                        if self._runid()
-                        else ' ON CONFLICT ON CONSTRAINT prime_run_id_task_id_tn_id_alg_id_sv_id_val_id_key DO UPDATE SET blob_name = EXCLUDED.blob_name;'
-                    ),
-                    (
-                        self._runid(),
-                        task_ID,
-                        tn_ID,
-                        alg_ID,
-                        sv_ID[0],
-                        val_ID[0],
-                        result,
-                    ),
+                    result,
                 )
             )
             pass
+
+        val_IDs = _new_IDs(
+            [key for key, _result in primes],
+            'Update MSV: Could not find value ID',
+        )
         cur.close()
         conn.close()  # psycopg3 problem # pylint:disable=no-member
 
@@ -999,35 +792,21 @@ class Interface(
                 + 'dawgie.Value correctly. See log for details.'
             )
 
-        conn = _conn(False)
-        cur = _cur(conn)
-        while primes:
-            try:
-                for args in primes:
-                    cur.execute(*args)
-                conn.commit()  # psycopg3 problem # pylint:disable=no-member
-                primes.clear()
-            except psycopg.errors.DeadlockDetected:
-                log.warning('Update MSV detected shared lock. Trying again')
-                conn.rollback()  # psycopg3 problem # pylint:disable=no-member
-                time.sleep(random.uniform(0.250, 0.750))
-            except psycopg.errors.UniqueViolation as err:
-                conn.rollback()  # psycopg3 problem # pylint:disable=no-member
-                if err.diag.constraint_name == 'prime_pkey':
-                    log.debug(
-                        'Insertion collision with another worker. Trying again'
-                    )
-                else:
-                    log.exception(
-                        'Trying to insert a duplicate row in the prime table'
-                    )
-                    raise
-            except psycopg.IntegrityError:
-                log.exception('Update MSV could not insert because:')
-                conn.rollback()  # psycopg3 problem # pylint:disable=no-member
-            pass
-        cur.close()
-        conn.close()  # psycopg3 problem # pylint:disable=no-member
+        _insert_primes(
+            [
+                (
+                    self._runid(),
+                    task_ID,
+                    tn_ID,
+                    alg_ID,
+                    sv_ID,
+                    val_IDs[key],
+                    result,
+                )
+                for key, result in primes
+            ],
+            'Update MSV',
+        )
         return
 
     def ds(self):
@@ -1048,6 +827,25 @@ class MyVersion(dawgie.Version):
     pass
 
 
+def _advance_latest(cur, rows: [(int, int, int, int, int)]):
+    '''move Latest up to the run_ID of rows
+
+    Rows are (tn_ID, task_ID, alg_ID, sv_ID, run_ID) that were just written
+    to Prime. Call it in the same transaction as the write so that Latest
+    always agrees with Prime.
+    '''
+    latest = {}
+    for row in rows:
+        latest[row[:4]] = max(row[4], latest.get(row[:4], row[4]))
+        pass
+    statements.executemany(
+        cur,
+        'latest_advance',
+        [key + (run_ID,) for key, run_ID in sorted(latest.items())],
+    )
+    return
+
+
 def _append_ver(d: dict, k: str, v: str):
     if k not in d:
         d[k] = []
@@ -1056,9 +854,7 @@ def _append_ver(d: dict, k: str, v: str):
 
 
 def _conn(autocommit=True):
-    uri = f'postgresql://{dawgie.context.db_path}@{dawgie.context.db_host}:{dawgie.context.db_port}/{dawgie.context.db_name}'
-    log.debug('using URI: %s', uri)
-    return psycopg.connect(uri, autocommit=autocommit)
+    return pool.checkout(_uri(), autocommit)
 
 
 def _cur(conn, real_dict=False):
@@ -1069,6 +865,37 @@ def _cur(conn, real_dict=False):
     )
 
 
+def _dim_ID(cur, key: tuple, text: str = None):
+    '''primary key of the dimension table row described by key
+
+    key is made by one of the dawgie.db.post.cache key functions. The cache is
+    asked first then the database. When the row does not exist, None is
+    returned unless text is given, in which case RuntimeError(text) is raised.
+    '''
+    pk = cache.fetch(key)
+
+    if pk is None:
+        if key[0] in cache.PARENT:
+            statements.execute(
+                cur,
+                'versioned_pk',
+                key[1:],
+                parent=cache.PARENT[key[0]],
+                table=key[0],
+            )
+        else:
+            statements.execute(cur, 'dim_pk', key[1:], table=key[0])
+        row = cur.fetchone()
+
+        if row is not None:
+            pk = row[0]
+            cache.store(key, pk)
+        elif text:
+            raise RuntimeError(text)
+        pass
+    return pk
+
+
 def _fetchone(cur, text):
     try:
         result = cur.fetchone()[0]
@@ -1079,24 +906,12 @@ def _fetchone(cur, text):
     return result
 
 
-def _find(da: [dict], **kwds) -> dict:
-    '''search dictionary
+def _insert(name: str, args, key: tuple = None, **fields):
+    '''execute the INSERT statement name retrying when deadlocked
 
-    Finds the dictionary in the list that has all of the kwds and values given
-    in the call as keywords.
+    When key is given, the statement must be RETURNING PK and the primary key
+    returned is stored in the dimension cache under key.
     '''
-    result = None
-    for d in da:
-        if all((k in d for k in kwds)):
-            if all((d[k] == v for k, v in kwds.items())):
-                result = d
-                break
-            pass
-        pass
-    return result
-
-
-def _insert(*args):
     again = True
     conn = _conn(False)
     cursor = _cur(conn)
@@ -1104,9 +919,13 @@ def _insert(*args):
     while again:
         again = False
         try:
-            cursor.execute(*args)
+            statements.execute(cursor, name, args, **fields)
+            row = cursor.fetchone() if key else None
             conn.commit()  # psycopg3 problem # pylint:disable=no-member
             success = True
+
+            if row:
+                cache.store(key, row[0])
         except psycopg.errors.DeadlockDetected:
             log.warning('Shared lock problem failure. Trying again.')
             again = True
@@ -1125,60 +944,307 @@ def _insert(*args):
     return success
 
 
-def _prime_keys():
-    if not dawgie.db.post._db:
-        raise RuntimeError('called _prime_keys before open')
+def _insert_primes(rows: [tuple], what: str):
+    '''insert rows into Prime as a single transaction
 
-    conn = _conn()
-    cur = _cur(conn, True)
-    cur.execute('SELECT * from Prime;')
-    ids = cur.fetchall()
-    conn.commit()  # psycopg3 problem # pylint:disable=no-member
-    cur.close()
-    cur = _cur(conn)
-    cur.execute('SELECT PK,name from Target;')
-    tgtn = dict(cur.fetchall())
-    cur.execute('SELECT PK,name from Task;')
-    tskn = dict(cur.fetchall())
-    cur.execute('SELECT PK,name from Algorithm;')
-    algn = dict(cur.fetchall())
-    cur.execute('SELECT PK,name from StateVector;')
-    svn = dict(cur.fetchall())
-    cur.execute('SELECT PK,name from Value;')
-    vn = dict(cur.fetchall())
-    conn.commit()  # psycopg3 problem # pylint:disable=no-member
+    Each row is (run_ID, task_ID, tn_ID, alg_ID, sv_ID, val_ID, blob_name) and
+    all rows belong to the same run. They are sent with executemany() in
+    pipeline mode so that the batch costs a round trip instead of one per row.
+    The whole batch is retried when deadlocked or when it collides with
+    another worker on the primary key. The what is used in the log messages.
+    '''
+    if not rows:
+        return
+
+    name = 'prime_insert' if rows[0][0] else 'prime_upsert'
+    conn = _conn(False)
+    cur = _cur(conn)
+    while rows:
+        try:
+            with conn.pipeline():
+                statements.executemany(cur, name, rows)
+                _advance_latest(
+                    cur, [(r[2], r[1], r[3], r[4], r[0]) for r in rows]
+                )
+                pass
+            conn.commit()  # psycopg3 problem # pylint:disable=no-member
+            rows = []
+        except psycopg.errors.DeadlockDetected:
+            log.warning('%s detected a shared lock. Trying again', what)
+            conn.rollback()  # psycopg3 problem # pylint:disable=no-member
+            time.sleep(random.uniform(0.250, 0.750))
+        except psycopg.errors.UniqueViolation as err:
+            conn.rollback()  # psycopg3 problem # pylint:disable=no-member
+            if err.diag.constraint_name == 'prime_pkey':
+                log.debug(
+                    'Insertion collision with another worker. Trying again'
+                )
+            else:
+                log.exception(
+                    'Trying to insert a duplicate row in the prime table'
+                )
+                raise
+        except psycopg.IntegrityError:
+            log.exception('%s could not insert because:', what)
+            conn.rollback()  # psycopg3 problem # pylint:disable=no-member
+        pass
     cur.close()
     conn.close()  # psycopg3 problem # pylint:disable=no-member
-    keys = {
-        (
-            '.'.join(
-                [
-                    str(i['run_id']),
-                    tgtn[i['tn_id']],
-                    tskn[i['task_id']],
-                    algn[i['alg_id']],
-                    svn[i['sv_id']],
-                    vn[i['val_id']],
-                ]
+    return
+
+
+def _iter_prime_keys():
+    '''stream the sorted unique keys runid.target.task.alg.sv.value'''
+    if not dawgie.db.post._db:
+        raise RuntimeError('called _iter_prime_keys before open')
+
+    # COLLATE "C" sorts like python sorts str
+    for row in _stream('prime_keys'):
+        yield row[0]
+    return
+
+
+def _iter_prime_values():
+    '''stream the blob names of the Prime table'''
+    if not dawgie.db.post._db:
+        raise RuntimeError('called _iter_prime_values before open')
+
+    for row in _stream('prime_values'):
+        yield row[0]
+    return
+
+
+def _last_runid(cur) -> int:
+    return statements.execute(cur, 'last_runid').fetchone()[0]
+
+
+def _new_ID(cur, key: tuple, text: str = None):
+    '''same as _dim_ID() but adds the row when it does not yet exist'''
+    pk = _dim_ID(cur, key)
+
+    if pk is None:
+        if key[0] in cache.PARENT:
+            _insert(
+                'versioned_insert',
+                key[1:],
+                key=key,
+                parent=cache.PARENT[key[0]],
+                table=key[0],
             )
-        )
-        for i in ids
-    }
-    return sorted(keys)
+        else:
+            _insert('dim_insert', key[1:], key=key, table=key[0])
+        pk = _dim_ID(cur, key, text)
+        pass
+    return pk
+
+
+def _new_IDs(keys: [tuple], text: str = None) -> {tuple: int}:
+    '''same as _new_ID() for many keys of one Algorithm/StateVector/Value table
+
+    The keys that are not cached are looked up and added with a single
+    multi-row upsert rather than a SELECT and an INSERT for each one of them.
+    Returns a dictionary of key to primary key.
+    '''
+    return _register(lambda cur: _register_IDs(cur, keys, text))
+
+
+def _prime_keys():
+    if not dawgie.db.post._db:
+        raise RuntimeError('called _prime_keys before open')
+    return list(_iter_prime_keys())
 
 
 def _prime_values():
     if not dawgie.db.post._db:
         raise RuntimeError('called _prime_values before open')
+    return list(_iter_prime_values())
+
 
+def _prefetch_blobs(entries: [ENTRY]) -> {ENTRY: (str, dawgie.VERSION)}:
+    '''the blob name and value version of every one of entries in Prime'''
     conn = _conn()
     cur = _cur(conn)
-    cur.execute('SELECT blob_name from Prime;')
-    vals = cur.fetchall()
-    conn.commit()  # psycopg3 problem # pylint:disable=no-member
+    statements.execute(
+        cur, 'prefetch', [list(column) for column in zip(*entries)]
+    )
+    result = {
+        ENTRY(*row[:6]): (row[6], dawgie.VERSION(*row[7:])) for row in cur
+    }
     cur.close()
     conn.close()  # psycopg3 problem # pylint:disable=no-member
-    return [v[0] for v in vals]
+    return result
+
+
+def _recount_latest(cur, tn_ID: int, task_ID: int, alg_IDs: [], sv_IDs: []):
+    '''rebuild Latest from Prime after rows were removed from Prime'''
+    args = [tn_ID, task_ID, alg_IDs, sv_IDs]
+    statements.execute(cur, 'latest_delete', args)
+    statements.execute(cur, 'latest_recount', args)
+    return
+
+
+def _referenced(names: [str]) -> {str}:
+    '''the blob names in names that a row of the Prime table refers to'''
+    if not dawgie.db.post._db:
+        raise RuntimeError('called _referenced before open')
+
+    conn = _conn()
+    cur = _cur(conn)
+    statements.execute(cur, 'known_blobs', [list(names)])
+    result = {row[0] for row in cur}
+    cur.close()
+    conn.close()  # psycopg3 problem # pylint:disable=no-member
+    return result
+
+
+def _register(work) -> {tuple: int}:
+    '''call work(cur) in a transaction of its own retrying when deadlocked
+
+    work returns a dictionary of dimension key to primary key for the rows it
+    found or added. They are cached once the transaction commits and returned.
+    '''
+    conn = _conn(False)
+    cursor = _cur(conn)
+    pks = None
+    try:
+        while pks is None:
+            try:
+                pks = work(cursor)
+                conn.commit()  # psycopg3 problem # pylint:disable=no-member
+            except psycopg.errors.DeadlockDetected:
+                log.warning('Shared lock problem failure. Trying again.')
+                pks = None
+                conn.rollback()  # psycopg3 problem # pylint:disable=no-member
+                time.sleep(random.uniform(0.250, 0.750))
+            pass
+    finally:
+        cursor.close()
+        conn.close()  # psycopg3 problem # pylint:disable=no-member
+    for key, pk in pks.items():
+        cache.store(key, pk)
+    return pks
+
+
+def _register_IDs(cur, keys: [tuple], text: str = None) -> {tuple: int}:
+    '''primary keys of keys adding the rows that do not yet exist
+
+    All of keys belong to the same Algorithm, StateVector, or Value table. The
+    rows are added within the transaction of cur so nothing is cached here;
+    see _register().
+    '''
+    pks = {}
+    for key in keys:
+        pk = cache.fetch(key)
+
+        if pk is not None:
+            pks[key] = pk
+        pass
+    # sorted so that concurrent workers lock the unique index in the same order
+    missing = sorted({key for key in keys if key not in pks})
+
+    if missing:
+        table = missing[0][0]
+        statements.execute(
+            cur,
+            'versioned_upsert',
+            [list(column) for column in zip(*missing)][1:],
+            parent=cache.PARENT[table],
+            table=table,
+        )
+        for row in cur.fetchall():
+            pks[(table, *row[1:])] = row[0]
+            pass
+        # rows committed by another worker during the upsert are not seen by it
+        for key in missing:
+            if key not in pks:
+                statements.execute(
+                    cur,
+                    'versioned_pk',
+                    key[1:],
+                    parent=cache.PARENT[table],
+                    table=table,
+                )
+                pks[key] = _fetchone(cur, text)
+            pass
+        pass
+    return pks
+
+
+def _ref_IDs(cur, ref: REF) -> (int, int, int, int):
+    '''primary keys for the task, algorithm, state vector, and value of ref'''
+    task_ID = _dim_ID(
+        cur, cache.task(ref.tid.name), f'Task "{ref.tid.name}" is not known'
+    )
+    alg_ID = _dim_ID(
+        cur,
+        cache.algorithm(
+            ref.aid.name,
+            task_ID,
+            ref.aid.version.design(),
+            ref.aid.version.implementation(),
+            ref.aid.version.bugfix(),
+        ),
+        f'consistent(): Algorithm "{ref.aid.name} {ref.aid.version.asstring()}" is not singular',
+    )
+    sv_ID = _dim_ID(
+        cur,
+        cache.statevector(
+            ref.sid.name,
+            alg_ID,
+            ref.sid.version.design(),
+            ref.sid.version.implementation(),
+            ref.sid.version.bugfix(),
+        ),
+        f'consistent(): SV "{ref.sid.name} {ref.sid.version.asstring()}" is not singular',
+    )
+    v_ID = _dim_ID(
+        cur,
+        cache.value(
+            ref.vid.name,
+            sv_ID,
+            ref.vid.version.design(),
+            ref.vid.version.implementation(),
+            ref.vid.version.bugfix(),
+        ),
+        f'consistent(): Value "{ref.vid.name} {ref.vid.version.asstring()}" is not singular',
+    )
+    return task_ID, alg_ID, sv_ID, v_ID
+
+
+def _stream(name: str, args=None):
+    '''yield the rows of the statement name from a server-side cursor
+
+    The rows are fetched dawgie.context.db_fetch_size at a time so that a scan
+    of a whole table never holds the table in memory. The cursor needs a
+    transaction so the connection is held until the generator is exhausted or
+    closed. A server-side cursor cannot use a prepared statement so the whole
+    scan, including the time the caller spends between rows, is what is
+    counted for name.
+    '''
+    begin = time.perf_counter()
+    conn = _conn(False)
+    rows = 0
+    try:
+        with conn.cursor(name='dawgie_stream') as cur:
+            cur.itersize = max(1, dawgie.context.db_fetch_size)
+            cur.execute(statements.sql(name), args)
+            for row in cur:
+                rows += 1
+                yield row
+                pass
+            pass
+        conn.commit()  # psycopg3 problem # pylint:disable=no-member
+    except GeneratorExit:  # closed before the end of the rows
+        conn.rollback()  # psycopg3 problem # pylint:disable=no-member
+        raise
+    finally:
+        conn.close()  # psycopg3 problem # pylint:disable=no-member
+        statements.record(name, time.perf_counter() - begin, rows)
+    return
+
+
+def _uri():
+    return f'postgresql://{dawgie.context.db_path}@{dawgie.context.db_host}:{dawgie.context.db_port}/{dawgie.context.db_name}'
 
 
 def add(target_name: str) -> bool:
@@ -1186,15 +1252,14 @@ def add(target_name: str) -> bool:
         raise RuntimeError('called connect before open')
 
     conn = _conn()
-    cur = _cur(conn, True)
-    exists = False
-    cur.execute('SELECT pk from Target WHERE name = %s;', [target_name])
-    pk = cur.fetchone()
+    cur = _cur(conn)
+    exists = _dim_ID(cur, cache.target(target_name)) is not None
 
-    if pk:
-        exists = len(pk) == 1
-    else:
-        exists = _insert('INSERT into Target (name) values (%s)', [target_name])
+    if not exists:
+        exists = _insert(
+            'target_insert', [target_name], key=cache.target(target_name)
+        )
+        SearchImplementation.invalidate()
 
     cur.close()
     conn.close()  # psycopg3 problem # pylint:disable=no-member
@@ -1202,7 +1267,14 @@ def add(target_name: str) -> bool:
 
 
 def archive(done):
-    bfn = dawgie.context.db_name + '.{:02d}.bck'
+    '''archive the database without waiting for the archive to finish
+
+    The archive is written by dawgie.db.post.backup on a thread of its own
+    from a single snapshot of the database so that the pipeline can keep
+    running while it is written. The thread has a connection of its own
+    rather than one from the pool, which it would hold for the whole archive.
+    The archive is skipped when the previous one is still being written.
+    '''
     path = dawgie.context.db_rotate_path
 
     if not (os.path.exists(path) and os.path.isdir(path)):
@@ -1210,30 +1282,11 @@ def archive(done):
             'The path "' + path + '" does not exist or is not a directory'
         )
 
-    for i in range(int(dawgie.context.db_rotate) - 1, 0, -1):
-        ffn = os.path.join(path, bfn.format(i - 1))
-        nfn = os.path.join(path, bfn.format(i))
-
-        if os.path.exists(ffn):
-            shutil.move(ffn, nfn)
-        pass
-    args = [
-        '/usr/bin/pg_dump',
-        '-h',
-        dawgie.context.db_host,
-        '-p',
-        f'{dawgie.context.db_port:d}',
-        '-U',
-        dawgie.context.db_path.split(':')[0],
-        '-d',
-        dawgie.context.db_name,
-        '-f',
-        os.path.join(path, bfn.format(0)),
-    ]
-    handler = ArchiveHandler(' '.join(args), done)
-    twisted.internet.reactor.spawnProcess(
-        handler, args[0], args=args, env=os.environ
-    )
+    if backup.busy():
+        log.warning('skipping the archive because one is still being written')
+    else:
+        backup.start(psycopg.connect(_uri()), path)
+    done()
     return
 
 
@@ -1251,246 +1304,62 @@ def connect(alg, bot, tn):
 
 
 def consistent(inputs: [REF], outputs: [REF], target_name: str) -> ():
-    # pylint: disable=too-many-branches,too-many-locals,too-many-statements
+    return consistent_many(inputs, outputs, [target_name])[target_name]
+
+
+def consistent_many(
+    inputs: [REF], outputs: [REF], target_names: [str]
+) -> {str: ()}:
+    # pylint: disable=too-many-locals
     if not dawgie.db.post._db:
         raise RuntimeError('called consistent before open')
 
     conn = dawgie.db.post._conn()
     cur = dawgie.db.post._cur(conn)
-    cur.execute('SELECT pk FROM Target WHERE name = %s;', [target_name])
-    tn_ID = _fetchone(cur, f'Target "{target_name}" is listed more than once')
-    # 1: Find all the times this version ran and collect the run IDs
-    o_runids = []
-    for output in outputs:
-        cur.execute('SELECT pk FROM Task WHERE name = %s;', [output.tid.name])
-        task_ID = _fetchone(
-            cur, (f'Task "{output.tid.name}" is listed more than once')
-        )
-        cur.execute(
-            'SELECT pk FROM Algorithm WHERE name = %s AND '
-            + 'task_ID = %s AND design = %s AND implementation = %s '
-            + 'AND bugfix = %s;',
-            (
-                output.aid.name,
-                task_ID,
-                output.aid.version.design(),
-                output.aid.version.implementation(),
-                output.aid.version.bugfix(),
-            ),
-        )
-        alg_ID = _fetchone(
-            cur,
-            f'consistent(): Algorithm "{output.aid.name} {output.aid.version.asstring()}" is not singular',
-        )
-        cur.execute(
-            'SELECT pk FROM StateVector WHERE name = %s AND '
-            + 'alg_ID = %s AND design = %s AND implementation = %s '
-            + 'AND bugfix = %s;',
-            (
-                output.sid.name,
-                alg_ID,
-                output.sid.version.design(),
-                output.sid.version.implementation(),
-                output.sid.version.bugfix(),
-            ),
-        )
-        sv_ID = _fetchone(
-            cur,
-            f'consistent(): SV "{output.sid.name} {output.sid.version.asstring()}" is not singular',
-        )
-        cur.execute(
-            'SELECT pk FROM Value WHERE name = %s AND '
-            + 'sv_ID = %s AND design = %s AND implementation = %s '
-            + 'AND bugfix = %s;',
-            (
-                output.vid.name,
-                sv_ID,
-                output.vid.version.design(),
-                output.vid.version.implementation(),
-                output.vid.version.bugfix(),
-            ),
-        )
-        v_ID = _fetchone(
-            cur,
-            f'consistent(): Value "{output.vid.name} {output.vid.version.asstring()}" is not singular',
-        )
-        cur.execute(
-            'SELECT run_ID FROM Prime WHERE tn_ID = %s AND '
-            + 'task_ID = %s AND alg_ID = %s AND sv_ID = %s AND '
-            + 'val_ID = %s;',
-            [tn_ID, task_ID, alg_ID, sv_ID, v_ID],
-        )
-        o_runids.append({runid[0] for runid in cur.fetchall()})
-        pass
-    o_runids = sorted(set.intersection(*o_runids), reverse=True)
-
-    # 2: If there are no run IDs with this output, then return empty tuple
-    if not o_runids:
-        cur.close()
-        conn.close()  # psycopg3 problem # pylint:disable=no-member
-        log.debug('step 1: no run ids with this output')
-        return tuple()
-
-    # 3: Find all of the inputs keyed by name and save runid,blobname
-    i_runids = {}
-    ridbns = {}
+    tn_IDs = {
+        _dim_ID(cur, cache.target(tn), f'Target "{tn}" is not known'): tn
+        for tn in target_names
+    }
+    outs = list(dict.fromkeys(_ref_IDs(cur, output) for output in outputs))
+    keys = {}
+    ins = []
     for inp in inputs:
-        key = '.'.join([inp.tid.name, inp.aid.name])
-        if key not in i_runids:
-            i_runids[key] = []
-        if key not in ridbns:
-            ridbns[key] = []
-
-        cur.execute('SELECT pk FROM Task WHERE name = %s;', [inp.tid.name])
-        task_ID = _fetchone(
-            cur, f'Task "{inp.tid.name}" is listed more than once'
-        )
-        cur.execute(
-            'SELECT pk FROM Algorithm WHERE name = %s AND ' + 'task_ID = %s;',
-            (inp.aid.name, task_ID),
-        )
-        alg_IDs = list({pk[0] for pk in cur.fetchall()})
-        cur.execute(
-            'SELECT pk FROM StateVector WHERE name = %s AND '
-            + 'alg_ID = ANY(%s);',
-            [inp.sid.name, alg_IDs],
-        )
-        sv_IDs = list({pk[0] for pk in cur.fetchall()})
-        cur.execute(
-            'SELECT pk FROM Value WHERE name = %s AND sv_ID = ANY(%s);',
-            [inp.vid.name, sv_IDs],
-        )
-        val_IDs = list({pk[0] for pk in cur.fetchall()})
-        cur.execute(
-            'SELECT run_ID,blob_name FROM Prime WHERE tn_ID = %s AND '
-            + 'task_ID = %s AND alg_ID = ANY(%s) AND '
-            + 'sv_ID = ANY(%s) AND val_ID = ANY(%s);',
-            [tn_ID, task_ID, alg_IDs, sv_IDs, val_IDs],
-        )
-        ridbns[key].append(sorted(cur.fetchall(), key=lambda t: t[0]))
-        kval = ridbns[key][-1][-1][1]
-        i_runids[key].append(
-            {
-                runid
-                for runid, _bn in filter(
-                    lambda t, k=kval: t[1] == k, ridbns[key][-1]
-                )
-            }
-        )
-        pass
-    for key in i_runids.copy():
-        i_runids[key] = sorted(set.intersection(*i_runids[key]), reverse=True)
-        pass
-
-    # 4: If there are no run input IDs with version, then return empty tuple
-    if any((not v for v in i_runids.values())):
-        cur.close()
-        conn.close()  # psycopg3 problem # pylint:disable=no-member
-        log.debug('Step 3: no input runids - %s %s', str(key), str(i_runids))
-        return tuple()
-
-    # 5: Use runids from (1) and (3) to find when in time to promote
-    # -- Here is the trick:
-    # --   Use the m_runids to find the corresponding i_runids. If they match
-    # --   and the input matching the constraint has the good runid in both
-    # --   the we can promote. Matching constraints was done in (5) by reducing
-    # --   possible outputs to between matching blob rids and all rids for that
-    # --   constraint. Therefore only to check that there is a consistent runid
-    # --   for i_runids and m_runids.
-    runid = None
-    for rid in o_runids:
-        match = {key: -3 for key in i_runids}
-        for key, value in i_runids.items():
-            m = -2
-            for r in value:
-                if r <= rid:
-                    m = r
-                    break
-                pass
-            match[key] = m
-            pass
-
-        if all((0 <= vrid for vrid in match.values())):
-            runid = rid
-            break
-        pass
-
-    # 6: If no workable runID found, then return empty tuple
-    if not runid:
-        cur.close()
-        conn.close()  # psycopg3 problem # pylint:disable=no-member
-        log.debug(
-            'step 5: no run ids found -- %s %s', str(o_runids), str(i_runids)
-        )
-        return tuple()
-
-    # 7: Build the juncture from the runid and output
-    juncture = []
-    for output in outputs:
-        cur.execute('SELECT pk FROM Task WHERE name = %s;', [output.tid.name])
-        task_ID = _fetchone(
-            cur, f'Task "{output.tid.name}" is listed more than once'
-        )
-        cur.execute(
-            'SELECT pk FROM Algorithm WHERE name = %s AND '
-            + 'task_ID = %s AND design = %s AND implementation = %s '
-            + 'AND bugfix = %s;',
+        ins.append(
             (
-                output.aid.name,
-                task_ID,
-                output.aid.version.design(),
-                output.aid.version.implementation(),
-                output.aid.version.bugfix(),
-            ),
-        )
-        alg_ID = _fetchone(
-            cur,
-            f'consistent(): Algorithm "{output.aid.name} {output.aid.version.asstring()}" is not singular',
-        )
-        cur.execute(
-            'SELECT pk FROM StateVector WHERE name = %s AND '
-            + 'alg_ID = %s AND design = %s AND implementation = %s '
-            + 'AND bugfix = %s;',
-            (
-                output.sid.name,
-                alg_ID,
-                output.sid.version.design(),
-                output.sid.version.implementation(),
-                output.sid.version.bugfix(),
-            ),
-        )
-        sv_ID = _fetchone(
-            cur,
-            f'consistent(): SV "{output.sid.name} {output.sid.version.asstring()}" is not singular',
-        )
-        cur.execute(
-            'SELECT pk FROM Value WHERE name = %s AND '
-            + 'sv_ID = %s AND design = %s AND implementation = %s '
-            + 'AND bugfix = %s;',
-            (
-                output.vid.name,
-                sv_ID,
-                output.vid.version.design(),
-                output.vid.version.implementation(),
-                output.vid.version.bugfix(),
-            ),
-        )
-        v_ID = _fetchone(
-            cur,
-            f'consistent(): Value "{output.vid.name} {output.vid.version.asstring()}" is not singular',
-        )
-        cur.execute(
-            'SELECT blob_name FROM Prime WHERE run_id = %s AND '
-            + 'tn_ID = %s AND task_ID = %s AND alg_ID = %s AND '
-            + 'sv_ID = %s AND val_ID = %s;',
-            [runid, tn_ID, task_ID, alg_ID, sv_ID, v_ID],
+                keys.setdefault(
+                    '.'.join([inp.tid.name, inp.aid.name]), len(keys)
+                ),
+                _dim_ID(
+                    cur,
+                    cache.task(inp.tid.name),
+                    f'Task "{inp.tid.name}" is not known',
+                ),
+                inp.aid.name,
+                inp.sid.name,
+                inp.vid.name,
+            )
         )
-        bn = _fetchone(cur, 'No matchiing entry')
-        juncture.append((tn_ID, task_ID, alg_ID, sv_ID, v_ID, bn))
+        pass
+    ins = list(dict.fromkeys(ins))
+    statements.execute(
+        cur,
+        'consistent',
+        [list(tn_IDs), list(range(len(outs)))]
+        + [list(column) for column in zip(*outs)]
+        + ([list(column) for column in zip(*ins)] if ins else [[]] * 5),
+    )
+    junctures = {tn: [] for tn in tn_IDs.values()}
+    for row in cur:
+        junctures[tn_IDs[row[0]]].append(row)
         pass
     cur.close()
     conn.close()  # psycopg3 problem # pylint:disable=no-member
-    return juncture
+    log.debug(
+        'consistent: found junctures for %d of %d targets',
+        sum(1 for j in junctures.values() if j),
+        len(junctures),
+    )
+    return {tn: (j if j else tuple()) for tn, j in junctures.items()}
 
 
 def copy(_dst, _method, _gateway):
@@ -1503,75 +1372,80 @@ def gather(anz, ans):
     return Interface(anz, ans, '__all__')
 
 
-def metrics(after_runid: int = -1) -> '[dawgie.db.MetricData]':
+def iter_metrics(after_runid: int = -1):
+    '''stream the dawgie.db.MetricData after after_runid'''
     if not dawgie.db.post._db:
-        raise RuntimeError('called metrics before open')
-
-    result = []
-    conn = dawgie.db.post._conn()
-    cur = dawgie.db.post._cur(conn)
-    cur.execute('SELECT PK from StateVector WHERE name = %s;', ('__metric__',))
-    sv_IDs = [t[0] for t in cur.fetchall()]
-    if after_runid is None or after_runid < 0:
-        cur.execute('SELECT * from Prime WHERE sv_ID = ANY(%s);', (sv_IDs,))
-    else:
-        cur.execute(
-            'SELECT * from Prime WHERE sv_ID = ANY(%s) '
-            'AND (run_ID > %s OR run_ID = %s);',
-            (sv_IDs, after_runid, 0),
-        )
+        raise RuntimeError('called iter_metrics before open')
 
-    rows = cur.fetchall()
     md = dawgie.util.metrics.filled(-2)
-    svs = {
-        k: dawgie.util.MetricStateVector(md, md)
-        for k in {tuple(row[1:5]) for row in rows}
-    }
-    cur.execute('SELECT PK,name from Value;')
-    vt = dict(cur.fetchall())
-    for row in rows:
-        svs[tuple(row[1:5])][vt[row[6]]] = dawgie.util.metrics.LazyMetricValue(
-            row[7]
-        )
-    cur.execute('SELECT PK,name,design,implementation,bugfix FROM Algorithm;')
-    at = {t[0]: t[1:] for t in cur.fetchall()}
-    cur.execute('SELECT PK,name FROM Target;')
-    Tt = dict(cur.fetchall())
-    cur.execute('SELECT PK,name FROM Task;')
-    tt = dict(cur.fetchall())
-    for key, msv in svs.items():
-        result.append(
-            dawgie.db.MetricData(
-                alg_name=at[key[3]][0],
-                alg_ver=dawgie.VERSION(*at[key[3]][1:]),
-                run_id=key[0],
-                sv=msv,
-                target=Tt[key[2]],
-                task=tt[key[1]],
-            )
+    # run IDs are never negative so -1 is all of them
+    rows = _stream(
+        'metrics', [-1 if after_runid is None else max(-1, after_runid)]
+    )
+    for _key, group in itertools.groupby(rows, key=lambda row: row[:4]):
+        group = list(group)
+        msv = dawgie.util.MetricStateVector(md, md)
+        for row in group:
+            msv[row[10]] = dawgie.util.metrics.LazyMetricValue(row[11])
+            pass
+        yield dawgie.db.MetricData(
+            alg_name=group[0][6],
+            alg_ver=dawgie.VERSION(*group[0][7:10]),
+            run_id=group[0][0],
+            sv=msv,
+            target=group[0][5],
+            task=group[0][4],
         )
         pass
+    return
+
+
+def last_runid() -> int:
+    if not dawgie.db.post._db:
+        raise RuntimeError('called last_runid before open')
+
+    conn = _conn()
+    cur = _cur(conn)
+    runID = _last_runid(cur)
     cur.close()
     conn.close()  # psycopg3 problem # pylint:disable=no-member
-    return result
+    return runID
+
+
+def metrics(after_runid: int = -1) -> '[dawgie.db.MetricData]':
+    if not dawgie.db.post._db:
+        raise RuntimeError('called metrics before open')
+    return list(iter_metrics(after_runid))
 
 
 # pylint: disable=redefined-builtin
-def next():
+def next(event: str = None):
+    '''allocate the next run ID and record what triggered it
+
+    Run is locked while allocating so that concurrent calls never share a run
+    ID. The run ID is also past any in Prime in case values were written with
+    a run ID that was never allocated. When Prime is partitioned, the
+    partition for the run ID is made here before anything is written to it.
+    '''
     log.debug("in Next")
-    # Get next run id
     if not dawgie.db.post._db:
         raise RuntimeError('called next before connect')
 
-    # Insert value into Run table to increment the PK that serves as RUN ID
-    conn = _conn()
+    conn = _conn(False)
     cur = _cur(conn)
-    cur.execute('SELECT MAX(run_ID) from Prime;')
-    runIDrow = cur.fetchone()
-    runID = (runIDrow[0] if runIDrow and runIDrow[0] else 0) + 1
-    conn.commit()  # psycopg3 problem # pylint:disable=no-member
-    cur.close()
-    conn.close()  # psycopg3 problem # pylint:disable=no-member
+    try:
+        cur.execute('LOCK TABLE Run IN SHARE ROW EXCLUSIVE MODE;')
+        statements.execute(
+            cur, 'next_runid', [event, str(dawgie.context.git_rev)]
+        )
+        runID = cur.fetchone()[0]
+        conn.commit()  # psycopg3 problem # pylint:disable=no-member
+        SearchImplementation.invalidate()
+        if 0 < dawgie.context.db_partition_size:
+            partition.ensure(cur, runID, dawgie.context.db_partition_size)
+    finally:
+        cur.close()
+        conn.close()  # psycopg3 problem # pylint:disable=no-member
     return runID
 
 
@@ -1658,6 +1532,13 @@ def open():
     except psycopg.ProgrammingError:
         pass
     conn.commit()  # psycopg3 problem # pylint:disable=no-member
+    schema.migrate(cur)
+    if 0 < dawgie.context.db_partition_size:
+        partition.convert(cur, dawgie.context.db_partition_size)
+        partition.ensure(
+            cur, _last_runid(cur) + 1, dawgie.context.db_partition_size
+        )
+    cache.warm(cur, _uri())
     cur.close()
     conn.close()  # psycopg3 problem # pylint:disable=no-member
     dawgie.db.post._db = True
@@ -1673,25 +1554,24 @@ def promote(juncture: (), runid: int):
     #    that a different version of same value is not already written. Throw an
     #    exception if something already exists or just log it? Log at first to
     #    prevent killing of main twisted thread.
+    #
+    # The juncture may hold the rows of many targets so that a whole wave of
+    # promotions from consistent_many() is checked and written at once.
     if not dawgie.db.post._db:
         raise RuntimeError('called promote before open')
 
+    if not juncture:
+        return True
+
+    columns = [list(column) for column in zip(*juncture)]
     conn = dawgie.db.post._conn()
     cur = dawgie.db.post._cur(conn)
-    entries = []
-    for tn_ID, task_ID, alg_ID, sv_ID, v_ID, _bn in juncture:
-        cur.execute(
-            'SELECT blob_name FROM Prime WHERE run_ID = %s AND '
-            + 'tn_ID = %s AND task_ID = %s AND alg_ID = %s AND '
-            + 'sv_ID = %s AND val_ID = %s;',
-            [runid, tn_ID, task_ID, alg_ID, sv_ID, v_ID],
-        )
-        entries.extend([e[0] if e else None for e in cur.fetchall()])
-        pass
+    statements.execute(cur, 'promoted', columns[:5] + [runid])
+    exists = cur.fetchone()[0]
     cur.close()
     conn.close()  # psycopg3 problem # pylint:disable=no-member
 
-    if any((e is not None for e in entries)):
+    if exists:
         return False
 
     again = True
@@ -1701,14 +1581,8 @@ def promote(juncture: (), runid: int):
     while again:
         try:
             again = False
-            for tn_ID, task_ID, alg_ID, sv_ID, v_ID, bn in juncture:
-                cur.execute(
-                    'INSERT INTO Prime (run_ID, tn_ID, task_ID, '
-                    + 'alg_ID, sv_ID, val_ID, blob_name) values '
-                    + '(%s, %s, %s, %s, %s, %s, %s);',
-                    [runid, tn_ID, task_ID, alg_ID, sv_ID, v_ID, bn],
-                )
-                pass
+            statements.execute(cur, 'promote', [runid] + columns)
+            _advance_latest(cur, [tuple(j[:4]) + (runid,) for j in juncture])
             conn.commit()  # psycopg3 problem # pylint:disable=no-member
         except psycopg.errors.DeadlockDetected:
             again = True
@@ -1743,32 +1617,25 @@ def remove(runid: int, tn: str, tskn: str, algn: str, svn: str, vn: str):
     removed = tuple()
     conn = _conn()
     cur = _cur(conn)
-    cur.execute('SELECT * from Target WHERE name = %s;', [tn])
-    tn_ID = _fetchone(cur, f'Dataset: Could not find target ID for "{tn}"')
-    cur.execute('SELECT * from TASK WHERE name = %s;', [tskn])
-    task_ID = _fetchone(cur, 'Dataset load: Could not find task ID')
-    cur.execute(
-        'SELECT pk FROM Algorithm WHERE name = %s AND task_ID = %s;',
-        [algn, task_ID],
+    tn_ID = _dim_ID(
+        cur, cache.target(tn), f'Dataset: Could not find target ID for "{tn}"'
     )
-    alg_ID = list({pk[0] for pk in cur.fetchall()})
-    cur.execute(
-        'SELECT pk FROM StateVector WHERE name = %s AND alg_ID = ANY(%s);',
-        [svn, alg_ID],
+    task_ID = _dim_ID(
+        cur, cache.task(tskn), 'Dataset load: Could not find task ID'
     )
+    statements.execute(cur, 'alg_pks', [algn, task_ID])
+    alg_ID = list({pk[0] for pk in cur.fetchall()})
+    statements.execute(cur, 'sv_pks', [svn, alg_ID])
     sv_ID = list({pk[0] for pk in cur.fetchall()})
-    cur.execute(
-        'SELECT pk FROM Value WHERE name = %s AND sv_ID = ANY(%s);',
-        [vn, sv_ID],
-    )
+    statements.execute(cur, 'value_pks', [vn, sv_ID])
     val_ID = list({pk[0] for pk in cur.fetchall()})
 
-    cur.execute(
-        'DELETE FROM Prime WHERE run_ID = %s AND tn_ID = %s AND '
-        + 'task_ID = %s AND alg_ID = ANY(%s) AND sv_ID = ANY(%s) AND '
-        + 'val_ID = ANY(%s);',
-        [runid, tn_ID, task_ID, alg_ID, sv_ID, val_ID],
-    )
+    with conn.transaction():
+        statements.execute(
+            cur, 'prime_remove', [runid, tn_ID, task_ID, alg_ID, sv_ID, val_ID]
+        )
+        _recount_latest(cur, tn_ID, task_ID, alg_ID, sv_ID)
+        pass
     removed = (runid, tn_ID, task_ID, alg_ID, sv_ID, val_ID)
     conn.commit()  # psycopg3 problem # pylint:disable=no-member
     cur.close()
@@ -1793,39 +1660,27 @@ def reset(runid: int, tn: str, tskn, alg) -> None:
 
     conn = dawgie.db.post._conn()
     cur = dawgie.db.post._cur(conn)
-    cur.execute('SELECT * from Target WHERE name = %s;', [tn])
-    tn_ID = _fetchone(cur, f'Dataset: Could not find target ID for "{tn}"')
-    cur.execute('SELECT * from TASK WHERE name = %s;', [tskn])
-    task_ID = _fetchone(cur, 'Dataset load: Could not find task ID')
-    cur.execute(
-        'SELECT pk FROM Algorithm WHERE name = %s AND task_ID = %s;',
-        [alg.name(), task_ID],
+    tn_ID = _dim_ID(
+        cur, cache.target(tn), f'Dataset: Could not find target ID for "{tn}"'
     )
+    task_ID = _dim_ID(
+        cur, cache.task(tskn), 'Dataset load: Could not find task ID'
+    )
+    statements.execute(cur, 'alg_pks', [alg.name(), task_ID])
     alg_ID = list({pk[0] for pk in cur.fetchall()})
     algv = set()
     for sv in alg.state_vectors():
-        cur.execute(
-            'SELECT pk FROM StateVector WHERE name = %s AND '
-            + 'alg_ID = ANY(%s);',
-            [sv.name(), alg_ID],
-        )
+        statements.execute(cur, 'sv_pks', [sv.name(), alg_ID])
         sv_ID = list({pk[0] for pk in cur.fetchall()})
-        cur.execute(
-            'SELECT alg_ID, sv_ID FROM Prime WHERE run_ID = %s AND '
-            + ' tn_ID = %s AND task_ID = %s AND alg_ID = ANY(%s) AND '
-            + 'sv_ID = ANY(%s);',
-            [str(runid), tn_ID, task_ID, alg_ID, sv_ID],
+        statements.execute(
+            cur, 'prime_narrow', [runid, tn_ID, task_ID, alg_ID, sv_ID]
         )
         ids = cur.fetchall()
         algv.update({fk[0] for fk in ids})
         svv = {fk[1] for fk in ids}
 
         if len(svv) == 1:
-            cur.execute(
-                'SELECT design,implementation,bugfix '
-                + 'FROM StateVector WHERE PK = %s;',
-                [svv.pop()],
-            )
+            statements.execute(cur, 'sv_version', [svv.pop()])
             v = cur.fetchone()
             sv._set_ver(dawgie.VERSION(v[0], v[1], v[2]))
         else:
@@ -1836,11 +1691,7 @@ def reset(runid: int, tn: str, tskn, alg) -> None:
             )
         pass
     if len(algv) == 1:
-        cur.execute(
-            'SELECT design,implementation,bugfix '
-            + 'FROM Algorithm WHERE PK = %s;',
-            [algv.pop()],
-        )
+        statements.execute(cur, 'alg_version', [algv.pop()])
         v = cur.fetchone()
         alg._set_ver(dawgie.VERSION(v[0], v[1], v[2]))
     else:
@@ -1861,12 +1712,36 @@ def retreat(reg, ret):
     return Interface(reg, ret, ret._target())
 
 
+def runs(after_runid: int = -1) -> '[dawgie.db.RunData]':
+    if not dawgie.db.post._db:
+        raise RuntimeError('called runs before open')
+
+    conn = _conn()
+    cur = _cur(conn)
+    statements.execute(
+        cur, 'runs', [-1 if after_runid is None else after_runid]
+    )
+    result = [dawgie.db.RunData(*row) for row in cur.fetchall()]
+    cur.close()
+    conn.close()  # psycopg3 problem # pylint:disable=no-member
+    return result
+
+
 def search() -> SearchFacade:
     if not dawgie.db.post._db:
         raise RuntimeError('called search before open')
     return SearchImplementation(_conn, _cur)
 
 
+def stats() -> {}:
+    return {
+        'cache': cache.stats(),
+        'pool': pool.stats(),
+        'search': SearchImplementation.stats(),
+        'statements': statements.stats(),
+    }
+
+
 def targets():
     if not dawgie.db.post._db:
         raise RuntimeError('called targets before open')
@@ -1874,7 +1749,7 @@ def targets():
     log.debug("in targets()")
     conn = _conn()
     cur = _cur(conn)
-    cur.execute('SELECT name from Target;')
+    statements.execute(cur, 'targets')
     result = cur.fetchall()
     cur.close()
     conn.close()  # psycopg3 problem # fmt: skip # pylint: disable=no-member
@@ -1886,59 +1761,26 @@ def trace(task_alg_names):
     if not dawgie.db.post._db:
         raise RuntimeError('called trace before open')
 
-    target_list = dawgie.db.targets()
+    names = [tan.split('.') for tan in task_alg_names]
     conn = _conn()
     cur = _cur(conn)
+    statements.execute(
+        cur, 'trace', [[n[0] for n in names], [n[1] for n in names]]
+    )
+    runids = {(tn, tan): runid for tn, tan, runid in cur}
+    cur.close()
+    conn.close()  # psycopg3 problem # pylint:disable=no-member
     result = {}
-    for tn in target_list:
+    for tn in dawgie.db.targets():
         result[tn] = {}
         for tan in task_alg_names:
-            tskn, algn = tan.split('.')
-            version = []
-            cur.execute(
-                'SELECT PK FROM Target WHERE name = ANY(%s);', [['__all__', tn]]
-            )
-            tnids = list({pk[0] for pk in cur.fetchall()})
-            cur.execute('SELECT PK FROM Task WHERE name = %s;', [tskn])
-            tid = cur.fetchone()[0]
-            cur.execute(
-                'SELECT MAX(design) '
-                + 'FROM Algorithm WHERE task_ID = %s AND name = %s;',
-                [tid, algn],
-            )
-            version.extend(cur.fetchone())
-            cur.execute(
-                'SELECT MAX(implementation) '
-                + 'FROM Algorithm WHERE task_ID = %s AND name = %s '
-                + 'AND design = %s;',
-                [tid, algn] + version,
-            )
-            version.extend(cur.fetchone())
-            cur.execute(
-                'SELECT MAX(bugfix) '
-                + 'FROM Algorithm WHERE task_ID = %s AND name = %s '
-                + 'AND design = %s AND implementation = %s;',
-                [tid, algn] + version,
-            )
-            version.extend(cur.fetchone())
-            cur.execute(
-                'SELECT PK FROM Algorithm WHERE task_ID = %s AND '
-                + 'name = %s AND design = %s AND implementation = %s '
-                + 'AND bugfix = %s;',
-                [tid, algn] + version,
-            )
-            aid = cur.fetchone()[0]
-            cur.execute(
-                'SELECT run_ID FROM Prime WHERE '
-                + 'tn_ID = ANY(%s) AND task_ID = %s AND alg_ID = %s;',
-                [tnids, tid, aid],
-            )
-            runid = cur.fetchall()
-
-            if not runid:
-                result[tn][tan] = None
-            else:
-                result[tn][tan] = max(r[0] for r in runid)
+            # aspects are written to __all__ which counts for every target
+            found = [
+                runids[key]
+                for key in [('__all__', tan), (tn, tan)]
+                if key in runids
+            ]
+            result[tn][tan] = max(found) if found else None
             pass
         pass
     return result
@@ -1957,70 +1799,122 @@ def update(tsk, alg, sv, vn, v):
     conn = _conn()
     cur = _cur(conn)
     # Add stuff. Check if they already exist in the tables first.
-    _insert(
-        'INSERT INTO Task (name) VALUES (%s) ON CONFLICT (name) DO NOTHING;',
-        [tsk._name()],
+    task_ID = _new_ID(
+        cur,
+        cache.task(tsk._name()),
+        f'update(): Could not add task "{tsk._name()}"',
     )
-    cur.execute('SELECT pk from TASK WHERE name = %s;', [tsk._name()])
-    task_ID = cur.fetchone()
-    task_ID = task_ID[0]
-    _insert(
-        'INSERT into Algorithm(name, task_ID, design, '
-        + 'implementation, bugfix) values '
-        + '(%s, %s, %s, %s, %s);',
-        (
+    alg_ID = _new_ID(
+        cur,
+        cache.algorithm(
             alg.name(),
             task_ID,
             alg.design(),
             alg.implementation(),
             alg.bugfix(),
         ),
+        f'update(): Could not add algorithm "{alg.name()}"',
     )
 
     if sv:
-        cur.execute(
-            'SELECT pk from Algorithm WHERE name = %s and task_ID = %s'
-            + ' and design = %s and implementation = %s and bugfix = %s;',
-            (
+        sv_ID = _new_ID(
+            cur,
+            cache.statevector(
+                sv.name(),
+                alg_ID,
+                sv.design(),
+                sv.implementation(),
+                sv.bugfix(),
+            ),
+            f'update(): Could not add state vector "{sv.name()}"',
+        )
+        _new_ID(
+            cur,
+            cache.value(vn, sv_ID, v.design(), v.implementation(), v.bugfix()),
+            f'update(): Could not add value "{vn}"',
+        )
+
+    cur.close()
+    conn.close()  # psycopg3 problem # pylint:disable=no-member
+    return
+
+
+def update_many(tsk, items: [tuple]):
+    '''update() for every (alg, sv, vn, v) of items in a single transaction
+
+    Each of the Algorithm, StateVector, and Value tables is brought up to date
+    with one multi-row upsert so that the whole version tree of a task costs a
+    few round trips rather than several for each value. When an algorithm has
+    no state vectors, sv, vn, and v of its item are None.
+    '''
+    if not dawgie.db.post._db:
+        raise RuntimeError('called update_many before open')
+
+    log.debug('in update_many')
+
+    def register(cur):
+        name = tsk._name()
+        task = cache.task(name)
+        pks = {task: cache.fetch(task)}
+
+        if pks[task] is None:
+            statements.execute(cur, 'dim_insert', [name], table='Task')
+            row = cur.fetchone()
+
+            if row is None:  # added by another worker
+                statements.execute(cur, 'dim_pk', [name], table='Task')
+                row = [_fetchone(cur, f'update_many(): Unknown task "{name}"')]
+            pks[task] = row[0]
+            pass
+        algs = [
+            cache.algorithm(
                 alg.name(),
-                task_ID,
+                pks[task],
                 alg.design(),
                 alg.implementation(),
                 alg.bugfix(),
-            ),
+            )
+            for alg, _sv, _vn, _v in items
+        ]
+        pks.update(
+            _register_IDs(cur, algs, 'update_many(): Could not add algorithm')
         )
-        alg_ID = cur.fetchone()[0]
-        _insert(
-            'INSERT into StateVector(name, alg_ID, '
-            + 'design, implementation, bugfix) values '
-            + '(%s, %s, %s, %s, %s);',
-            (
+        valued = [
+            (key, sv, vn, v)
+            for key, (_alg, sv, vn, v) in zip(algs, items)
+            if sv is not None
+        ]
+        svs = [
+            cache.statevector(
                 sv.name(),
-                alg_ID,
+                pks[key],
                 sv.design(),
                 sv.implementation(),
                 sv.bugfix(),
-            ),
-        )
-        cur.execute(
-            'SELECT pk from StateVector WHERE name = %s and alg_ID = %s '
-            + 'and design = %s and implementation = %s and bugfix = %s;',
-            (sv.name(), alg_ID, sv.design(), sv.implementation(), sv.bugfix()),
+            )
+            for key, sv, _vn, _v in valued
+        ]
+        pks.update(
+            _register_IDs(cur, svs, 'update_many(): Could not add state vector')
         )
-        sv_ID = cur.fetchone()[0]
-        _insert(
-            'INSERT into Value(name, sv_ID, design, '
-            + 'implementation, bugfix) values '
-            + '(%s, %s, %s, %s, %s);',
-            (vn, sv_ID, v.design(), v.implementation(), v.bugfix()),
+        values = [
+            cache.value(
+                vn, pks[key], v.design(), v.implementation(), v.bugfix()
+            )
+            for key, (_alg_key, _sv, vn, v) in zip(svs, valued)
+        ]
+        pks.update(
+            _register_IDs(cur, values, 'update_many(): Could not add value')
         )
+        return pks
 
-    cur.close()
-    conn.close()  # psycopg3 problem # pylint:disable=no-member
+    if items:
+        _register(register)
     return
 
 
 def versions():
+    # pylint: disable=too-many-locals
     # Returns Algorithm, StateVector, and Value as a list of dictionaries
     # where each dictionary represents a row in the table
     if not dawgie.db.post._db:
@@ -2028,65 +1922,37 @@ def versions():
 
     log.debug('versions() - starting')
     conn = _conn()
-    cur = _cur(conn, True)
+    cur = _cur(conn)
     alg_ver = {}
     sv_ver = {}
     task_ver = {}
     v_ver = {}
-    cur.execute('SELECT * from Task;')
-    tsk = cur.fetchall()
-    for t in tsk:
-        task_ver[t['name']] = True
-    cur.execute('SELECT * from Algorithm;')
-    alg = cur.fetchall()
-    for a in alg:
-        _append_ver(
-            alg_ver,
-            '.'.join([_find(tsk, pk=a['task_id'])['name'], a['name']]),
-            MyVersion(a['design'], a['implementation'], a['bugfix']).asstring(),
-        )
-    cur.execute('SELECT * from StateVector;')
-    svs = cur.fetchall()
-    for sv in svs:
-        _append_ver(
-            sv_ver,
-            '.'.join(
-                [
-                    _find(tsk, pk=_find(alg, pk=sv['alg_id'])['task_id'])[
-                        'name'
-                    ],
-                    _find(alg, pk=sv['alg_id'])['name'],
-                    sv['name'],
-                ]
-            ),
-            MyVersion(
-                sv['design'], sv['implementation'], sv['bugfix']
-            ).asstring(),
-        )
-    cur.execute('SELECT * from Value;')
-    vals = cur.fetchall()
-    for v in vals:
-        _append_ver(
-            v_ver,
-            '.'.join(
-                [
-                    _find(
-                        tsk,
-                        pk=_find(alg, pk=_find(svs, pk=v['sv_id'])['alg_id'])[
-                            'task_id'
-                        ],
-                    )['name'],
-                    _find(alg, pk=_find(svs, pk=v['sv_id'])['alg_id'])['name'],
-                    _find(svs, pk=v['sv_id'])['name'],
-                    v['name'],
-                ]
-            ),
-            MyVersion(v['design'], v['implementation'], v['bugfix']).asstring(),
-        )
+    # full names of the parents keyed by their primary key
+    names = {}
+    statements.execute(cur, 'dim_rows', table='Task')
+    for pk, name in cur:
+        names[pk] = name
+        task_ver[name] = True
+    parents = names
+    for table, parent, vers in [
+        ('Algorithm', 'task_ID', alg_ver),
+        ('StateVector', 'alg_ID', sv_ver),
+        ('Value', 'sv_ID', v_ver),
+    ]:
+        names = {}
+        statements.execute(cur, 'versioned_rows', parent=parent, table=table)
+        for pk, parent_ID, name, design, impl, bugfix in cur:
+            names[pk] = '.'.join([parents[parent_ID], name])
+            _append_ver(
+                vers, names[pk], MyVersion(design, impl, bugfix).asstring()
+            )
+            pass
+        parents = names
+        pass
     conn.commit()  # psycopg3 problem # pylint:disable=no-member
     cur.close()
     conn.close()  # psycopg3 problem # pylint:disable=no-member
-    log.debug('versions() - starting')
+    log.debug('versions() - finished')
     return task_ver, alg_ver, sv_ver, v_ver
 
 
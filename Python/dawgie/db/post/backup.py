@@ -0,0 +1,301 @@
+'''archive the postgres database while the pipeline keeps running
+
+An archive is written into a scratch directory in dawgie.context.db_rotate_path
+and rotated into place once its manifest.json exists, so a failed archive
+never costs an older one. A full archive is a directory format pg_dump that
+pg_restore -j can load in parallel. An incremental archive holds the Prime
+rows written since the archive before it, the blobs those rows name, and the
+small tables whole, each table as a COPY text file of the same name. The
+manifest counts the incremental archives back to the full one, so restore
+that full archive then the Prime rows of each incremental archive after it
+in order, replacing the rows with the same PK.
+
+Rows are picked by the transaction that last wrote them, the written column
+of Prime, rather than by run ID because retargeting inserts rows under an old
+run ID and an update replaces blob_name in place. The manifest keeps the
+oldest transaction that was still running when its snapshot was taken, so
+the next increment may repeat a few rows but never misses one. Increments
+only add rows: Prime rows deleted by remove() stay in the archives before the
+deletion until the next full archive.
+
+--
+COPYRIGHT:
+Copyright (c) 2015-2026, California Institute of Technology ("Caltech").
+U.S. Government sponsorship acknowledged.
+
+All rights reserved.
+
+LICENSE:
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+- Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+- Neither the name of Caltech nor its operating division, the Jet
+Propulsion Laboratory, nor the names of its contributors may be used to
+endorse or promote products derived from this software without specific prior
+written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+
+NTR:
+'''
+
+import concurrent.futures
+import dawgie.context
+import dawgie.db.util
+import datetime
+import json
+import logging
+import os
+import psycopg
+import shutil
+import subprocess  # nosec B404 # only runs the postgres client tools
+import threading
+
+from . import partition
+from . import statements
+
+log = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+SCRATCH = '{}.scratch.bck'
+TABLES = [
+    'Algorithm',
+    'Latest',
+    'Run',
+    'StateVector',
+    'Target',
+    'Task',
+    'Value',
+]
+
+_lock = threading.Lock()
+_state = {'thread': None}
+
+
+def _blobs(cur, after: int, dst: str):
+    '''copy the blobs of the Prime rows written since after into dst'''
+    cur.execute(
+        'SELECT DISTINCT blob_name FROM Prime WHERE written >= %s::xid8;',
+        [str(after)],
+    )
+    names = [row[0] for row in cur.fetchall()]
+    os.makedirs(dst)
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(1, dawgie.context.db_archive_jobs)
+    ) as pool:
+        missing = sum(pool.map(lambda name: _copy(name, dst), names))
+        pass
+    if missing:
+        log.warning('%d of %d blobs were missing', missing, len(names))
+    return
+
+
+def _copy(name: str, dst: str) -> int:
+    src = dawgie.db.util.locate(name)
+    if not os.path.isfile(src):
+        return 1
+    shutil.copy2(src, os.path.join(dst, name))
+    return 0
+
+
+def _copy_out(cur, query: str, args: [], fn: str):
+    with open(fn, 'wb') as file, cur.copy(
+        f'COPY ({query}) TO STDOUT', args
+    ) as copy:
+        for data in copy:
+            file.write(data)
+            pass
+        pass
+    return
+
+
+def _remove(fn: str):
+    if os.path.isdir(fn):
+        shutil.rmtree(fn)
+    elif os.path.exists(fn):
+        os.unlink(fn)
+    return
+
+
+def _begin(cur) -> ({}, str):
+    '''start the snapshot everything is archived from
+
+    Returns the manifest of the new archive less its place in the chain and
+    the exported snapshot name to give pg_dump.
+    '''
+    cur.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY;')
+    # the first query takes the snapshot that is then exported
+    cur.execute('SELECT pg_snapshot_xmin(pg_current_snapshot())::text;')
+    written = int(cur.fetchone()[0])
+    cur.execute('SELECT pg_export_snapshot();')
+    snapshot = cur.fetchone()[0]
+    return {
+        'after': None,
+        'created': datetime.datetime.now(datetime.UTC).isoformat(),
+        'increments': 0,
+        'runid': statements.execute(cur, 'last_runid').fetchone()[0],
+        'written': written,
+    }, snapshot
+
+
+def _run(conn, path: str, result: {}, snapshot: str):
+    # pylint: disable=broad-exception-caught
+    cur = conn.cursor()
+    fn = os.path.join(path, SCRATCH.format(dawgie.context.db_name))
+    try:
+        _remove(fn)
+        previous = latest(path)
+        if previous:
+            result.update(
+                after=previous['written'],
+                increments=previous['increments'] + 1,
+            )
+            incremental(cur, fn, previous['written'])
+        else:
+            argv = partition.dump_command(
+                fn,
+                '-Fd',
+                '-j',
+                str(max(1, dawgie.context.db_archive_jobs)),
+                '--snapshot',
+                snapshot,
+            )
+            # a fixed argument list and no shell
+            subprocess.run(argv, check=True, env=os.environ)  # nosec B603
+        with open(os.path.join(fn, MANIFEST), 'wt', encoding='utf-8') as file:
+            json.dump(result, file, indent=1)
+        log.info('archived the database to %s', rotate(path, fn))
+    except Exception:
+        log.exception('could not archive the database to %s', path)
+        _remove(fn)
+    finally:
+        conn.rollback()  # psycopg3 problem # pylint:disable=no-member
+        cur.close()
+        conn.close()  # psycopg3 problem # pylint:disable=no-member
+    return
+
+
+def busy() -> bool:
+    '''True while an archive started by start() is still being written'''
+    with _lock:
+        return _state['thread'] is not None and _state['thread'].is_alive()
+
+
+def incremental(cur, fn: str, after: int):
+    '''write what is new since transaction after into the directory fn
+
+    The Prime rows written by transaction after or later and their blobs are
+    archived along with every row of the tables in TABLES, which are small
+    next to Prime. Rows deleted since are not recorded.
+    '''
+    os.makedirs(fn)
+    _copy_out(
+        cur,
+        'SELECT * FROM Prime WHERE written >= %s::xid8',
+        [str(after)],
+        os.path.join(fn, 'Prime'),
+    )
+    for table in TABLES:
+        # table is one of the constant TABLES
+        query = f'SELECT * FROM {table}'  # nosec B608
+        _copy_out(cur, query, [], os.path.join(fn, table))
+        pass
+    _blobs(cur, after, os.path.join(fn, 'blobs'))
+    return
+
+
+def manifest(fn: str) -> {}:
+    '''the manifest of the archive fn or None if it is not complete'''
+    try:
+        with open(os.path.join(fn, MANIFEST), 'rt', encoding='utf-8') as file:
+            result = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return result
+
+
+def latest(path: str) -> {}:
+    '''the manifest the next archive in path is incremental to
+
+    None when the next archive should be full, which is when
+    dawgie.context.db_archive_incremental archives since the last full one are
+    already incremental, when the chain back to the full one would not fit
+    within dawgie.context.db_rotate archives, or when the newest archive does
+    not record the transactions it holds.
+    '''
+    count = max(1, int(dawgie.context.db_rotate))
+    previous = (
+        manifest(os.path.join(path, f'{dawgie.context.db_name}.00.bck'))
+        if 1 < count
+        else None
+    )
+    if (
+        previous is None
+        or previous.get('written') is None
+        or dawgie.context.db_archive_incremental <= previous['increments']
+        or count < previous['increments'] + 2
+    ):
+        previous = None
+    return previous
+
+
+def rotate(path: str, fn: str) -> str:
+    '''shift the archives in path down one and move the archive fn in first
+
+    Returns the name the archive fn was moved to.
+    '''
+    bfn = dawgie.context.db_name + '.{:02d}.bck'
+    count = max(1, int(dawgie.context.db_rotate))
+    _remove(os.path.join(path, bfn.format(count - 1)))
+    for i in range(count - 1, 0, -1):
+        ffn = os.path.join(path, bfn.format(i - 1))
+
+        if os.path.exists(ffn):
+            shutil.move(ffn, os.path.join(path, bfn.format(i)))
+        pass
+    shutil.move(fn, os.path.join(path, bfn.format(0)))
+    return os.path.join(path, bfn.format(0))
+
+
+def start(conn, path: str) -> bool:
+    '''archive into path on a thread of its own that owns conn
+
+    The snapshot is taken before returning. Returns False without archiving
+    when the previous archive is still being written and conn is closed.
+    '''
+    with _lock:
+        if _state['thread'] is not None and _state['thread'].is_alive():
+            conn.close()  # psycopg3 problem # pylint:disable=no-member
+            return False
+        try:
+            with conn.cursor() as cur:
+                result, snapshot = _begin(cur)
+        except psycopg.Error:
+            log.exception('could not snapshot the database to archive it')
+            conn.close()  # psycopg3 problem # pylint:disable=no-member
+            return False
+        _state['thread'] = threading.Thread(
+            args=(conn, path, result, snapshot),
+            daemon=True,
+            name='dawgie.db.post.backup',
+            target=_run,
+        )
+        _state['thread'].start()
+    return True
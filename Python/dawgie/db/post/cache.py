@@ -0,0 +1,174 @@
+'''Cache of the dimension table primary keys for the postgresql implementation
+
+--
+COPYRIGHT:
+Copyright (c) 2015-2026, California Institute of Technology ("Caltech").
+U.S. Government sponsorship acknowledged.
+
+All rights reserved.
+
+LICENSE:
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+- Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+- Neither the name of Caltech nor its operating division, the Jet
+Propulsion Laboratory, nor the names of its contributors may be used to
+endorse or promote products derived from this software without specific prior
+written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+
+NTR:
+'''
+
+# names reflect the postgres columns so pylint: disable=invalid-name
+
+import collections
+import dawgie.context
+import logging
+import threading
+
+from . import statements
+
+log = logging.getLogger(__name__)
+
+PARENT = {'Algorithm': 'task_ID', 'StateVector': 'alg_ID', 'Value': 'sv_ID'}
+
+_lock = threading.Lock()
+_lru = collections.OrderedDict()
+_state = {'hits': 0, 'misses': 0, 'source': None}
+
+
+def algorithm(name: str, task_ID: int, design, impl, bugfix) -> tuple:
+    '''key for a row in the Algorithm table'''
+    return ('Algorithm', name, task_ID, design, impl, bugfix)
+
+
+def clear():
+    '''forget everything including the statistics'''
+    with _lock:
+        _lru.clear()
+        _state.update(hits=0, misses=0, source=None)
+        pass
+    return
+
+
+def fetch(key: tuple) -> int:
+    '''return the primary key or None when it is not cached'''
+    with _lock:
+        pk = _lru.get(key)
+
+        if pk is None:
+            _state['misses'] += 1
+        else:
+            _lru.move_to_end(key)
+            _state['hits'] += 1
+            pass
+        pass
+    return pk
+
+
+def stats() -> {}:
+    '''how well the cache is doing'''
+    with _lock:
+        return {
+            'capacity': dawgie.context.db_cache_size,
+            'hits': _state['hits'],
+            'misses': _state['misses'],
+            'size': len(_lru),
+        }
+
+
+def statevector(name: str, alg_ID: int, design, impl, bugfix) -> tuple:
+    '''key for a row in the StateVector table'''
+    return ('StateVector', name, alg_ID, design, impl, bugfix)
+
+
+def store(key: tuple, pk: int):
+    '''remember the primary key evicting the least recently used as needed'''
+    if dawgie.context.db_cache_size < 1:
+        return
+
+    with _lock:
+        _lru[key] = pk
+        _lru.move_to_end(key)
+        while dawgie.context.db_cache_size < len(_lru):
+            _lru.popitem(last=False)
+            pass
+        pass
+    return
+
+
+def target(name: str) -> tuple:
+    '''key for a row in the Target table'''
+    return ('Target', name)
+
+
+def task(name: str) -> tuple:
+    '''key for a row in the Task table'''
+    return ('Task', name)
+
+
+def value(name: str, sv_ID: int, design, impl, bugfix) -> tuple:
+    '''key for a row in the Value table'''
+    return ('Value', name, sv_ID, design, impl, bugfix)
+
+
+def warm(cur, source: str):
+    '''bulk load the dimension tables
+
+    The dimension tables are append only, so what is loaded stays valid for
+    the life of the process. Warming is skipped when the cache was already
+    warmed from the same source (database URI) because workers reopen the
+    database for every job. The source includes the OID of the database so
+    that one dropped and created again at the same URI is warmed again
+    rather than leaving the primary keys of the old one in the cache. Tables
+    are loaded oldest to newest so that when the catalog is larger than the
+    cache the newest versions are the ones that remain.
+    '''
+    if dawgie.context.db_cache_size < 1:
+        return
+
+    source = (source, statements.execute(cur, 'database_oid').fetchone()[0])
+
+    if _state['source'] == source:
+        return
+
+    clear()
+    statements.execute(cur, 'dim_warm', table='Target')
+    for pk, name in cur:
+        store(target(name), pk)
+    statements.execute(cur, 'dim_warm', table='Task')
+    for pk, name in cur:
+        store(task(name), pk)
+    for table, key in [
+        ('Algorithm', algorithm),
+        ('StateVector', statevector),
+        ('Value', value),
+    ]:
+        statements.execute(
+            cur, 'versioned_warm', parent=PARENT[table], table=table
+        )
+        for row in cur:
+            store(key(*row[1:]), row[0])
+        pass
+    _state['source'] = source
+    log.debug('warmed dimension cache: %s', str(stats()))
+    return
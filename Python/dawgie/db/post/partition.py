@@ -0,0 +1,262 @@
+'''run_ID range partitioning of the postgres Prime table
+
+--
+COPYRIGHT:
+Copyright (c) 2015-2026, California Institute of Technology ("Caltech").
+U.S. Government sponsorship acknowledged.
+
+All rights reserved.
+
+LICENSE:
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+- Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+- Neither the name of Caltech nor its operating division, the Jet
+Propulsion Laboratory, nor the names of its contributors may be used to
+endorse or promote products derived from this software without specific prior
+written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+
+NTR:
+'''
+
+import dawgie.context
+import logging
+import os
+import psycopg.errors
+import re
+import subprocess  # nosec B404 # only runs the postgres client tools
+
+log = logging.getLogger(__name__)
+
+_BOUND = re.compile(r'FROM \((\w+)\) TO \((\w+)\)')
+_state = {'ensured': set()}
+
+
+def _legacy_name(name: str) -> str:
+    return (
+        'prime_legacy' + name[len('prime') :]
+        if name.startswith('prime')
+        else 'legacy_' + name
+    )
+
+
+def _refresh_latest(cur, lo: int, hi: int):
+    '''recompute Latest where it points into run IDs lo <= run_ID < hi'''
+    cur.execute(
+        'DELETE FROM Latest WHERE run_ID >= %s AND run_ID < %s '
+        + 'RETURNING tn_ID, task_ID, alg_ID, sv_ID;',
+        [-(2**31) if lo is None else lo, 2**31 - 1 if hi is None else hi],
+    )
+    gone = list(zip(*cur.fetchall()))
+    if gone:
+        cur.execute(
+            'INSERT INTO Latest (tn_ID, task_ID, alg_ID, sv_ID, run_ID) '
+            + 'SELECT tn_ID, task_ID, alg_ID, sv_ID, MAX(run_ID) FROM Prime '
+            + 'JOIN unnest(%s::bigint[], %s::bigint[], %s::bigint[], '
+            + '%s::bigint[]) AS gone(tn_ID, task_ID, alg_ID, sv_ID) '
+            + 'USING (tn_ID, task_ID, alg_ID, sv_ID) '
+            + 'GROUP BY tn_ID, task_ID, alg_ID, sv_ID;',
+            [list(ids) for ids in gone],
+        )
+    return
+
+
+def archive(cur, name: str) -> str:
+    '''dump a detached partition with pg_dump then drop it
+
+    Returns the file name of the dump.
+    '''
+    if name in {partition[0] for partition in bounds(cur)}:
+        raise ValueError(f'detach the partition {name} before archiving it')
+    cur.execute('SELECT to_regclass(%s) IS NOT NULL;', [name])
+    if not cur.fetchone()[0]:
+        raise ValueError(f'there is no table {name} to archive')
+
+    fn = os.path.join(
+        dawgie.context.db_rotate_path, f'{dawgie.context.db_name}.{name}.bck'
+    )
+    argv = dump_command(fn, '-t', name)
+    # a fixed argument list and no shell
+    subprocess.run(argv, check=True, env=os.environ)  # nosec B603
+    cur.execute(f'DROP TABLE {name};')
+    return fn
+
+
+def bounds(cur) -> [(str, int, int)]:
+    '''the partitions of Prime as (name, first run_ID, last run_ID + 1)
+
+    None is an open bound so the default partition is (name, None, None).
+    '''
+    cur.execute(
+        'SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM '
+        + 'pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE '
+        + "i.inhparent = 'prime'::regclass ORDER BY c.relname;"
+    )
+    result = []
+    for name, bound in cur.fetchall():
+        match = _BOUND.search(bound)
+        lo, hi = match.groups() if match else (None, None)
+        result.append(
+            (
+                name,
+                int(lo) if lo and lo.isdigit() else None,
+                int(hi) if hi and hi.isdigit() else None,
+            )
+        )
+        pass
+    return result
+
+
+def convert(cur, size: int) -> bool:
+    '''partition Prime by ranges of size run IDs when it is not already
+
+    The existing Prime becomes the partition prime_legacy that holds every run
+    ID below the first range boundary past the newest run ID, so no rows are
+    copied. A default partition catches run IDs that ensure() has not made a
+    partition for yet. The indexes of Prime are rebuilt on the partitioned
+    table where they attach to the existing ones on prime_legacy. A primary
+    key of a partitioned table must include run_ID, so the partitioned Prime
+    has none and PK stays unique through its sequence instead.
+
+    Returns True if Prime was converted.
+    '''
+    with cur.connection.transaction():
+        cur.execute('LOCK TABLE Prime IN ACCESS EXCLUSIVE MODE;')
+        if is_partitioned(cur):
+            return False
+
+        log.warning('converting Prime to partitions of %d run IDs', size)
+        cur.execute(
+            'SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid), '
+            + 'EXISTS (SELECT FROM pg_constraint WHERE conindid = indexrelid) '
+            + "FROM pg_index WHERE indrelid = 'prime'::regclass;"
+        )
+        indexes = cur.fetchall()
+        cur.execute(
+            "SELECT attname, pg_get_serial_sequence('prime', attname) FROM "
+            + "pg_attribute WHERE attrelid = 'prime'::regclass AND attnum > 0 "
+            + 'AND NOT attisdropped;'
+        )
+        sequences = [(col, seq) for col, seq in cur.fetchall() if seq]
+        cur.execute('SELECT COALESCE(MAX(run_ID), 0) FROM Prime;')
+        hi = cur.fetchone()[0] // size * size + size
+        cur.execute('ALTER TABLE Prime RENAME TO prime_legacy;')
+        for name, _definition, _constraint in indexes:
+            cur.execute(f'ALTER INDEX {name} RENAME TO {_legacy_name(name)};')
+        cur.execute(
+            'ALTER TABLE prime_legacy ALTER COLUMN run_ID SET NOT NULL;'
+        )
+        cur.execute(
+            'CREATE TABLE Prime (LIKE prime_legacy INCLUDING DEFAULTS, '
+            + 'CONSTRAINT prime_run_id_task_id_tn_id_alg_id_sv_id_val_id_key '
+            + 'UNIQUE (run_ID, task_ID, tn_ID, alg_ID, sv_ID, val_ID), '
+            + 'FOREIGN KEY (task_ID) REFERENCES Task(PK), '
+            + 'FOREIGN KEY (tn_ID) REFERENCES Target(PK), '
+            + 'FOREIGN KEY (alg_ID) REFERENCES Algorithm(PK), '
+            + 'FOREIGN KEY (sv_ID) REFERENCES StateVector(PK), '
+            + 'FOREIGN KEY (val_ID) REFERENCES Value(PK)) '
+            + 'PARTITION BY RANGE (run_ID);'
+        )
+        for col, seq in sequences:
+            cur.execute(f'ALTER SEQUENCE {seq} OWNED BY Prime.{col};')
+        cur.execute(
+            'ALTER TABLE Prime ATTACH PARTITION prime_legacy FOR VALUES FROM '
+            + f'(MINVALUE) TO ({hi:d});'
+        )
+        cur.execute('CREATE TABLE prime_default PARTITION OF Prime DEFAULT;')
+        for _name, definition, constraint in indexes:
+            if not constraint:
+                cur.execute(definition)
+            pass
+        pass
+    _state['ensured'].clear()
+    return True
+
+
+def detach(cur, name: str):
+    '''detach a partition from Prime so that it can be archived on its own
+
+    Its rows are no longer part of Prime so Latest is recomputed for the run
+    IDs that the partition held.
+    '''
+    known = {partition[0]: partition[1:] for partition in bounds(cur)}
+    if name not in known:
+        raise ValueError(f'{name} is not a partition of Prime')
+
+    lo, hi = known[name]
+    with cur.connection.transaction():
+        cur.execute(f'ALTER TABLE Prime DETACH PARTITION {name};')
+        _refresh_latest(cur, lo, hi)
+        pass
+    _state['ensured'].discard(lo)
+    return
+
+
+def dump_command(fn: str, *options) -> [str]:
+    '''the pg_dump command line that dumps the database into the file fn'''
+    return [
+        '/usr/bin/pg_dump',
+        '-h',
+        dawgie.context.db_host,
+        '-p',
+        f'{dawgie.context.db_port:d}',
+        '-U',
+        dawgie.context.db_path.split(':')[0],
+        '-d',
+        dawgie.context.db_name,
+        *options,
+        '-f',
+        fn,
+    ]
+
+
+def ensure(cur, runid: int, size: int):
+    '''make sure run ID runid has its own partition of size run IDs
+
+    Run IDs already covered by prime_legacy or already written to the default
+    partition stay where they are.
+    '''
+    lo = runid - runid % size
+    if lo in _state['ensured']:
+        return
+    try:
+        with cur.connection.transaction():
+            cur.execute(
+                f'CREATE TABLE IF NOT EXISTS prime_{lo:d}_{lo + size:d} '
+                + f'PARTITION OF Prime FOR VALUES FROM ({lo:d}) '
+                + f'TO ({lo + size:d});'
+            )
+            pass
+    except (
+        psycopg.errors.CheckViolation,
+        psycopg.errors.InvalidObjectDefinition,
+    ):
+        log.debug('run ID %d is covered by another partition of Prime', runid)
+    _state['ensured'].add(lo)
+    return
+
+
+def is_partitioned(cur) -> bool:
+    cur.execute(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = 'prime'::regclass;"
+    )
+    return cur.fetchone()[0]
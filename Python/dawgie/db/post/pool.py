@@ -0,0 +1,166 @@
+'''Connection pool for the postgresql implementation
+
+--
+COPYRIGHT:
+Copyright (c) 2015-2026, California Institute of Technology ("Caltech").
+U.S. Government sponsorship acknowledged.
+
+All rights reserved.
+
+LICENSE:
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+- Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+- Neither the name of Caltech nor its operating division, the Jet
+Propulsion Laboratory, nor the names of its contributors may be used to
+endorse or promote products derived from this software without specific prior
+written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+
+NTR:
+'''
+
+import atexit
+import dawgie.context
+import logging
+import os
+import psycopg_pool
+import threading
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_state = {'owner': None, 'pool': None, 'uri': None}
+
+
+class Connection:
+    '''A pooled connection that goes back to the pool when closed
+
+    The rest of dawgie.db.post treats a connection as something to open, use,
+    and close. Wrapping the pooled connection keeps all of those call sites
+    as they are while close() returns the connection to the pool rather than
+    tearing it down.
+    '''
+
+    def __init__(self, pool, conn):
+        self.__conn = conn
+        self.__pool = pool
+        return
+
+    def __del__(self):
+        # a connection dropped on the floor (exception) must not leak its slot
+        try:
+            self.close()
+        except Exception:  # pylint: disable=broad-exception-caught
+            log.debug('could not return a dropped connection', exc_info=True)
+        return
+
+    def __getattr__(self, name):
+        if self.__conn is None:
+            raise AttributeError(f'pooled connection already closed: {name}')
+        return getattr(self.__conn, name)
+
+    def close(self):
+        if self.__conn is not None:
+            conn, self.__conn = self.__conn, None
+            self.__pool.putconn(conn)
+            pass
+        return
+
+    pass
+
+
+def _close():
+    # called at exit and when the database location changes
+    if _state['pool'] is not None and _state['owner'] == os.getpid():
+        log.debug(
+            'closing pool with stats: %s', str(_state['pool'].get_stats())
+        )
+        _state['pool'].close()
+        pass
+    _state.update(owner=None, pool=None, uri=None)
+    return
+
+
+def _ensure(uri: str) -> psycopg_pool.ConnectionPool:
+    with _lock:
+        if _state['owner'] != os.getpid():
+            # inherited through a fork: the sockets belong to the parent so
+            # abandon the pool rather than close it from under the parent
+            _state.update(owner=None, pool=None, uri=None)
+            pass
+        if _state['pool'] is not None and _state['uri'] != uri:
+            _close()
+        if _state['pool'] is None:
+            log.debug(
+                'creating pool of %d to %d connections',
+                dawgie.context.db_pool_min,
+                dawgie.context.db_pool_max,
+            )
+            _state.update(
+                owner=os.getpid(),
+                pool=psycopg_pool.ConnectionPool(
+                    uri,
+                    check=psycopg_pool.ConnectionPool.check_connection,
+                    kwargs={'autocommit': True},
+                    max_lifetime=dawgie.context.db_pool_lifetime,
+                    max_size=max(
+                        dawgie.context.db_pool_min, dawgie.context.db_pool_max
+                    ),
+                    min_size=dawgie.context.db_pool_min,
+                    name=f'dawgie.{os.getpid()}',
+                    open=True,
+                    timeout=dawgie.context.db_pool_timeout,
+                ),
+                uri=uri,
+            )
+            pass
+        return _state['pool']
+
+
+def checkout(uri: str, autocommit: bool = True) -> Connection:
+    '''get a connection from the pool for this process
+
+    The pool is created the first time it is needed within a process and lives
+    as long as the process does. Each connection is health checked before it
+    is handed out and is replaced once it reaches the configured lifetime.
+    '''
+    pool = _ensure(uri)
+    conn = pool.getconn()
+    conn.autocommit = autocommit
+    return Connection(pool, conn)
+
+
+def stats() -> {}:
+    '''pool statistics for sizing the pool
+
+    Of particular interest are requests_num (checkout count) and
+    requests_wait_ms (total time spent waiting for a connection).
+    '''
+    # counters only show up once they are non-zero so seed the ones of interest
+    result = {'requests_num': 0, 'requests_wait_ms': 0}
+    if _state['pool'] is not None and _state['owner'] == os.getpid():
+        result.update(_state['pool'].get_stats())
+        pass
+    return result
+
+
+atexit.register(_close)
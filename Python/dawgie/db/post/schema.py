@@ -0,0 +1,166 @@
+'''schema migrations of the postgres database
+
+--
+COPYRIGHT:
+Copyright (c) 2015-2026, California Institute of Technology ("Caltech").
+U.S. Government sponsorship acknowledged.
+
+All rights reserved.
+
+LICENSE:
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+- Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+- Neither the name of Caltech nor its operating division, the Jet
+Propulsion Laboratory, nor the names of its contributors may be used to
+endorse or promote products derived from this software without specific prior
+written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+
+NTR:
+'''
+
+import logging
+import psycopg
+import time
+
+from . import partition
+
+log = logging.getLogger(__name__)
+
+LOCK = 0x64617767  # advisory lock key held while migrating
+MIGRATIONS = [
+    # 1: covering indexes for the hot predicates on Prime
+    [
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS prime_latest_idx ON Prime '
+        + '(tn_ID, task_ID, alg_ID, sv_ID, run_ID) INCLUDE (val_ID, blob_name);',
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS prime_sv_idx ON Prime '
+        + '(sv_ID, run_ID) INCLUDE (PK, task_ID, tn_ID, alg_ID, val_ID, '
+        + 'blob_name);',
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS prime_blob_name_idx ON Prime '
+        + '(blob_name);',
+    ],
+    # 2: newest run_ID of every target and state vector
+    [
+        'CREATE TABLE IF NOT EXISTS Latest (tn_ID bigint, task_ID bigint, '
+        + 'alg_ID bigint, sv_ID bigint, run_ID integer, '
+        + 'PRIMARY KEY (tn_ID, task_ID, alg_ID, sv_ID));',
+        'INSERT INTO Latest (tn_ID, task_ID, alg_ID, sv_ID, run_ID) '
+        + 'SELECT tn_ID, task_ID, alg_ID, sv_ID, MAX(run_ID) FROM Prime '
+        + 'GROUP BY tn_ID, task_ID, alg_ID, sv_ID '
+        + 'ON CONFLICT (tn_ID, task_ID, alg_ID, sv_ID) DO UPDATE SET '
+        + 'run_ID = GREATEST(Latest.run_ID, EXCLUDED.run_ID);',
+    ],
+    # 3: run ID allocation and what triggered each run
+    [
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS prime_run_idx ON Prime '
+        + '(run_ID);',
+        'CREATE TABLE IF NOT EXISTS Run (run_ID integer PRIMARY KEY, '
+        + 'event text, revision text, '
+        + 'created timestamp with time zone DEFAULT now());',
+    ],
+    # 4: the transaction that last wrote each row for incremental archives
+    [
+        'ALTER TABLE Prime ADD COLUMN IF NOT EXISTS written xid8;',
+        'ALTER TABLE Prime ALTER COLUMN written SET DEFAULT '
+        + 'pg_current_xact_id();',
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS prime_written_idx ON Prime '
+        + '(written);',
+    ],
+]
+
+
+def _drop_invalid(cur):
+    '''drop indexes left invalid by an interrupted CREATE INDEX CONCURRENTLY'''
+    cur.execute(
+        'SELECT indexrelid::regclass::text FROM pg_index WHERE '
+        + "NOT indisvalid AND indrelid = 'prime'::regclass;"
+    )
+    for (name,) in cur.fetchall():
+        log.warning('dropping the invalid index %s', name)
+        cur.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name};')
+        pass
+    return
+
+
+def _version(cur) -> int:
+    cur.execute('SELECT COALESCE(MAX(version), 0) FROM SchemaVersion;')
+    return cur.fetchone()[0]
+
+
+def migrate(cur) -> int:
+    '''bring an existing database up to the newest schema version in place
+
+    Every item of MIGRATIONS is a list of statements that moves the schema up
+    one version and the versions applied are recorded in SchemaVersion. The
+    cursor must come from an autocommit connection because indexes are built
+    with CREATE INDEX CONCURRENTLY so that the workers can keep writing while
+    a large Prime table is indexed. Only one process migrates at a time and
+    the others wait for it because the code expects the newest schema. A
+    failed migration is logged and raised so that a database left part way
+    through is not used. Each version is recorded as soon as it is applied
+    so the next attempt, the next time the database is opened, starts over
+    from the version that failed.
+
+    Returns the schema version of the database.
+    '''
+    cur.execute(
+        'CREATE TABLE IF NOT EXISTS SchemaVersion (version integer primary '
+        + 'key, applied timestamp with time zone DEFAULT now());'
+    )
+    current = _version(cur)
+
+    if len(MIGRATIONS) <= current:
+        return current
+
+    # polled because a session blocked on the lock holds a snapshot that
+    # CREATE INDEX CONCURRENTLY in the migrating process would wait on
+    cur.execute('SELECT pg_try_advisory_lock(%s);', [LOCK])
+    while not cur.fetchone()[0]:
+        log.info('waiting for another process to migrate the schema')
+        time.sleep(1)
+        cur.execute('SELECT pg_try_advisory_lock(%s);', [LOCK])
+        pass
+
+    try:
+        _drop_invalid(cur)
+        current = _version(cur)
+        partitioned = partition.is_partitioned(cur)
+        for version, statements in enumerate(
+            MIGRATIONS[current:], start=current + 1
+        ):
+            log.info('migrating the schema to version %d', version)
+            for statement in statements:
+                if partitioned:
+                    # not supported on a partitioned table
+                    statement = statement.replace(' CONCURRENTLY', '')
+                cur.execute(statement)
+            cur.execute(
+                'INSERT INTO SchemaVersion (version) VALUES (%s);', [version]
+            )
+            current = version
+            pass
+    except psycopg.Error:
+        log.exception('could not migrate the schema to version %d', current + 1)
+        raise
+    finally:
+        cur.execute('SELECT pg_advisory_unlock(%s);', [LOCK])
+    return current
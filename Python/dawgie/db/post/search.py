@@ -38,18 +38,28 @@ POSSIBILITY OF SUCH DAMAGE.
 NTR:
 '''
 
+import collections
+import dawgie.context
+import threading
+import time
 import typing
 
+from . import statements
 from ..basis import Params, Range, SearchFacade, SearchResults
 
+# keyset of the search results, which is the order of the search_page rows
+_AFTER = (
+    '(p.run_ID, p.task_ID, p.tn_ID, p.alg_ID, p.sv_ID) > (%s, %s, %s, %s, %s)'
+)
 _CONSTRAINT = 'p.{sql.fk} = ANY(%s)'
-_FKS = 'SELECT pk FROM {sql.table} WHERE name = ANY(%s);'
-_NAMES_ALL = 'SELECT name FROM {sql.table};'
-_NAMES_SOME = 'SELECT name FROM {sql.table} WHERE pk = ANY(%s);'
-_PKS = 'SELECT p.{sql.fk} FROM Prime p WHERE {sql.constraints};'
+_NAMED = 'p.{sql.fk} IN (SELECT PK FROM {sql.table} WHERE name = ANY(%s))'
 _RANGE = 'run_ID >= %s and run_ID < %s'
 _RANGE_UE = 'run_ID >= %s'
 
+_lock = threading.Lock()
+_lru = collections.OrderedDict()
+_state = {'hits': 0, 'misses': 0}
+
 
 class SearchImplementation(SearchFacade):
     def __init__(self, connection_factory, cursor_factory):
@@ -71,6 +81,11 @@ class SearchImplementation(SearchFacade):
         return indices
 
     def __args_n_constraints(self, parameters: Params) -> ([], []):
+        '''the SQL constraints on Prime p and their arguments
+
+        Names are resolved to their PKs by a subquery within the constraint
+        itself so that the statement using them is the only round trip.
+        '''
         args = []
         constraints = []
         for k, v in filter(lambda t: bool(t[1]), parameters._asdict().items()):
@@ -81,30 +96,12 @@ class SearchImplementation(SearchFacade):
                     constraints.append(_CONSTRAINT.format(sql=sql_info))
                     args.append(indices)
             else:
-                connection = self._conn()
-                cursor = self._cur(connection)
-                try:
-                    cursor.execute(_FKS.format(sql=sql_info), (v,))
-                    args.append(list(row[0] for row in cursor.fetchall()))
-                    constraints.append(_CONSTRAINT.format(sql=sql_info))
-                finally:
-                    cursor.close()
-                    connection.close()
+                constraints.append(_NAMED.format(sql=sql_info))
+                args.append(list(v))
         return args, constraints
 
-    def _facet(self, parameters: Params) -> [str]:
-        '''Find the sublist(s) given some constraints
-
-        If parameters.<key> is an empty list, then produce the sublist for that
-        item. If parameters.<key> is None, then there are no constraints.
-        Otherwise, use parameter.<key> to constrain the sublists to be produced.
-
-        The return value is list of strings. If reducing filtering for run id,
-        then the list will always be 0..1 strings. If 0, then no match. If 1,
-        then it be first:last+1 even if the indices are not continuous.
-        '''
+    def __names(self, parameters: Params) -> [str]:
         args, constraints = self.__args_n_constraints(parameters)
-        results = []
         sql_info = None
         for k, v in parameters._asdict().items():
             if SearchFacade._isempty(v):
@@ -116,71 +113,132 @@ class SearchImplementation(SearchFacade):
         cursor = self._cur(connection)
         try:
             if sql_info.constraints:
-                cursor.execute(_PKS.format(sql=sql_info), args)
-                pks = list(set(row[0] for row in cursor.fetchall()))
-                if pks:
-                    cursor.execute(_NAMES_SOME.format(sql=sql_info), (pks,))
-                    results.extend(row[0] for row in cursor.fetchall())
+                statements.execute(
+                    cursor,
+                    'search_facet',
+                    args,
+                    constraints=sql_info.constraints,
+                    fk=sql_info.fk,
+                    table=sql_info.table,
+                )
             else:
-                cursor.execute(_NAMES_ALL.format(sql=sql_info))
-                results.extend(row[0] for row in cursor.fetchall())
+                statements.execute(cursor, 'search_names', table=sql_info.table)
+            results = [row[0] for row in cursor.fetchall()]
         finally:
             cursor.close()
             connection.close()
         return sorted(set(results), key=str.casefold)
 
+    def __total(self, args: [], constraints: str) -> int:
+        connection = self._conn()
+        cursor = self._cur(connection)
+        try:
+            statements.execute(
+                cursor, 'search_count', args, constraints=constraints
+            )
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+            connection.close()
+
+    def _facet(self, parameters: Params) -> [str]:
+        '''Find the sublist(s) given some constraints
+
+        If parameters.<key> is an empty list, then produce the sublist for that
+        item. If parameters.<key> is None, then there are no constraints.
+        Otherwise, use parameter.<key> to constrain the sublists to be produced.
+
+        The return value is list of strings. If reducing filtering for run id,
+        then the list will always be 0..1 strings. If 0, then no match. If 1,
+        then it be first:last+1 even if the indices are not continuous.
+
+        The facet is a single statement and its result is cached like the
+        totals of _find() because the front end asks for the same facets over
+        and over again.
+        '''
+        return list(
+            _cached(
+                ('facet', _normalize(parameters)),
+                lambda: self.__names(parameters),
+            )
+        )
+
     def _find(
-        self, parameters: Params, index: int = 0, limit: int = None
+        self,
+        parameters: Params,
+        index: int = 0,
+        limit: int = None,
+        token: str = None,
     ) -> SearchResults:
         '''Find all of the primary table entries that meet the constraints
 
         The return strings will be in runid order. For large lists, use the
-        pagination index and limit. Each page will require a new DB search
-        as no caching is done for simplicity reasons. Hence large searches
-        are expensive.
+        pagination index and limit or the token of the previous page. A token
+        continues from the key of the last item of the previous page so a deep
+        page costs the same as the first one. The total is cached for
+        dawgie.context.db_search_cache_ttl seconds or until the next run ID is
+        allocated.
         '''
         args, constraints = self.__args_n_constraints(parameters)
         constraints = ' AND '.join(constraints)
         items = []
-        total = -2
         if not constraints:
             raise ValueError(
                 'No constaints means the whole Prime table. '
                 'Apply some constraints and try again'
             )
-        connection = self._conn()
-        cursor = self._cur(connection)
-        try:
-            cursor.execute(
-                'SELECT count(DISTINCT (p.run_ID, p.tn_ID, p.task_ID, '
-                f'p.alg_ID, p.sv_ID)) FROM Prime p WHERE {constraints};',
-                args,
-            )
-            total = cursor.fetchone()[0]
-            limit = total if limit is None else limit
-            if limit:
-                args.extend([limit, index])
-                cursor.execute(
-                    'SELECT DISTINCT ON '
-                    '(p.run_ID, p.tn_ID, p.task_ID, p.alg_ID, p.sv_ID) '
-                    'p.run_ID, tn.name, task.name, alg.name, sv.name '
-                    'FROM Prime p '
-                    'JOIN Target tn ON p.tn_ID = tn.PK '
-                    'JOIN Task task ON p.task_ID = task.PK '
-                    'JOIN Algorithm alg ON p.alg_ID = alg.PK '
-                    'JOIN StateVector sv ON p.sv_ID = sv.PK '
-                    f'WHERE {constraints} '
-                    'ORDER BY p.run_ID, p.tn_ID, p.task_ID, p.alg_ID, p.sv_ID '
-                    'LIMIT %s OFFSET %s;',
-                    args,
-                )
-                items.extend(
-                    '.'.join(map(str, row)) for row in cursor.fetchall()
+        total = _cached(
+            ('total', _normalize(parameters)),
+            lambda: self.__total(args, constraints),
+        )
+        limit = total if limit is None else limit
+        last = None
+        if token:
+            args = args + list(self._untoken(parameters, token))
+            constraints = ' AND '.join([constraints, _AFTER])
+            index = 0
+        if limit:
+            connection = self._conn()
+            cursor = self._cur(connection)
+            try:
+                # one more than the page to learn if another page follows
+                statements.execute(
+                    cursor,
+                    'search_page',
+                    args + [limit + 1, index],
+                    constraints=constraints,
                 )
-        finally:
-            cursor.close()
-            connection.close()
-        return SearchResults(items, total)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+                connection.close()
+            for row in rows[:limit]:
+                items.append('.'.join(map(str, row[:1] + row[5:])))
+                pass
+            if len(rows) > limit:
+                last = rows[limit - 1][:5]
+            pass
+        return SearchResults(
+            items, total, self._token(parameters, last) if last else None
+        )
+
+    @staticmethod
+    def invalidate():
+        '''forget the cached totals and facets because the tables grew'''
+        with _lock:
+            _lru.clear()
+        return
+
+    @staticmethod
+    def stats() -> {}:
+        '''how well the search cache is doing'''
+        with _lock:
+            return {
+                'capacity': dawgie.context.db_search_cache_size,
+                'hits': _state['hits'],
+                'misses': _state['misses'],
+                'size': len(_lru),
+            }
 
 
 class _SqlInfo(typing.NamedTuple):
@@ -197,3 +255,35 @@ _SQL_TABLE = {
     'svs': _SqlInfo('sv_ID', 'StateVector'),
     'vaks': _SqlInfo('val_ID', 'Value'),
 }
+
+
+def _cached(key: tuple, compute):
+    '''the value of key from the cache or compute() when it is not fresh'''
+    if dawgie.context.db_search_cache_size < 1:
+        return compute()
+
+    now = time.monotonic()
+    with _lock:
+        if key in _lru and now < _lru[key][0]:
+            _lru.move_to_end(key)
+            _state['hits'] += 1
+            return _lru[key][1]
+        _state['misses'] += 1
+        pass
+    value = compute()
+    with _lock:
+        _lru[key] = (now + dawgie.context.db_search_cache_ttl, value)
+        _lru.move_to_end(key)
+        while dawgie.context.db_search_cache_size < len(_lru):
+            _lru.popitem(last=False)
+        pass
+    return value
+
+
+def _normalize(value):
+    '''hashable form of value where the order of a list does not matter'''
+    if isinstance(value, tuple):
+        return tuple(_normalize(item) for item in value)
+    if isinstance(value, (list, set)):
+        return tuple(sorted({_normalize(item) for item in value}, key=repr))
+    return value
@@ -0,0 +1,348 @@
+'''Named SQL statements of the postgres database
+
+--
+COPYRIGHT:
+Copyright (c) 2015-2026, California Institute of Technology ("Caltech").
+U.S. Government sponsorship acknowledged.
+
+All rights reserved.
+
+LICENSE:
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+- Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+- Neither the name of Caltech nor its operating division, the Jet
+Propulsion Laboratory, nor the names of its contributors may be used to
+endorse or promote products derived from this software without specific prior
+written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+
+NTR:
+'''
+
+import threading
+import time
+
+# columns that make a row of Algorithm, StateVector, or Value unique
+_VERSIONED = 'name, {parent}, design, implementation, bugfix'
+
+STATEMENTS = {
+    'alg_pks': 'SELECT PK FROM Algorithm WHERE name = %s AND task_ID = %s;',
+    'alg_version': 'SELECT design,implementation,bugfix FROM Algorithm '
+    + 'WHERE PK = %s;',
+    'collect': 'WITH refs AS (SELECT * FROM unnest('
+    + '%s::bigint[], %s::bigint[], %s::bigint[]) '
+    + 'AS r(task_ID, alg_ID, sv_ID)), '
+    + 'latest AS (SELECT Latest.* FROM Latest '
+    + 'JOIN refs USING (task_ID, alg_ID, sv_ID)) '
+    + 'SELECT l.run_ID, l.tn_ID, l.task_ID, l.alg_ID, l.sv_ID, '
+    + 'p.val_ID, t.name, v.name FROM latest l '
+    + 'JOIN Prime p ON p.run_ID = l.run_ID AND p.tn_ID = l.tn_ID '
+    + 'AND p.task_ID = l.task_ID AND p.alg_ID = l.alg_ID AND '
+    + 'p.sv_ID = l.sv_ID '
+    + 'JOIN Target t ON t.PK = l.tn_ID '
+    + 'JOIN Value v ON v.PK = p.val_ID;',
+    # 1: runs of each target that wrote every output
+    # 2: runs where each input has the same blob as its newest run
+    # 3: runs where all inputs of a task.alg agree then for each target the
+    #    earliest run from which every task.alg has a consistent input
+    # 4: newest output run not older than that and its output rows
+    'consistent': 'WITH tns AS (SELECT unnest(%s::bigint[]) AS tn_ID), '
+    + 'outs AS (SELECT * FROM unnest(%s::integer[], %s::bigint[], '
+    + '%s::bigint[], %s::bigint[], %s::bigint[]) '
+    + 'AS o(idx, task_ID, alg_ID, sv_ID, val_ID)), '
+    + 'o_runs AS (SELECT p.tn_ID, p.run_ID FROM Prime p JOIN tns '
+    + 'USING (tn_ID) JOIN outs USING (task_ID, alg_ID, sv_ID, val_ID) '
+    + 'WHERE p.run_ID <> 0 GROUP BY p.tn_ID, p.run_ID '
+    + 'HAVING count(*) = (SELECT count(*) FROM outs)), '
+    + 'ins AS (SELECT * FROM unnest(%s::integer[], %s::bigint[], '
+    + '%s::varchar[], %s::varchar[], %s::varchar[]) '
+    + 'AS i(k, task_ID, alg, sv, val)), '
+    + 'kn AS (SELECT k, count(*) AS n FROM ins GROUP BY k), '
+    + 'i_rows AS (SELECT i.k, i.task_ID, i.alg, i.sv, i.val, p.tn_ID, '
+    + 'p.run_ID, p.blob_name FROM ins i '
+    + 'JOIN Algorithm a ON a.task_ID = i.task_ID AND a.name = i.alg '
+    + 'JOIN StateVector s ON s.alg_ID = a.PK AND s.name = i.sv '
+    + 'JOIN Value v ON v.sv_ID = s.PK AND v.name = i.val '
+    + 'JOIN Prime p ON p.task_ID = i.task_ID AND p.alg_ID = a.PK AND '
+    + 'p.sv_ID = s.PK AND p.val_ID = v.PK JOIN tns ON tns.tn_ID = p.tn_ID), '
+    + 'newest AS (SELECT DISTINCT ON (k, task_ID, alg, sv, val, tn_ID) '
+    + 'k, task_ID, alg, sv, val, tn_ID, blob_name FROM i_rows '
+    + 'ORDER BY k, task_ID, alg, sv, val, tn_ID, run_ID DESC), '
+    + 'k_runs AS (SELECT r.k, r.tn_ID, r.run_ID FROM i_rows r '
+    + 'JOIN newest USING (k, task_ID, alg, sv, val, tn_ID, blob_name) '
+    + 'JOIN kn USING (k) GROUP BY r.k, r.tn_ID, r.run_ID, kn.n '
+    + 'HAVING count(DISTINCT (r.task_ID, r.alg, r.sv, r.val)) = kn.n), '
+    + 'bounds AS (SELECT tn_ID, max(first) AS bound FROM (SELECT k, tn_ID, '
+    + 'min(run_ID) AS first FROM k_runs GROUP BY k, tn_ID) AS f '
+    + 'GROUP BY tn_ID HAVING count(*) = (SELECT count(*) FROM kn)), '
+    + 'found AS (SELECT o.tn_ID, max(o.run_ID) AS run_ID FROM o_runs o '
+    + 'LEFT JOIN bounds b USING (tn_ID) WHERE o.run_ID >= b.bound OR '
+    + 'NOT EXISTS (SELECT 1 FROM kn) GROUP BY o.tn_ID) '
+    + 'SELECT p.tn_ID, p.task_ID, p.alg_ID, p.sv_ID, p.val_ID, '
+    + 'p.blob_name FROM found f JOIN Prime p USING (tn_ID, run_ID) '
+    + 'JOIN outs o USING (task_ID, alg_ID, sv_ID, val_ID) '
+    + 'ORDER BY p.tn_ID, o.idx;',
+    'database_oid': 'SELECT oid FROM pg_database '
+    + 'WHERE datname = current_database();',
+    'dim_insert': 'INSERT INTO {table} (name) VALUES (%s) '
+    + 'ON CONFLICT (name) DO NOTHING RETURNING PK;',
+    'dim_pk': 'SELECT PK FROM {table} WHERE name = %s;',
+    'dim_rows': 'SELECT PK,name FROM {table};',
+    'dim_warm': 'SELECT PK,name FROM {table} ORDER BY PK;',
+    'entry_blob': 'SELECT blob_name FROM Prime WHERE run_ID = %s AND '
+    + 'tn_ID = %s AND task_ID = %s AND alg_ID = %s AND '
+    + 'sv_ID = %s AND val_ID = %s;',
+    'fill': 'SELECT val_ID,blob_name FROM Prime WHERE run_ID = %s '
+    + 'AND alg_ID = %s AND tn_ID = %s '
+    + 'AND task_ID = %s AND sv_ID = %s;',
+    'known_blobs': 'SELECT DISTINCT blob_name FROM Prime '
+    + 'WHERE blob_name = ANY(%s);',
+    'last_runid': 'SELECT GREATEST((SELECT MAX(run_ID) FROM Run), '
+    + '(SELECT MAX(run_ID) FROM Prime), 0);',
+    'latest_advance': 'INSERT INTO Latest '
+    + '(tn_ID, task_ID, alg_ID, sv_ID, run_ID) VALUES '
+    + '(%s, %s, %s, %s, %s) ON CONFLICT (tn_ID, task_ID, alg_ID, sv_ID) '
+    + 'DO UPDATE SET run_ID = EXCLUDED.run_ID '
+    + 'WHERE Latest.run_ID < EXCLUDED.run_ID;',
+    'latest_alg_run': 'SELECT MAX(run_ID) FROM Latest WHERE tn_ID = %s AND '
+    + 'task_ID = %s AND alg_ID = %s;',
+    'latest_delete': 'DELETE FROM Latest WHERE tn_ID = %s AND task_ID = %s '
+    + 'AND alg_ID = ANY(%s) AND sv_ID = ANY(%s);',
+    'latest_recount': 'INSERT INTO Latest '
+    + '(tn_ID, task_ID, alg_ID, sv_ID, run_ID) '
+    + 'SELECT tn_ID, task_ID, alg_ID, sv_ID, MAX(run_ID) FROM Prime '
+    + 'WHERE tn_ID = %s AND task_ID = %s AND alg_ID = ANY(%s) AND '
+    + 'sv_ID = ANY(%s) GROUP BY tn_ID, task_ID, alg_ID, sv_ID;',
+    'latest_sv_run': 'SELECT MAX(run_ID) FROM Latest WHERE tn_ID = %s AND '
+    + 'task_ID = %s AND alg_ID = ANY(%s) AND sv_ID = ANY(%s);',
+    'metrics': 'SELECT p.run_ID, p.task_ID, p.tn_ID, p.alg_ID, task.name, '
+    + 'tn.name, alg.name, alg.design, alg.implementation, alg.bugfix, '
+    + 'val.name, p.blob_name FROM Prime p '
+    + 'JOIN StateVector sv ON sv.PK = p.sv_ID '
+    + 'JOIN Task task ON task.PK = p.task_ID '
+    + 'JOIN Target tn ON tn.PK = p.tn_ID '
+    + 'JOIN Algorithm alg ON alg.PK = p.alg_ID '
+    + 'JOIN Value val ON val.PK = p.val_ID '
+    + "WHERE sv.name = '__metric__' AND (p.run_ID > %s OR p.run_ID = 0) "
+    + 'ORDER BY p.run_ID, p.task_ID, p.tn_ID, p.alg_ID;',
+    'next_runid': 'INSERT INTO Run (run_ID, event, revision) SELECT GREATEST('
+    + '(SELECT MAX(run_ID) FROM Run), (SELECT MAX(run_ID) FROM Prime), '
+    + '0) + 1, %s, %s RETURNING run_ID;',
+    'prefetch': 'SELECT wanted.*, blob_name, design, implementation, bugfix '
+    + 'FROM unnest(%s::integer[], '
+    + '%s::bigint[], %s::bigint[], %s::bigint[], %s::bigint[], '
+    + '%s::bigint[]) AS wanted (run_ID, tn_ID, task_ID, alg_ID, '
+    + 'sv_ID, val_ID) JOIN Prime USING (run_ID, tn_ID, task_ID, '
+    + 'alg_ID, sv_ID, val_ID) JOIN StateVector ON '
+    + 'StateVector.PK = wanted.sv_ID;',
+    'prime_alg_rows': 'SELECT sv_ID,val_ID,blob_name FROM Prime WHERE '
+    + 'run_ID = %s AND tn_ID = %s AND task_ID = %s AND alg_ID = %s;',
+    'prime_exists': 'SELECT EXISTS (SELECT 1 FROM Prime WHERE '
+    + 'run_ID = %s AND tn_ID = %s AND task_ID = %s '
+    + 'AND alg_ID = %s AND sv_ID = %s AND val_ID = %s '
+    + 'AND blob_name = %s);',
+    'prime_ids': 'SELECT PK,alg_ID,sv_ID FROM Prime WHERE '
+    + 'run_ID = %s AND tn_ID = %s AND task_ID = %s AND alg_ID = ANY(%s) '
+    + 'AND sv_ID = ANY(%s);',
+    'prime_insert': 'INSERT INTO Prime (run_ID, task_ID, tn_ID, alg_ID, '
+    + 'sv_ID, val_ID, blob_name) VALUES (%s, %s, %s, %s, %s, %s, %s);',
+    'prime_keys': 'SELECT DISTINCT (p.run_ID::text || \'.\' || tn.name || '
+    + '\'.\' || task.name || \'.\' || alg.name || \'.\' || sv.name || '
+    + '\'.\' || val.name) COLLATE "C" FROM Prime p '
+    + 'JOIN Target tn ON tn.PK = p.tn_ID '
+    + 'JOIN Task task ON task.PK = p.task_ID '
+    + 'JOIN Algorithm alg ON alg.PK = p.alg_ID '
+    + 'JOIN StateVector sv ON sv.PK = p.sv_ID '
+    + 'JOIN Value val ON val.PK = p.val_ID ORDER BY 1;',
+    'prime_narrow': 'SELECT alg_ID,sv_ID FROM Prime WHERE '
+    + 'run_ID = %s AND tn_ID = %s AND task_ID = %s '
+    + 'AND alg_ID = ANY(%s) AND sv_ID = ANY(%s);',
+    'prime_remove': 'DELETE FROM Prime WHERE run_ID = %s AND tn_ID = %s AND '
+    + 'task_ID = %s AND alg_ID = ANY(%s) AND sv_ID = ANY(%s) AND '
+    + 'val_ID = ANY(%s);',
+    'prime_runs': 'SELECT run_ID FROM Prime WHERE tn_ID = %s AND '
+    + 'task_ID = %s AND alg_ID = ANY(%s) AND sv_ID = ANY(%s);',
+    'prime_upsert': 'INSERT INTO Prime (run_ID, task_ID, tn_ID, alg_ID, '
+    + 'sv_ID, val_ID, blob_name) VALUES (%s, %s, %s, %s, %s, %s, %s) '
+    + 'ON CONFLICT ON CONSTRAINT '
+    + 'prime_run_id_task_id_tn_id_alg_id_sv_id_val_id_key '
+    + 'DO UPDATE SET blob_name = EXCLUDED.blob_name, '
+    + 'written = pg_current_xact_id();',
+    'prime_values': 'SELECT blob_name FROM Prime;',
+    'prime_val_IDs': 'SELECT val_ID FROM Prime WHERE run_ID = %s AND '
+    + 'alg_ID = %s AND tn_ID = %s AND task_ID = %s AND sv_ID = %s;',
+    'promote': 'INSERT INTO Prime (run_ID, tn_ID, task_ID, alg_ID, sv_ID, '
+    + 'val_ID, blob_name) SELECT %s, * FROM unnest(%s::bigint[], '
+    + '%s::bigint[], %s::bigint[], %s::bigint[], %s::bigint[], '
+    + '%s::varchar[]);',
+    'promoted': 'SELECT EXISTS (SELECT 1 FROM Prime JOIN unnest(%s::bigint[], '
+    + '%s::bigint[], %s::bigint[], %s::bigint[], %s::bigint[]) '
+    + 'AS j(tn_ID, task_ID, alg_ID, sv_ID, val_ID) '
+    + 'USING (tn_ID, task_ID, alg_ID, sv_ID, val_ID) '
+    + 'WHERE run_ID = %s AND blob_name IS NOT NULL);',
+    'retarget_insert': 'INSERT INTO Prime (run_ID, tn_ID, task_ID, alg_ID, '
+    + 'sv_ID, val_ID, blob_name) VALUES (%s, %s, %s, %s, %s, %s, %s);',
+    'runs': 'SELECT run_ID, event, revision, created FROM Run '
+    + 'WHERE run_ID > %s ORDER BY run_ID;',
+    'search_count': 'SELECT count(DISTINCT (p.run_ID, p.tn_ID, p.task_ID, '
+    + 'p.alg_ID, p.sv_ID)) FROM Prime p WHERE {constraints};',
+    # semi-join so every name is produced once however many rows it has
+    'search_facet': 'SELECT f.name FROM {table} f WHERE EXISTS (SELECT 1 '
+    + 'FROM Prime p WHERE p.{fk} = f.PK AND {constraints});',
+    'search_names': 'SELECT name FROM {table};',
+    # ordered like the Prime unique constraint so that its index serves it
+    'search_page': 'SELECT DISTINCT ON '
+    + '(p.run_ID, p.task_ID, p.tn_ID, p.alg_ID, p.sv_ID) '
+    + 'p.run_ID, p.task_ID, p.tn_ID, p.alg_ID, p.sv_ID, '
+    + 'tn.name, task.name, alg.name, sv.name '
+    + 'FROM Prime p '
+    + 'JOIN Target tn ON p.tn_ID = tn.PK '
+    + 'JOIN Task task ON p.task_ID = task.PK '
+    + 'JOIN Algorithm alg ON p.alg_ID = alg.PK '
+    + 'JOIN StateVector sv ON p.sv_ID = sv.PK '
+    + 'WHERE {constraints} '
+    + 'ORDER BY p.run_ID, p.task_ID, p.tn_ID, p.alg_ID, p.sv_ID '
+    + 'LIMIT %s OFFSET %s;',
+    'sv_pks': 'SELECT PK FROM StateVector WHERE name = %s AND '
+    + 'alg_ID = ANY(%s);',
+    'sv_version': 'SELECT design,implementation,bugfix FROM StateVector '
+    + 'WHERE PK = %s;',
+    'target_insert': 'INSERT INTO Target (name) VALUES (%s) RETURNING PK;',
+    'targets': 'SELECT name FROM Target;',
+    # newest version of each algorithm then its latest run for every target
+    'trace': 'WITH names AS (SELECT * FROM unnest(%s::varchar[], '
+    + '%s::varchar[]) AS n(task, alg)), '
+    + 'newest AS (SELECT * FROM (SELECT names.task, names.alg, '
+    + 'a.task_ID, a.PK AS alg_ID, row_number() OVER (PARTITION BY '
+    + 'a.task_ID, a.name ORDER BY a.design DESC, a.implementation DESC, '
+    + 'a.bugfix DESC) AS rank FROM names '
+    + 'JOIN Task t ON t.name = names.task '
+    + 'JOIN Algorithm a ON a.task_ID = t.PK AND a.name = names.alg) '
+    + 'AS ranked WHERE rank = 1) '
+    + "SELECT tn.name, n.task || '.' || n.alg, MAX(l.run_ID) "
+    + 'FROM newest n JOIN Latest l ON l.task_ID = n.task_ID AND '
+    + 'l.alg_ID = n.alg_ID JOIN Target tn ON tn.PK = l.tn_ID '
+    + 'GROUP BY tn.name, n.task, n.alg;',
+    'value_name': 'SELECT name FROM Value WHERE PK = %s;',
+    'value_pks': 'SELECT PK FROM Value WHERE name = %s AND sv_ID = ANY(%s);',
+    'versioned_insert': 'INSERT INTO {table} ('
+    + _VERSIONED
+    + ') VALUES '
+    + '(%s, %s, %s, %s, %s) ON CONFLICT ('
+    + _VERSIONED
+    + ') '
+    + 'DO NOTHING RETURNING PK;',
+    'versioned_pk': 'SELECT PK FROM {table} WHERE name = %s AND '
+    + '{parent} = %s AND design = %s AND implementation = %s AND '
+    + 'bugfix = %s;',
+    'versioned_upsert': 'WITH wanted ('
+    + _VERSIONED
+    + ') AS (SELECT * FROM '
+    + 'unnest(%s::varchar[], %s::bigint[], %s::integer[], %s::integer[], '
+    + '%s::integer[])), added AS (INSERT INTO {table} ('
+    + _VERSIONED
+    + ') '
+    + 'SELECT * FROM wanted ON CONFLICT ('
+    + _VERSIONED
+    + ') DO NOTHING '
+    + 'RETURNING PK, '
+    + _VERSIONED
+    + ') SELECT PK, '
+    + _VERSIONED
+    + ' FROM '
+    + 'added UNION ALL SELECT PK, '
+    + _VERSIONED
+    + ' FROM {table} JOIN '
+    + 'wanted USING ('
+    + _VERSIONED
+    + ');',
+    'versioned_rows': 'SELECT PK,{parent},name,design,implementation,bugfix '
+    + 'FROM {table};',
+    'versioned_warm': 'SELECT PK,name,{parent},design,implementation,bugfix '
+    + 'FROM {table} ORDER BY PK;',
+}
+
+_lock = threading.Lock()
+_state = {'counters': {}}
+
+
+def execute(cur, name: str, args=None, **fields):
+    '''execute the statement name with args as a prepared statement
+
+    The fields fill in the table and column names of the statements that are
+    shared by more than one table. psycopg prepares a statement the first
+    time a connection sees it and every later execute on that connection
+    only binds args, so the statement is parsed and planned once for each
+    pooled connection rather than once for each call. Returns cur so that
+    its rows can be fetched.
+    '''
+    begin = time.perf_counter()
+    try:
+        cur.execute(sql(name, **fields), args, prepare=True)
+    finally:
+        record(name, time.perf_counter() - begin, cur.rowcount)
+    return cur
+
+
+def executemany(cur, name: str, rows: [], **fields):
+    '''execute the statement name once for each of rows
+
+    psycopg prepares the statement itself because it is executed many times.
+    '''
+    begin = time.perf_counter()
+    try:
+        cur.executemany(sql(name, **fields), rows)
+    finally:
+        record(name, time.perf_counter() - begin, cur.rowcount)
+    return cur
+
+
+def record(name: str, seconds: float, rows: int):
+    '''count one call of the statement name'''
+    with _lock:
+        counter = _state['counters'].setdefault(
+            name, {'calls': 0, 'rows': 0, 'seconds': 0.0}
+        )
+        counter['calls'] += 1
+        # rowcount is unknown (-1) within a pipeline
+        counter['rows'] += max(0, rows)
+        counter['seconds'] += seconds
+        pass
+    return
+
+
+def sql(name: str, **fields) -> str:
+    '''the text of the statement name for cursors that cannot prepare it'''
+    return STATEMENTS[name].format(**fields) if fields else STATEMENTS[name]
+
+
+def stats() -> {}:
+    '''calls, rows, and total seconds of each statement in this process
+
+    Of particular interest is seconds because it shows which statements
+    dominate the time spent in the database.
+    '''
+    with _lock:
+        return {
+            name: dict(counter)
+            for name, counter in sorted(_state['counters'].items())
+        }
@@ -38,6 +38,7 @@ POSSIBILITY OF SUCH DAMAGE.
 NTR:
 '''
 
+import datetime
 import dawgie.context
 import dawgie.db
 import dawgie.db.util
@@ -57,11 +58,11 @@ from .search import SearchImplementation
 from .state import DBI
 
 
-def _prime_keys() -> [(int, str, str, str, str, str)]:
+def _iter_prime_keys():
     if not DBI().is_open:
-        raise RuntimeError('called _prime_keys before open')
-    return [
-        '.'.join(
+        raise RuntimeError('called _iter_prime_keys before open')
+    for key in util.iter_prime_keys(DBI().tables.prime):
+        yield '.'.join(
             [
                 str(key[0]),
                 util.dissect(DBI().indices.target[key[1]])[1],
@@ -71,14 +72,55 @@ def _prime_keys() -> [(int, str, str, str, str, str)]:
                 util.dissect(DBI().indices.value[key[5]])[1],
             ]
         )
-        for key in util.prime_keys(DBI().tables.prime)
-    ]
+        pass
+    return
+
+
+def _iter_prime_values():
+    if not DBI().is_open:
+        raise RuntimeError('called _iter_prime_values before open')
+    yield from DBI().tables.prime.values()
+    return
+
+
+def _last_runid() -> int:
+    '''the newest run ID in either the Run or Prime table
+
+    Only the Foreman allocates run IDs so the Run table is a counter, but an
+    older database or one filled without the Foreman may hold newer run IDs in
+    Prime only.
+    '''
+    return max(
+        max(map(int, DBI().tables.run), default=0),
+        max(
+            (int(key[0]) for key in util.iter_prime_keys(DBI().tables.prime)),
+            default=0,
+        ),
+    )
+
+
+def _prime_keys() -> [(int, str, str, str, str, str)]:
+    if not DBI().is_open:
+        raise RuntimeError('called _prime_keys before open')
+    return list(_iter_prime_keys())
 
 
 def _prime_values() -> [str]:
     if not DBI().is_open:
         raise RuntimeError('called _prime_keys before open')
-    return list(DBI().tables.prime.values())
+    return list(_iter_prime_values())
+
+
+def _referenced(names: [str]) -> {str}:
+    '''the blob names in names that a row of the Prime table refers to
+
+    The Prime table has no index of its values so every call reads all of
+    them, which makes large batches of names much cheaper than small ones.
+    '''
+    if not DBI().is_open:
+        raise RuntimeError('called _referenced before open')
+    wanted = set(names)
+    return {value for value in _iter_prime_values() if value in wanted}
 
 
 def add(target_name: str) -> bool:
@@ -181,6 +223,13 @@ def consistent(
     raise NotImplementedError('Not ready for shelve')
 
 
+def consistent_many(
+    inputs: [dawgie.db.REF], outputs: [dawgie.db.REF], target_names: [str]
+) -> {str: ()}:
+    '''consistent() for many targets at once'''
+    raise NotImplementedError('Not ready for shelve')
+
+
 def copy(dst, method, gateway):
     '''Copy database to destination.'''
     if not DBI().is_open:
@@ -214,6 +263,19 @@ def gather(anz, ans) -> dawgie.Aspect:
     return Interface(anz, ans, '__all__')
 
 
+def iter_metrics(after_runid: int = -1):
+    yield from metrics(after_runid)
+    return
+
+
+def last_runid() -> int:
+    if not DBI().is_open:
+        raise RuntimeError('called last_runid before open')
+    if DBI().is_reopened:
+        raise RuntimeError('called outside of Foreman context')
+    return _last_runid()
+
+
 def metrics(after_runid: int = -1) -> [dawgie.db.MetricData]:
     # pylint: disable=too-many-locals
     if not DBI().is_open:
@@ -302,15 +364,22 @@ def metrics(after_runid: int = -1) -> [dawgie.db.MetricData]:
     return result
 
 
-def next():  # pylint: disable=redefined-builtin
-    '''Return the next run ID'''
+def next(event: str = None):  # pylint: disable=redefined-builtin
+    '''Allocate the next run ID and record what triggered it'''
     if not DBI().is_open:
         raise RuntimeError('called next before open')
     if DBI().is_reopened:
         raise RuntimeError('called outside of Foreman context')
 
-    known = [int(key[0]) for key in util.prime_keys(DBI().tables.prime)]
-    return max(known) + 1 if known else 1
+    runid = _last_runid() + 1
+    # the run ID leads so that util.indexed() never compares the rest
+    DBI().tables.run[str(runid)] = (
+        runid,
+        event,
+        str(dawgie.context.git_rev),
+        datetime.datetime.now(datetime.timezone.utc),
+    )
+    return runid
 
 
 def open():  # pylint: disable=redefined-builtin
@@ -419,12 +488,29 @@ def retreat(reg, ret) -> dawgie.Timeline:
     )
 
 
+def runs(after_runid: int = -1) -> [dawgie.db.RunData]:
+    if not DBI().is_open:
+        raise RuntimeError('called runs before open')
+    if DBI().is_reopened:
+        raise RuntimeError('called outside of Foreman context')
+    after_runid = -1 if after_runid is None else after_runid
+    return [
+        dawgie.db.RunData(*run)
+        for run in sorted(DBI().tables.run.values())
+        if after_runid < run[0]
+    ]
+
+
 def search() -> SearchFacade:
     if not DBI().is_open:
         raise RuntimeError('called search before open')
     return SearchImplementation()
 
 
+def stats() -> {}:
+    return {}
+
+
 def targets():
     if not DBI().is_open:
         raise RuntimeError('called targets before open')
@@ -525,6 +611,13 @@ def update(tsk, alg, sv, vn, v):
     return
 
 
+def update_many(tsk, items: [tuple]):
+    '''update() for every (alg, sv, vn, v) of items'''
+    for alg, sv, vn, v in items:
+        update(tsk, alg, sv, vn, v)
+    return
+
+
 def versions():
     '''Collate all of the known versions
 
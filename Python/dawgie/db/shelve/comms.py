@@ -100,9 +100,12 @@ class Connector:  # pylint: disable=too-few-public-methods
         return util.prime_keys(self._table(Table.prime))
 
     def _set_prime(
-        self, key: (int, int, int, int, int, int), value: dawgie.Value
+        self,
+        key: (int, int, int, int, int, int),
+        value: dawgie.Value,
+        codec: str = None,
     ):
-        value = dawgie.db.util.encode(value)
+        value = dawgie.db.util.encode(value, codec)
         return self.__do(COMMAND(Func.set, key, Table.prime, value))
 
     def _table(self, table) -> {}:
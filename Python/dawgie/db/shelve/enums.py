@@ -78,4 +78,5 @@ class Table(enum.IntEnum):
     target = 3
     task = 4
     value = 5
+    run = 6
     pass
@@ -39,6 +39,8 @@ NTR:
 '''
 
 import collections
+import concurrent.futures
+import dawgie.db.util
 import dawgie.util
 import dawgie.util.metrics
 
@@ -48,9 +50,12 @@ from dawgie import Dataset, Timeline
 from dawgie.db.util.wraps import Container
 
 from . import comms
+from . import util
 from .comms import Connector
 from .enums import Table
 
+ENTRY = collections.namedtuple('ENTRY', ['blob_name'])
+
 
 class Interface(Connector, Container, Dataset, Timeline):
     def __init__(self, *args):
@@ -124,7 +129,8 @@ class Interface(Connector, Container, Dataset, Timeline):
         tnis = {
             index: name for name, index in self._table(Table.target).items()
         }
-        for pk in self._prime_keys():
+        prime = self._table(Table.prime)
+        for pk in util.prime_keys(prime):
             if pk[2:] in refis:
                 tn = tnis[pk[1]]
                 fsvn, vn = refis[pk[2:]]
@@ -140,7 +146,7 @@ class Interface(Connector, Container, Dataset, Timeline):
         for fsvns in self.__span.values():
             for vns in fsvns.values():
                 for vn, val in vns.items():
-                    vns[vn] = self._get_prime(val)
+                    vns[vn] = ENTRY(prime[str(val)])
             pass
         return
 
@@ -154,6 +160,12 @@ class Interface(Connector, Container, Dataset, Timeline):
         return keys
 
     def _fill_item(self, l1k, l2k, l3k):
+        if isinstance(self.__span[l1k][l2k][l3k], concurrent.futures.Future):
+            self.__span[l1k][l2k][l3k] = self.__span[l1k][l2k][l3k].result()
+        elif isinstance(self.__span[l1k][l2k][l3k], ENTRY):
+            self.__span[l1k][l2k][l3k] = dawgie.db.util.decode(
+                self.__span[l1k][l2k][l3k].blob_name
+            )
         return self.__span[l1k][l2k][l3k]
 
     def _load(self, algref=None, err=True, ver=None, lok=None):
@@ -266,12 +278,25 @@ class Interface(Connector, Container, Dataset, Timeline):
     def ds(self):
         return self
 
+    def _prefetch(self, l1k, l2k):
+        dawgie.db.util.prefetch_span(
+            self.__span,
+            l1k,
+            l2k,
+            ENTRY,
+            lambda entries: {
+                entry: (entry.blob_name, None) for entry in entries
+            },
+        )
+        return
+
     def _recede(self, refs: [(dawgie.SV_REF, dawgie.V_REF)]) -> None:
         self.__span = collections.OrderedDict()
         refis = self.__refs2indices(refs)
         tni = self._table(Table.target)[self._tn()]
+        prime = self._table(Table.prime)
         for pk in sorted(
-            filter(lambda t, k=tni: t[1] == k, self._prime_keys()),
+            filter(lambda t, k=tni: t[1] == k, util.prime_keys(prime)),
             key=lambda k: k[0],
             reverse=True,
         ):
@@ -281,7 +306,7 @@ class Interface(Connector, Container, Dataset, Timeline):
                     self.__span[pk[0]] = {}
                 if fsvn not in self.__span[pk[0]]:
                     self.__span[pk[0]][fsvn] = {}
-                self.__span[pk[0]][fsvn][vn] = self._get_prime(pk)
+                self.__span[pk[0]][fsvn][vn] = ENTRY(prime[str(pk)])
                 pass
             pass
         return
@@ -326,7 +351,7 @@ class Interface(Connector, Container, Dataset, Timeline):
                     runid, tn, task = self._runid(), self._tn(), self._task()
                     alg, vn = self._alg(), k
                     vname = self.__to_key(runid, tn, task, alg, sv, vn)
-                    isnew = not self._set_prime(vname, sv[k])
+                    isnew = not self._set_prime(vname, sv[k], sv.codec())
                     self._bot().new_values(
                         (
                             '.'.join(
@@ -373,7 +398,7 @@ class Interface(Connector, Container, Dataset, Timeline):
                 runid, tn, task = self._runid(), self._tn(), self._task()
                 alg = self._alg()
                 vname = self.__to_key(runid, tn, task, alg, msv, k)
-                isnew = not self._set_prime(vname, msv[k])
+                isnew = not self._set_prime(vname, msv[k], msv.codec())
                 self._bot().new_values(
                     (
                         '.'.join(
@@ -38,6 +38,8 @@ POSSIBILITY OF SUCH DAMAGE.
 NTR:
 '''
 
+import bisect
+
 from ..basis import Params, SearchFacade, SearchResults
 from .enums import Table
 from .state import DBI
@@ -87,25 +89,38 @@ class SearchImplementation(SearchFacade):
         return sorted({dissect(table[pk[idx]])[1] for pk in pks})
 
     def _find(
-        self, parameters: Params, index: int = 0, limit: int = None
+        self,
+        parameters: Params,
+        index: int = 0,
+        limit: int = None,
+        token: str = None,
     ) -> SearchResults:
         '''Find all of the primary table entries that meet the constraints
 
         The return strings will be in runid order. For large lists, use the
-        pagination index and limit. Each page will require a new DB search
-        as no caching is done for simplicity reasons. Hence large searches
-        are expensive.
+        pagination index and limit or the token of the previous page.
         '''
         items: [str] = []
         pks: [()] = self._prime_keys(parameters)
-        for pk in pks[index:limit]:
+        if token:
+            index = bisect.bisect_right(pks, self._untoken(parameters, token))
+        stop = len(pks) if limit is None else index + limit
+        for pk in pks[index:stop]:
             rid = f'{pk[0]}'
             tgt = dissect(DBI().indices.target[pk[1]])[1]
             tn = dissect(DBI().indices.task[pk[2]])[1]
             an = dissect(DBI().indices.alg[pk[3]])[1]
             svn = dissect(DBI().indices.state[pk[4]])[1]
             items.append(f'{rid}.{tgt}.{tn}.{an}.{svn}')
-        return SearchResults(items=items, total=len(pks))
+        return SearchResults(
+            items=items,
+            total=len(pks),
+            token=(
+                self._token(parameters, pks[stop - 1])
+                if index < stop < len(pks)
+                else None
+            ),
+        )
 
 
 def _align(param_name: str) -> int:
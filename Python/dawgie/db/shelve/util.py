@@ -120,9 +120,15 @@ def make_staging_dir():
     return tstring
 
 
+def iter_prime_keys(prime_table):
+    for k in prime_table:
+        # because shelve key must be a string, pylint: disable=eval-used
+        yield eval(k)
+    return
+
+
 def prime_keys(prime_table):
-    # because shelve key must be a string, pylint: disable=eval-used
-    return [eval(k) for k in prime_table]
+    return list(iter_prime_keys(prime_table))
 
 
 def rotated_files(index=None):
@@ -134,6 +140,7 @@ def rotated_files(index=None):
         orig += glob.glob(f"{path}/{dawgie.context.db_name}.target")
         orig += glob.glob(f"{path}/{dawgie.context.db_name}.task")
         orig += glob.glob(f"{path}/{dawgie.context.db_name}.value")
+        orig += glob.glob(f"{path}/{dawgie.context.db_name}.run")
         return orig
     orig = glob.glob(f"{path}/{index:d}.{dawgie.context.db_name}.alg")
     orig += glob.glob(f"{path}/{index:d}.{dawgie.context.db_name}.prime")
@@ -141,6 +148,7 @@ def rotated_files(index=None):
     orig += glob.glob(f"{path}/{index:d}.{dawgie.context.db_name}.target")
     orig += glob.glob(f"{path}/{index:d}.{dawgie.context.db_name}.task")
     orig += glob.glob(f"{path}/{index:d}.{dawgie.context.db_name}.value")
+    orig += glob.glob(f"{path}/{index:d}.{dawgie.context.db_name}.run")
     return orig
 
 
@@ -63,6 +63,12 @@ def consistent(inputs: [REF], outputs: [REF], target_name: str) -> ():
     raise NotImplementedError()
 
 
+def consistent_many(
+    inputs: [REF], outputs: [REF], target_names: [str]
+) -> {str: ()}:
+    raise NotImplementedError()
+
+
 def copy(dst, method, gateway):
     raise NotImplementedError()
 
@@ -71,11 +77,19 @@ def gather(anz, ans):
     raise NotImplementedError()
 
 
+def iter_metrics(after_runid: int = -1):
+    raise NotImplementedError()
+
+
+def last_runid():
+    raise NotImplementedError()
+
+
 def metrics() -> '[dawgie.db.METRIC_DATA]':  # noqa: F821
     raise NotImplementedError()
 
 
-def next():
+def next(event: str = None):
     raise NotImplementedError()
 
 
@@ -99,6 +113,14 @@ def retreat(reg, ret):
     raise NotImplementedError()
 
 
+def runs(after_runid: int = -1):
+    raise NotImplementedError()
+
+
+def stats():
+    return {}
+
+
 def targets():
     return ['a', 'b', 'c', 'd', 'e', 'f', 'g']
 
@@ -111,6 +133,10 @@ def update(tsk, alg, sv, vn, v):
     raise NotImplementedError()
 
 
+def update_many(tsk, items):
+    raise NotImplementedError()
+
+
 def versions():
     raise NotImplementedError()
 
@@ -49,19 +49,22 @@ def consumption():
     db = []
     dbs = []
     # false positive # pylint: disable=possibly-used-before-assignment
-    known = list(dawgie.db._prime_values())
+    known = set(dawgie.db._iter_prime_values())
     # false positive # pylint: enable=possibly-used-before-assignment
     scrapes = {}
     for dp, dns, fns in os.walk(dawgie.context.data_dbs):
         for dn in dns:
-            scrapes[dn] = scrapes.get(dn, [])
+            if not dawgie.db.util.SHARD.fullmatch(dn):
+                scrapes[dn] = scrapes.get(dn, [])
 
         for fn in fns:
             ffn = os.path.join(dp, fn)
             dbs.append(os.path.getsize(ffn))
             src = dp.split('/')[-1]
 
-            if src == 'dbs' and fn in known:
+            generated = src == 'dbs' or dawgie.db.util.SHARD.fullmatch(src)
+
+            if generated and fn in known:
                 db.append(dbs[-1])
             if src in scrapes:
                 scrapes[src].append(dbs[-1])
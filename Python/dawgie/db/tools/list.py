@@ -47,7 +47,9 @@ import sys
 def info(runid, tn, taskn, algn, svn):
     # pylint: disable=protected-access,used-before-assignment
     dawgie.db.reopen()
-    svl = list({'.'.join(k.split('.')[:-1]) for k in dawgie.db._prime_keys()})
+    svl = list(
+        {'.'.join(k.split('.')[:-1]) for k in dawgie.db._iter_prime_keys()}
+    )
     dawgie.db.close()
     dawgie.security.finalize()
     svl.sort()
@@ -0,0 +1,134 @@
+#! /usr/bin/env python3
+'''
+COPYRIGHT:
+Copyright (c) 2015-2026, California Institute of Technology ("Caltech").
+U.S. Government sponsorship acknowledged.
+
+All rights reserved.
+
+LICENSE:
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+- Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+- Neither the name of Caltech nor its operating division, the Jet
+Propulsion Laboratory, nor the names of its contributors may be used to
+endorse or promote products derived from this software without specific prior
+written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+
+NTR:
+'''
+
+import argparse
+import getpass
+import logging
+import os
+import sys
+
+
+def manage(opts):
+    # pylint: disable=protected-access,used-before-assignment
+    # false positive # pylint: disable=possibly-used-before-assignment
+    dawgie.db.open()
+    conn = dawgie.db.post._conn()
+    cur = dawgie.db.post._cur(conn)
+    try:
+        if opts.detach:
+            dawgie.db.post.partition.detach(cur, opts.detach)
+            print('detached', opts.detach)
+        if opts.archive:
+            print(
+                'archived',
+                opts.archive,
+                'to',
+                dawgie.db.post.partition.archive(cur, opts.archive),
+            )
+        for name, lo, hi in dawgie.db.post.partition.bounds(cur):
+            print(
+                f'{name:>24s}',
+                'default' if lo is None and hi is None else '',
+                '' if lo is None else f'from {lo:d}',
+                '' if hi is None else f'to {hi:d}',
+            )
+            pass
+    finally:
+        cur.close()
+        conn.close()
+        dawgie.db.close()
+    return
+
+
+if __name__ == '__main__':
+    # main blocks always look the same; pylint: disable=duplicate-code
+    root = os.path.dirname(__file__)
+    for i in range(4):
+        root = os.path.join(root, '..')
+    root = os.path.abspath(root)
+    sys.path.append(root)
+
+    import dawgie.context
+    import dawgie.db
+    import dawgie.db.post
+    import dawgie.db.post.partition
+    import dawgie.util
+
+    UNIQUE_FN = '.'.join(['partition', getpass.getuser(), 'log'])
+    ap = argparse.ArgumentParser(
+        description='List the partitions of the postgres Prime table, detach one from Prime so that it is no longer part of the pipeline, and archive a detached one with pg_dump to --context-db-rotate-path before dropping it. There is no undo of archiving other than restoring the dump.'
+    )
+    ap.add_argument(
+        '-a',
+        '--archive',
+        default=None,
+        required=False,
+        help='dump and then drop this detached partition [%(default)s]',
+    )
+    ap.add_argument(
+        '-d',
+        '--detach',
+        default=None,
+        required=False,
+        help='detach this partition from Prime [%(default)s]',
+    )
+    ap.add_argument(
+        '-l',
+        '--log-file',
+        default=UNIQUE_FN,
+        required=False,
+        help='a filename to put all of the log messages into [%(default)s]',
+    )
+    ap.add_argument(
+        '-L',
+        '--log-level',
+        default=logging.INFO,
+        required=False,
+        type=dawgie.util.log_level,
+        help='set the verbosity that you want where a smaller number means more verbose [logging.INFO]',
+    )
+    dawgie.context.add_arguments(ap)
+    args = ap.parse_args()
+    dawgie.context.override(args)
+    logging.basicConfig(
+        filename=os.path.join(dawgie.context.data_log, args.log_file),
+        level=args.log_level,
+    )
+    manage(args)
+    pass
@@ -55,12 +55,35 @@ if __name__ == '__main__':
 
     import dawgie.context
     import dawgie.db
-    import dawgie.db.util
+    import dawgie.db.gc
     import dawgie.util
 
     UNIQUE_FN = '.'.join(['purge', getpass.getuser(), 'log'])
     ap = argparse.ArgumentParser(
-        description='Removes all of the files (md5_sha1) in the store that no longer have a key that references it. There is no undo of this operation and it must be done to a database that is not active (the pipeline is not running).'
+        description='Removes the files (md5_sha1) in the store that no longer have a key that references it. There is no undo of this operation. The store is swept in batches in the order of the file names and the sweep may be stopped and resumed with --cursor, which makes it possible to sweep a large store a piece at a time. The pipeline may keep running during the sweep because files modified within --grace are left alone.'
+    )
+    ap.add_argument(
+        '-b',
+        '--batch',
+        default=10000,
+        required=False,
+        type=int,
+        help='the number of files looked up in the database at a time [%(default)s]',
+    )
+    ap.add_argument(
+        '-c',
+        '--cursor',
+        default=None,
+        required=False,
+        help='a file that holds the name of the last file examined so that the next sweep picks up after it and that is removed when the sweep reaches the end of the store [%(default)s]',
+    )
+    ap.add_argument(
+        '-g',
+        '--grace',
+        default=86400,
+        required=False,
+        type=float,
+        help='the seconds since a file was last modified before it can be removed [%(default)s]',
     )
     ap.add_argument(
         '-l',
@@ -77,6 +100,29 @@ if __name__ == '__main__':
         type=dawgie.util.log_level,
         help='set the verbosity that you want where a smaller number means more verbose [logging.INFO]',
     )
+    ap.add_argument(
+        '-n',
+        '--dry-run',
+        action='store_true',
+        default=False,
+        help='report the files that would be removed without removing them',
+    )
+    ap.add_argument(
+        '-N',
+        '--limit',
+        default=None,
+        required=False,
+        type=int,
+        help='the number of files to examine before stopping with all of them when not given [%(default)s]',
+    )
+    ap.add_argument(
+        '-r',
+        '--rate',
+        default=0,
+        required=False,
+        type=float,
+        help='the most files to examine per second with 0 being as fast as possible [%(default)s]',
+    )
     dawgie.context.add_arguments(ap)
     args = ap.parse_args()
     dawgie.context.override(args)
@@ -85,19 +131,39 @@ if __name__ == '__main__':
         level=args.log_level,
     )
     dawgie.db.open()
-    values = list(dawgie.db._prime_values())
 
-    if not values:
+    values = dawgie.db._iter_prime_values()
+    if next(values, None) is None:
         logging.critical('Aborting purge becuase found NO keys!!!')
         sys.exit(-1)
+    values.close()
 
-    for fn in os.listdir(dawgie.context.data_dbs):
-        if fn not in values and os.path.isfile(
-            os.path.join(dawgie.context.data_dbs, fn)
-        ):
-            os.unlink(os.path.join(dawgie.context.data_dbs, fn))
-            logging.getLogger(__name__).warning(
-                'deleted the file %s from the store.', fn
-            )
+    after = None
+    if args.cursor and os.path.isfile(args.cursor):
+        with open(args.cursor, 'rt', encoding='utf-8') as file:
+            after = file.read().strip() or None
+    report = dawgie.db.gc.sweep(
+        after=after,
+        batch=args.batch,
+        dry=args.dry_run,
+        grace=args.grace,
+        limit=args.limit,
+        rate=args.rate,
+    )
+    dawgie.db.close()
+
+    # a dry run leaves the cursor for the real sweep
+    if args.cursor and not args.dry_run:
+        if report['cursor'] is not None:
+            with open(args.cursor, 'wt', encoding='utf-8') as file:
+                file.write(report['cursor'])
+        elif os.path.isfile(args.cursor):
+            os.unlink(args.cursor)
         pass
+    print(
+        f"examined {report['examined']} blobs of which {report['young']} "
+        f"are young, {report['referenced']} are referenced, and "
+        f"{report['garbage']} totaling {report['bytes']} bytes are garbage"
+        + ('' if args.dry_run else ' that were removed')
+    )
     pass
@@ -0,0 +1,117 @@
+'''Move the blobs of the DB data store into the layout of --context-data-dbs-levels
+
+--
+COPYRIGHT:
+Copyright (c) 2015-2026, California Institute of Technology ("Caltech").
+U.S. Government sponsorship acknowledged.
+
+All rights reserved.
+
+LICENSE:
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+- Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+- Neither the name of Caltech nor its operating division, the Jet
+Propulsion Laboratory, nor the names of its contributors may be used to
+endorse or promote products derived from this software without specific prior
+written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+
+NTR:
+'''
+
+import argparse
+import getpass
+import logging
+import os
+import re
+import sys
+
+BLOB = re.compile('[0-9a-f]{32}_[0-9a-f]{40}')
+
+
+def migrate() -> int:
+    '''move every blob not yet where dawgie.db.util.shard() puts it
+
+    Each blob is renamed into place so a reader finds it in either its old or
+    new place and never in neither. Returns the number of blobs moved.
+    '''
+    # false positive # pylint: disable=possibly-used-before-assignment
+    log = logging.getLogger(__name__)
+    moved = 0
+    for name, path in list(dawgie.db.util.blobs()):
+        nfn = dawgie.db.util.shard(name)
+
+        if not BLOB.fullmatch(name) or path == nfn:
+            continue
+        if os.path.exists(nfn):
+            os.unlink(path)
+        else:
+            os.makedirs(os.path.dirname(nfn), exist_ok=True)
+            os.rename(path, nfn)
+        moved += 1
+        if moved % 100000 == 0:
+            log.info('moved %d blobs', moved)
+        pass
+    log.info('moved %d blobs in total', moved)
+    return moved
+
+
+if __name__ == '__main__':
+    # main blocks always look the same; pylint: disable=duplicate-code
+    root = os.path.dirname(__file__)
+    for i in range(4):
+        root = os.path.join(root, '..')
+    root = os.path.abspath(root)
+    sys.path.append(root)
+
+    import dawgie.context
+    import dawgie.db.util
+    import dawgie.util
+
+    UNIQUE_FN = '.'.join(['shard', getpass.getuser(), 'log'])
+    ap = argparse.ArgumentParser(
+        description='Move the blobs of the DB data store (--context-data-dbs) into the subdirectories of --context-data-dbs-levels. The pipeline may keep running while a flat store is being sharded because readers fall back to the flat layout, but it must be stopped to go from one sharded layout to another or back to flat. Set --context-data-dbs-levels for the pipeline before running this tool.'
+    )
+    ap.add_argument(
+        '-l',
+        '--log-file',
+        default=UNIQUE_FN,
+        required=False,
+        help='a filename to put all of the log messages into [%(default)s]',
+    )
+    ap.add_argument(
+        '-L',
+        '--log-level',
+        default=logging.INFO,
+        required=False,
+        type=dawgie.util.log_level,
+        help='set the verbosity that you want where a smaller number means more verbose [logging.INFO]',
+    )
+    dawgie.context.add_arguments(ap)
+    args = ap.parse_args()
+    dawgie.context.override(args)
+    logging.basicConfig(
+        filename=os.path.join(dawgie.context.data_log, args.log_file),
+        level=args.log_level,
+    )
+    print('moved', migrate(), 'blobs')
+    pass
@@ -56,13 +56,17 @@ def consume(runid, tn, taskn, algn, svn, vn):
 
     # dawgie is already imported so pylint: disable=used-before-assignment
     dawgie.db.open()
-    for k in dawgie.db._prime_keys():
+    # collect first because remove() changes the table being streamed
+    doomed = []
+    for k in dawgie.db._iter_prime_keys():
         ids = k.split('.')
         ids[0] = int(ids[0])
 
         if all(((e is None or i == e) for i, e in zip(ids, req))):
-            dawgie.db.remove(*ids)
+            doomed.append(ids)
         pass
+    for ids in doomed:
+        dawgie.db.remove(*ids)
     dawgie.db.close()
     return
 
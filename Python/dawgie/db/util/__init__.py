@@ -36,58 +36,340 @@ POSSIBILITY OF SUCH DAMAGE.
 NTR:
 '''
 
+import collections
+import concurrent.futures
 import dawgie.context
+import hashlib
+import heapq
+import io
 
 import logging; log = logging.getLogger(__name__)  # fmt: skip # noqa: E702 # pylint: disable=multiple-statements
 import os
 import pickle
+import re
 import shutil
-import subprocess
 import tempfile
+import threading
 
+from . import codec as _codec
 
-def _extract(response):
-    for pair in filter(
-        lambda s: 0 < len(s), response.decode('utf-8').split('\n')
-    ):
-        index = pair.find(' ')
-        cksum = pair[:index]
-        lc = cksum.strip()
+SHARD = re.compile('[0-9a-f]{2}')  # subdirectory name of the sharded store
+SPOOL = 2**24  # bytes of a pickle kept in memory rather than in data_stg
+
+_lock = threading.Lock()
+_lru = collections.OrderedDict()  # blob name -> its plain pickle
+_state = {'hits': 0, 'misses': 0, 'size': 0}
+
+
+class _Digest:
+    '''file-like object that digests everything written to it
+
+    What is written is also kept in buffer until it grows past SPOOL bytes,
+    when buffer becomes None and it is kept in the file fn in data_stg.
+    '''
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+        self.file = None
+        self.fn = None
+        self.md5 = hashlib.md5(usedforsecurity=False)
+        self.sha1 = hashlib.sha1(usedforsecurity=False)
+        return
+
+    def discard(self):
+        '''remove the file fn if there is one'''
+        if self.file is not None:
+            self.file.close()
+            os.unlink(self.fn)
+            self.file = None
+        return
+
+    def plain(self):
+        '''the plain pickle as a buffer or as a file at its start'''
+        if self.file is None:
+            return self.buffer.getbuffer()
+        self.file.seek(0)
+        return self.file
+
+    def write(self, data):
+        # protocol 5 hands large buffers over as pickle.PickleBuffer
+        size = memoryview(data).nbytes
+        self.md5.update(data)
+        self.sha1.update(data)
+        if self.file is None and SPOOL < self.buffer.tell() + size:
+            fid, self.fn = tempfile.mkstemp(
+                dir=dawgie.context.data_stg, prefix='shelve_', suffix='.pkl'
+            )
+            self.file = os.fdopen(fid, 'w+b')
+            self.file.write(self.buffer.getbuffer())
+            self.buffer = None
+        (self.buffer if self.file is None else self.file).write(data)
+        return size
+
+    pass
+
+
+def _decode_as(entry, ver):
+    value = decode(entry)
+
+    if ver is not None:
+        value._set_ver(ver)  # pylint: disable=protected-access
+    return value
+
+
+def _walk(path: str, prefix: str, after: str):
+    dns, fns = [], []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                # leave out the other directories like chronicles
+                if (
+                    SHARD.fullmatch(entry.name)
+                    and after[: len(prefix) + 2] <= prefix + entry.name
+                ):
+                    dns.append(entry.name)
+            elif after < entry.name:
+                fns.append((entry.name, entry.path))
+            pass
+        pass
+    dns.sort()
+    fns.sort()
+    # files in a directory that also has subdirectories are a flat store
+    # being sharded so merge them with the subdirectory they sort into
+    done = 0
+    for dn in dns:
+        start = done
+        while (
+            done < len(fns) and fns[done][0][: len(prefix) + 2] <= prefix + dn
+        ):
+            done += 1
+            pass
+        yield from heapq.merge(
+            fns[start:done], _walk(os.path.join(path, dn), prefix + dn, after)
+        )
+        pass
+    yield from fns[done:]
+    return
+
+
+def _remember(entry, data: bytes):
+    capacity = dawgie.context.data_dbs_cache
+
+    if capacity < len(data):
+        return
+
+    with _lock:
+        if entry not in _lru:
+            _lru[entry] = data
+            _state['size'] += len(data)
+        while capacity < _state['size']:
+            _state['size'] -= len(_lru.popitem(last=False)[1])
+            pass
         pass
-    return lc
+    return
+
+
+def clear():
+    '''forget the decoded blobs including the statistics'''
+    with _lock:
+        _lru.clear()
+        _state.update(hits=0, misses=0, size=0)
+        pass
+    return
+
+
+def blobs(after: str = None):
+    '''every (name, path) of the blobs in data_dbs whatever their layout
+
+    The blobs come in the order of their names, starting after the name
+    after when it is given, so that a walk of the store can be picked up
+    where it was left off.
+    '''
+    yield from _walk(dawgie.context.data_dbs, '', after or '')
+    return
 
 
 def decode(entry):
-    with open(os.path.join(dawgie.context.data_dbs, entry), 'rb') as f:
-        result = pickle.load(f)
+    '''the value of the blob entry in data_dbs
+
+    The plain pickles of the most recently decoded blobs, up to
+    dawgie.context.data_dbs_cache bytes of them, are kept so that decoding
+    them again is only unpickling. Blob names are digests of their content
+    so what is kept never needs to be invalidated. It is the pickle rather
+    than the value that is kept so that every caller gets a value of its
+    own to change as it likes. Blobs written with the codec OOB are never
+    kept because mapping them is already cheap.
+    '''
+    with _lock:
+        data = _lru.get(entry)
+
+        if data is None:
+            _state['misses'] += 1
+        else:
+            _lru.move_to_end(entry)
+            _state['hits'] += 1
+            pass
+        pass
+
+    if data is not None:
+        return pickle.loads(data)  # nosec B301 # a blob read by decode()
+
+    with open(locate(entry), 'rb') as f:
+        if (
+            _codec.mapped(f)
+            or dawgie.context.data_dbs_cache < os.fstat(f.fileno()).st_size
+        ):
+            result = _codec.load(f)
+        else:
+            data = _codec.reader(f).read()
+            result = pickle.loads(data)  # nosec B301 # written by encode()
+            _remember(entry, data)
         pass
     return result
 
 
-def encode(value):
-    fid, fn = tempfile.mkstemp(
-        dir=dawgie.context.data_stg, prefix='shelve_', suffix='.pkl'
-    )
-    os.close(fid)
-    with open(fn, 'wb') as f:
-        pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+def encode(value, codec: str = None):
+    '''pickle value into data_stg and name it by its content
+
+    value is pickled once and the pickle is digested as it is made so that a
+    value whose blob is already in data_dbs is never written at all, in which
+    case the file name returned is None and the blob is touched so that
+    dawgie.db.gc sees it as new. Small pickles are kept in memory while
+    large ones go to data_stg. The blob is written from that pickle rather
+    than from value, so its content is always what its name says even if
+    value changes or does not pickle the same way twice, except that the
+    OOB codec writes the value that pickle loads to. The file is
+    compressed with the dawgie.db.util.codec named codec, which defaults to
+    dawgie.context.data_dbs_codec, but the name is the digest of the plain
+    pickle.
+    '''
+    codec = dawgie.context.data_dbs_codec if codec is None else codec
+    digest = _Digest()
+    try:
+        pickle.dump(value, digest, pickle.HIGHEST_PROTOCOL)
+        result = '_'.join([digest.md5.hexdigest(), digest.sha1.hexdigest()])
+
+        try:
+            os.utime(locate(result))
+            return (None, result)
+        except PermissionError:  # there but cannot be touched
+            return (None, result)
+        except FileNotFoundError:
+            pass
+
+        if digest.file is not None and codec == 'none':
+            # the plain pickle in data_stg is already the blob
+            digest.file.close()
+            digest.file, fn = None, digest.fn
+        else:
+            fid, fn = tempfile.mkstemp(
+                dir=dawgie.context.data_stg, prefix='shelve_', suffix='.pkl'
+            )
+            with os.fdopen(fid, 'wb') as f:
+                _codec.dump(value, f, codec, digest.plain())
+            pass
+    finally:
+        digest.discard()
     os.chmod(fn, int('0664', 8))  # -rw-rw-r--
-    m = _extract(subprocess.check_output(['md5sum', '-b', fn]))
-    s = _extract(subprocess.check_output(['sha1sum', '-b', fn]))
-    result = '_'.join([m, s])
     return (fn, result)
 
 
+def exists(name: str) -> bool:
+    '''True if the blob name is in data_dbs'''
+    return os.path.exists(locate(name))
+
+
+def locate(name: str) -> str:
+    '''the path of the blob name in data_dbs
+
+    The blob is looked for where dawgie.context.data_dbs_levels puts it and
+    then in the flat layout so that blobs can be read while a flat store is
+    being sharded by dawgie.db.tools.shard. If it is in neither place, then
+    the path is where a new blob would be written.
+    '''
+    result = shard(name)
+
+    if dawgie.context.data_dbs_levels and not os.path.exists(result):
+        flat = os.path.join(dawgie.context.data_dbs, name)
+
+        # when in neither place it may have just been moved to result
+        if os.path.exists(flat):
+            result = flat
+    return result
+
+
 def move(fn, result):
-    nfn = os.path.join(dawgie.context.data_dbs, result)
-    exists = os.path.exists(nfn)
+    '''move the file fn from encode() into data_dbs as the blob result'''
+    if fn is None:
+        return result, True
+
+    nfn = locate(result)
+    found = os.path.exists(nfn)
 
-    if exists:
+    if found:
         os.unlink(fn)
     else:
+        nfn = shard(result)
+        os.makedirs(os.path.dirname(nfn), exist_ok=True)
         shutil.move(fn, nfn)
 
-    return result, exists
+    return result, found
+
+
+def prefetch(entries: [str], vers: [] = None) -> [concurrent.futures.Future]:
+    '''decode the entries in the background
+
+    Returns a future for every entry in the same order. At most
+    dawgie.context.db_prefetch_workers threads do the decoding and they exit
+    once all of the entries are decoded. When vers is given, the version of
+    each decoded value is set to the matching item of it.
+    '''
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(1, dawgie.context.db_prefetch_workers),
+        thread_name_prefix='dawgie.db.prefetch',
+    )
+    futures = [
+        executor.submit(_decode_as, entry, ver)
+        for entry, ver in zip(entries, vers if vers else [None] * len(entries))
+    ]
+    executor.shutdown(wait=False)
+    return futures
+
+
+def prefetch_span(span: {}, l1k, l2k, kind: type, lookup) -> int:
+    '''decode the unresolved items of span below l1k and l2k in the background
+
+    span is the three level table of a dawgie.db.util.wraps.Container and its
+    unresolved items are the instances of kind. lookup is called once with
+    all of them and returns {item: (blob name, version or None)} for those
+    that it finds. Those items are replaced by the futures of prefetch().
+    Returns the number of values being decoded.
+    '''
+    wanted = []
+    for k1 in span if l1k is None else [l1k]:
+        for k2 in span[k1] if l2k is None else [l2k]:
+            for k3, item in span[k1][k2].items():
+                if isinstance(item, kind):
+                    wanted.append((k1, k2, k3))
+                pass
+            pass
+        pass
+
+    if not wanted:
+        return 0
+
+    found = lookup([span[k1][k2][k3] for k1, k2, k3 in wanted])
+    wanted = [
+        (k1, k2, k3) for k1, k2, k3 in wanted if span[k1][k2][k3] in found
+    ]
+    futures = prefetch(
+        [found[span[k1][k2][k3]][0] for k1, k2, k3 in wanted],
+        [found[span[k1][k2][k3]][1] for k1, k2, k3 in wanted],
+    )
+    for (k1, k2, k3), future in zip(wanted, futures):
+        span[k1][k2][k3] = future
+        pass
+    return len(futures)
 
 
 def rotate(path, orig, backup):
@@ -115,13 +397,50 @@ def rotate(path, orig, backup):
             for v in backup[t]:
                 ext = v.split(".")[-1]
                 shutil.move(v, f'{path}/{t+1:d}.{dawgie.context.db_name}.{ext}')  # fmt: skip # noqa: E226
-        for v in orig:
-            ext = v.split(".")[-1]
-            shutil.copy(v, f'{path}/0.{dawgie.context.db_name}.{ext}')
-
+        # the files are independent of each other so copy them all at once
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, dawgie.context.db_archive_jobs)
+        ) as pool:
+            list(
+                pool.map(
+                    lambda v: shutil.copy(
+                        v,
+                        f'{path}/0.{dawgie.context.db_name}.'
+                        + v.split(".")[-1],
+                    ),
+                    orig,
+                )
+            )
+            pass
     return
 
 
+def shard(name: str, levels: int = None) -> str:
+    '''the path of the blob name in data_dbs with levels of subdirectories
+
+    Each level is named by the next two characters of name and levels
+    defaults to dawgie.context.data_dbs_levels.
+    '''
+    levels = dawgie.context.data_dbs_levels if levels is None else levels
+    return os.path.join(
+        dawgie.context.data_dbs,
+        *(name[2 * i : 2 * i + 2] for i in range(levels)),
+        name,
+    )
+
+
+def stats() -> {}:
+    '''how well the cache of decoded blobs is doing'''
+    with _lock:
+        return {
+            'capacity': dawgie.context.data_dbs_cache,
+            'count': len(_lru),
+            'hits': _state['hits'],
+            'misses': _state['misses'],
+            'size': _state['size'],
+        }
+
+
 def verify(value):
     # pylint: disable=bare-except
     result = [False, False, False, False]
@@ -0,0 +1,319 @@
+'''compression of the blobs in the DB data store
+
+A compressed blob starts with MAGIC, the name of its codec, and a newline
+followed by the compressed pickle. A blob without MAGIC is a plain pickle,
+which is what the codec 'none' writes and what every blob written before
+codecs is. The blob name is the digest of the plain pickle no matter the
+codec so that the same value is stored once however it is compressed.
+
+The codec OOB is a layout rather than a compression. The contiguous buffers
+of at least OOB_MIN bytes, like those of numpy arrays, are written out of
+band at page aligned offsets after a small pickle of everything else. It is
+loaded by mapping the blob into memory so those buffers are read-only views
+of the file that are only read from disk as they are touched:
+
+    MAGIC oob\n
+    <pickle size> <buffer count>          little endian 8 byte integers
+    <offset> <size> for every buffer      little endian 8 byte integers
+    pickle
+    buffers
+
+--
+COPYRIGHT:
+Copyright (c) 2015-2026, California Institute of Technology ("Caltech").
+U.S. Government sponsorship acknowledged.
+
+All rights reserved.
+
+LICENSE:
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+- Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+- Neither the name of Caltech nor its operating division, the Jet
+Propulsion Laboratory, nor the names of its contributors may be used to
+endorse or promote products derived from this software without specific prior
+written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+
+NTR:
+'''
+
+import io
+import lzma
+import mmap
+import pickle  # nosec B403 # blobs are only written by dump()
+import shutil
+import struct
+import typing
+import zlib
+
+CHUNK = 2**20  # bytes read from a compressed blob at a time
+MAGIC = b'\x00DAWGIE\x00'  # not a pickle opcode so never a plain pickle
+OOB = 'oob'
+OOB_MIN = 2**16  # smaller buffers stay in the pickle
+
+
+class Codec(typing.NamedTuple):
+    compressor: typing.Callable  # () -> object with compress() and flush()
+    decompressor: typing.Callable  # () -> object with decompress()
+
+
+class _Identity:
+    '''the compressor of the codec none'''
+
+    @staticmethod
+    def compress(data):
+        return data
+
+    @staticmethod
+    def flush() -> bytes:
+        return b''
+
+    pass
+
+
+class _LZ4:
+    '''make lz4.frame look like zlib to writer()'''
+
+    def __init__(self):
+        self.__compressor = lz4.frame.LZ4FrameCompressor()
+        self.__head = self.__compressor.begin()
+        return
+
+    def compress(self, data) -> bytes:
+        head, self.__head = self.__head, b''
+        return head + self.__compressor.compress(data)
+
+    def flush(self) -> bytes:
+        head, self.__head = self.__head, b''
+        return head + self.__compressor.flush()
+
+    pass
+
+
+class _Raw(io.RawIOBase):
+    '''the decompressed stream of a compressed blob'''
+
+    def __init__(self, file, decompressor):
+        io.RawIOBase.__init__(self)
+        self.__decompressor = decompressor
+        self.__file = file
+        self.__pending = memoryview(b'')
+        return
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.__pending:
+            data = self.__file.read(CHUNK)
+
+            if not data:
+                return 0
+            self.__pending = memoryview(self.__decompressor.decompress(data))
+        count = min(len(buffer), len(self.__pending))
+        buffer[:count] = self.__pending[:count]
+        self.__pending = self.__pending[count:]
+        return count
+
+    pass
+
+
+class _Writer:
+    '''file-like object that compresses what is written to file'''
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, file, compressor):
+        self.__compressor = compressor
+        self.__file = file
+        return
+
+    def close(self):
+        self.__file.write(self.__compressor.flush())
+        return
+
+    def write(self, data):
+        self.__file.write(self.__compressor.compress(data))
+        return memoryview(data).nbytes
+
+    pass
+
+
+CODECS = {
+    'lzma': Codec(lzma.LZMACompressor, lzma.LZMADecompressor),
+    'none': None,
+    'zlib': Codec(zlib.compressobj, zlib.decompressobj),
+}
+try:
+    import lz4.frame
+
+    CODECS['lz4'] = Codec(_LZ4, lz4.frame.LZ4FrameDecompressor)
+except ImportError:
+    pass
+try:
+    import zstandard
+
+    CODECS['zstd'] = Codec(
+        lambda: zstandard.ZstdCompressor().compressobj(),
+        lambda: zstandard.ZstdDecompressor().decompressobj(),
+    )
+except ImportError:
+    pass
+
+
+def _dump_oob(value, file):
+    buffers = []
+
+    def out_of_band(buffer: pickle.PickleBuffer) -> bool:
+        try:
+            raw = buffer.raw()
+        except BufferError:  # not contiguous
+            return True
+        if raw.nbytes < OOB_MIN:
+            return True
+        buffers.append(raw)
+        return False
+
+    data = pickle.dumps(
+        value, pickle.HIGHEST_PROTOCOL, buffer_callback=out_of_band
+    )
+    head = MAGIC + OOB.encode() + b'\n'
+    offset = len(head) + 16 * (1 + len(buffers)) + len(data)
+    table = []
+    for buffer in buffers:
+        offset += -offset % mmap.PAGESIZE
+        table.extend((offset, buffer.nbytes))
+        offset += buffer.nbytes
+        pass
+    file.write(head)
+    file.write(
+        struct.pack(f'<{2 + len(table)}Q', len(data), len(buffers), *table)
+    )
+    file.write(data)
+    for start, buffer in zip(table[::2], buffers):
+        file.write(b'\0' * (start - file.tell()))
+        file.write(buffer)
+        pass
+    return
+
+
+def _load_oob(file, start: int):
+    # the views into the map keep it open for as long as they are used
+    view = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+    size, count = struct.unpack_from('<2Q', view, start)
+    table = struct.unpack_from(f'<{2 * count}Q', view, start + 16)
+    start += 16 * (1 + count)
+    return pickle.loads(  # nosec B301 # written by _dump_oob()
+        view[start : start + size],
+        buffers=[
+            view[offset : offset + length]
+            for offset, length in zip(table[::2], table[1::2])
+        ],
+    )
+
+
+def dump(value, file, name: str, plain=None):
+    '''write value to file with the codec name
+
+    file must be open for binary writing at its start. When plain is given,
+    it is the plain pickle of value as a buffer or as a file at its start and
+    it is written instead of value, so value is not pickled again. OOB lays
+    the pickle out differently so it writes the value that plain loads to.
+    '''
+    if name == OOB:
+        if plain is not None:
+            value = (
+                pickle.load(plain)  # nosec B301 # the pickle of value
+                if hasattr(plain, 'read')
+                else pickle.loads(plain)  # nosec B301 # the pickle of value
+            )
+        _dump_oob(value, file)
+        return
+
+    w = writer(file, name)
+    if plain is None:
+        pickle.dump(value, w, pickle.HIGHEST_PROTOCOL)
+    elif hasattr(plain, 'read'):
+        shutil.copyfileobj(plain, w, CHUNK)
+    else:
+        w.write(plain)
+    w.close()
+    return
+
+
+def load(file):
+    '''the value in the blob file whatever its codec
+
+    file must be open for binary reading at its start and support peek()
+    like the files of open(fn, 'rb') do.
+    '''
+    if mapped(file):
+        return _load_oob(file, len(MAGIC + OOB.encode() + b'\n'))
+    return pickle.load(reader(file))  # nosec B301 # written by dump()
+
+
+def mapped(file) -> bool:
+    '''True if the blob file is loaded by mapping it into memory
+
+    file must be open for binary reading at its start and support peek()
+    like the files of open(fn, 'rb') do.
+    '''
+    head = MAGIC + OOB.encode() + b'\n'
+    return file.peek(len(head))[: len(head)] == head
+
+
+def names() -> [str]:
+    '''every codec name that dump() accepts'''
+    return sorted([*CODECS, OOB])
+
+
+def reader(file):
+    '''the file-like object that reads the plain pickle of the blob file
+
+    file must be open for binary reading and support peek() like the files
+    of open(fn, 'rb') do.
+    '''
+    if file.peek(len(MAGIC))[: len(MAGIC)] != MAGIC:
+        return file
+
+    file.read(len(MAGIC))
+    name = file.readline().strip().decode()
+
+    if CODECS.get(name) is None:
+        raise ValueError(f'the codec {name} of the blob is not available')
+    return io.BufferedReader(
+        _Raw(file, CODECS[name].decompressor()), buffer_size=CHUNK
+    )
+
+
+def writer(file, name: str):
+    '''the file-like object that writes to file with the codec name
+
+    Closing it finishes the compressed stream but leaves file open.
+    '''
+    if name not in CODECS:
+        raise ValueError(f'the codec {name} is not one of {sorted(CODECS)}')
+    if CODECS[name] is None:
+        return _Writer(file, _Identity())
+
+    file.write(MAGIC + name.encode() + b'\n')
+    return _Writer(file, CODECS[name].compressor())
@@ -37,6 +37,7 @@ NTR:
 '''
 
 import dawgie
+import dawgie.context
 
 
 class Container(dawgie.Aspect, dawgie.Timeline):
@@ -73,6 +74,14 @@ class Container(dawgie.Aspect, dawgie.Timeline):
     def _fill_item(self, l1k, l2k, l3k):
         raise NotImplementedError()
 
+    def _prefetch(self, l1k, l2k):  # pylint: disable=unused-argument
+        '''start decoding every item below l1k and l2k
+
+        Implementations that do not override this leave every item to be
+        resolved lazily by _fill_item().
+        '''
+        return
+
     def items(self):
         '''genrator of current (key,value) pairs'''
         yield from zip(self.keys(), self.values())
@@ -83,6 +92,23 @@ class Container(dawgie.Aspect, dawgie.Timeline):
         yield from self
         return
 
+    def prefetch(self):
+        '''decode every value below this level in the background
+
+        All of the values are resolved at once and decoded by a bounded pool
+        of threads (dawgie.context.db_prefetch_workers) while the caller
+        iterates so that for instance
+
+            for vn, value in aspect[tn][svn].prefetch().items(): ...
+
+        streams through the values instead of reading them one at a time.
+        Returns self.
+        '''
+        # pylint: disable=protected-access
+        if 0 < dawgie.context.db_prefetch_workers:
+            self.__parent._prefetch(self.__l1, self.__l2)
+        return self
+
     def values(self):
         '''generator of current level of values'''
         # not a full dict so pylint: disable=consider-using-dict-items
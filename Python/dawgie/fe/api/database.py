@@ -51,7 +51,7 @@ VIEW = svrender.Defer()
 
 
 def runid_max():
-    return build_return_object(max([1, dawgie.db.next() - 1]))
+    return build_return_object(max([1, dawgie.db.last_runid()]))
 
 
 def runnables():
@@ -69,6 +69,7 @@ def search(
     svs: [str] = None,
     index: int = 0,
     limit: int = None,
+    token: [str] = None,
 ):
     '''given the facets, find all corresponding state vectors'''
     # pylint: disable=duplicate-code
@@ -82,7 +83,8 @@ def search(
     )
     index = int(index[0]) if index and index[0] else 0
     limit = int(limit[0]) if limit and limit[0] else None
-    results = dawgie.db.search().find(parameters, index, limit)
+    token = token[0] if token and token[0] else None
+    results = dawgie.db.search().find(parameters, index, limit, token)
     return build_return_object(results._asdict())
 
 
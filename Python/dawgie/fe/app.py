@@ -83,7 +83,9 @@ def db_lockview():
 def db_prime():
     # pylint: disable=protected-access
     return json.dumps(
-        list({'.'.join(k.split('.')[:-1]) for k in dawgie.db._prime_keys()})
+        list(
+            {'.'.join(k.split('.')[:-1]) for k in dawgie.db._iter_prime_keys()}
+        )
     ).encode()
 
 
@@ -213,7 +215,7 @@ def _search(axis, key):
         {
             '.'.join(k.split('.')[:-1])
             for k in filter(
-                lambda k: -1 < prime(k).find(key), dawgie.db._prime_keys()
+                lambda k: -1 < prime(k).find(key), dawgie.db._iter_prime_keys()
             )
         }
     )
@@ -248,7 +250,9 @@ def _search_filter(fn: str, default: {}) -> bytes:
 def search_cmplt_svn():
     # pylint: disable=protected-access
     return json.dumps(
-        sorted({'.'.join(k.split('.')[2:-1]) for k in dawgie.db._prime_keys()})
+        sorted(
+            {'.'.join(k.split('.')[2:-1]) for k in dawgie.db._iter_prime_keys()}
+        )
     ).encode()
 
 
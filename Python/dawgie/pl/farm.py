@@ -460,7 +460,7 @@ def rerunid(job):
     runid = job.get('runid', None)
 
     if runid is None:
-        runid = dawgie.db.next()
+        runid = dawgie.db.next(job.get('event', None))
         log.critical(
             'New run ID (%d) for algorithm %s trigger by the event: %s',
             runid,
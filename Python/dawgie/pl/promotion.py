@@ -74,14 +74,64 @@ class Engine:
 
     def _append(self, algnode, runid, values):
         for child in algnode:
-            if child.tag in self._todo:
-                self._todo[child.tag][1].append(algnode)
-                self._todo[child.tag][3].extend(values)
-            else:
-                self._todo[child.tag] = (child, [algnode], runid, values)
+            for tn in sorted({v.split('.')[1] for v in values}):
+                key = (child.tag, tn)
+                vals = [v for v in values if v.split('.')[1] == tn]
+
+                if key in self._todo:
+                    self._todo[key][1].append(algnode)
+                    self._todo[key][3].extend(vals)
+                else:
+                    self._todo[key] = (child, [algnode], runid, vals)
+                pass
             pass
         return
 
+    def _wave(self):
+        '''the lowest child with every target waiting on it for the run
+
+        Applies steps 1 and 2 of do() to each target and returns the child, the
+        run ID, its inputs and outputs, and the targets that passed.
+        '''
+        first = min(self._todo.values(), key=lambda t: t[0].get('level'))
+        child, runid = first[0], first[2]
+        # the wave is every target waiting on this child for this run
+        wave = [
+            (key[1], parents, values)
+            for key, (_c, parents, rid, values) in self._todo.items()
+            if key[0] == child.tag and rid == runid
+        ]
+        inputs = set()
+        outputs = self._ae[child.tag]
+        for o in outputs:
+            inputs.update(o.get('parents'))
+        targets = []
+        for target_name, parents, values in wave:
+            vals = {'.'.join(v.split('.')[2:]) for v in values}
+
+            # 1: does decendent require subset of values
+            #  if no, then break
+            if not _dependents(parents, inputs).issubset(vals):
+                self._organize(
+                    [child.tag],
+                    runid,
+                    {target_name},
+                    'promotion not possible because one or '
+                    + 'more inputs is new value',
+                )
+                continue
+
+            # 2: is the dependent or ancestors are schduled to run already
+            #    or are running
+            #  if yes, then break
+            if _is_scheduled(child, {target_name}):
+                continue
+
+            targets.append(target_name)
+            pass
+
+        return child, runid, inputs, outputs, targets
+
     @property
     def ae(self) -> dawgie.pl.dag.Construct:
         return self._ae
@@ -100,81 +150,54 @@ class Engine:
             raise ValueError('Organizer is not set prior to data flow')
 
         if dawgie.context.allow_promotion and self.more():
-            values = sorted(
-                self._todo.values(), key=lambda t: t[0].get('level')
-            )
-            child, parents, runid, values = values.pop(0)
-            targets = {v.split('.')[1] for v in values}
-            vals = {'.'.join(v.split('.')[2:]) for v in values}
-
-            if len(targets) == 1:
-                target_name = targets.copy().pop()
-            else:
-                raise ValueError(
-                    f'Inconsistent targets for a single result {targets}'
-                )
+            child, runid, inputs, outputs, targets = self._wave()
 
-            inputs = set()
-            outputs = self._ae[child.tag]
-            # 1: does decendent require subset of values
-            #  if no, then break
-            for o in outputs:
-                inputs.update(o.get('parents'))
-            dependents = []
-            for parent in parents:
-                name = parent.tag + '.'
-                dependents.extend(
-                    (
-                        d.tag
-                        for d in filter(
-                            lambda i, n=name: i.tag.startswith(n), inputs
-                        )
-                    )
-                )
-                pass
-
-            if not set(dependents).issubset(vals):
-                self._organize(
-                    [child.tag],
-                    runid,
-                    targets,
-                    'promotion not possible because one or '
-                    + 'more inputs is new value',
-                )
-                return
-
-            # 2: is the dependent or ancestors are schduled to run already
-            #    or are running
-            #  if yes, then break
-            if _is_scheduled(child, targets):
+            if not targets:
                 return
 
             # 3: find the consistent set of previous inputs for each output
-            #    in this child
-            juncture = dawgie.db.consistent(
-                _translate(inputs), _translate(outputs), target_name
+            #    in this child for all of the targets at once
+            junctures = dawgie.db.consistent_many(
+                _translate(inputs), _translate(outputs), targets
             )
 
             # 4: are all of the inputs to dependent the same
             #    if no, schedule dependent and break
-            if not juncture or not all(juncture):
-                self._organize(
-                    [child.tag],
-                    runid,
-                    targets,
-                    'promotion not possible because ' + 'no juncture found',
-                )
+            juncture = []
+            for target_name in targets.copy():
+                found = junctures.get(target_name)
+
+                if not found or not all(found):
+                    self._organize(
+                        [child.tag],
+                        runid,
+                        {target_name},
+                        'promotion not possible because ' + 'no juncture found',
+                    )
+                    targets.remove(target_name)
+                else:
+                    juncture.extend(found)
+                pass
+
+            if not targets:
                 return
 
-            # 5: promote decendent state vectors
+            # 5: promote decendent state vectors of the whole wave together
             if not dawgie.db.promote(juncture, runid):
                 self._organize(
-                    [child.tag], runid, targets, 'promotion failed to insert'
+                    [child.tag],
+                    runid,
+                    set(targets),
+                    'promotion failed to insert',
                 )
                 return
 
             # 6: add decendent to todo list
-            self._append(child, runid, _outs2vals(runid, target_name, outputs))
+            for target_name in targets:
+                self._append(
+                    child, runid, _outs2vals(runid, target_name, outputs)
+                )
+                pass
         elif not dawgie.context.allow_promotion:
             self.clear()
         return
@@ -215,8 +238,17 @@ class Engine:
     pass
 
 
+def _dependents(parents: [dawgie.pl.dag.Node], inputs: {dawgie.pl.dag.Node}):
+    dependents = set()
+    for parent in parents:
+        name = parent.tag + '.'
+        dependents.update(i.tag for i in inputs if i.tag.startswith(name))
+        pass
+    return dependents
+
+
 def _is_scheduled(node: dawgie.pl.dag.Node, targets: {str}) -> bool:
-    # issubset works because do() reduces targets to length of 1
+    # issubset works because do() checks targets one at a time
     result = any(
         [
             targets.issubset(node.get('do')),
@@ -40,6 +40,7 @@ NTR:
 '''
 
 import dawgie.context
+import dawgie.db
 import dawgie.pl.farm
 import dawgie.pl.message
 import dawgie.pl.schedule
@@ -85,13 +86,28 @@ def _grab_context():
             'cloud_provider': str(dawgie.context.cloud_provider),
             'cpu_threshold': dawgie.context.cpu_threshold,
             'data_dbs': dawgie.context.data_dbs,
+            'data_dbs_cache': dawgie.context.data_dbs_cache,
+            'data_dbs_codec': dawgie.context.data_dbs_codec,
+            'data_dbs_levels': dawgie.context.data_dbs_levels,
             'data_log': dawgie.context.data_log,
             'data_stg': dawgie.context.data_stg,
+            'db_archive_incremental': dawgie.context.db_archive_incremental,
+            'db_archive_jobs': dawgie.context.db_archive_jobs,
+            'db_cache_size': dawgie.context.db_cache_size,
+            'db_fetch_size': dawgie.context.db_fetch_size,
             'db_host': dawgie.context.db_host,
             'db_impl': dawgie.context.db_impl,
             'db_name': dawgie.context.db_name,
             'db_path': dbp,
             'db_port': dawgie.context.db_port,
+            'db_partition_size': dawgie.context.db_partition_size,
+            'db_pool_lifetime': dawgie.context.db_pool_lifetime,
+            'db_pool_max': dawgie.context.db_pool_max,
+            'db_pool_min': dawgie.context.db_pool_min,
+            'db_pool_timeout': dawgie.context.db_pool_timeout,
+            'db_prefetch_workers': dawgie.context.db_prefetch_workers,
+            'db_search_cache_size': dawgie.context.db_search_cache_size,
+            'db_search_cache_ttl': dawgie.context.db_search_cache_ttl,
             'display': str(dawgie.context.display),
             'farm_port': dawgie.context.farm_port,
             'fe_path': dawgie.context.fe_path,
@@ -105,6 +121,10 @@ def _grab_context():
     }
 
 
+def _grab_database():
+    return {'database': dawgie.db.stats()}
+
+
 def _grab_farm():
     return {
         'farm': {
@@ -190,6 +210,8 @@ def grab(which: str = 'all') -> {}:
     result = {}
     if 'all' in which or 'context' in which:
         result.update(_grab_context())
+    if 'all' in which or 'database' in which:
+        result.update(_grab_database())
     if 'all' in which or 'farm' in which:
         result.update(_grab_farm())
     if 'all' in which or 'fsm' in which:
@@ -89,15 +89,17 @@ def record(task, only=None):
             dawgie.base.Task,
         ),
     ):
+        items = []
         for alg in filter(
             lambda a: only is None or a.name() == only, task.routines()
         ):
             if not alg.state_vectors():
-                dawgie.db.update(task, alg, None, None, None)
+                items.append((alg, None, None, None))
             for sv in alg.state_vectors():
                 for k, v in sv.items():
-                    dawgie.db.update(task, alg, sv, k, v)
+                    items.append((alg, sv, k, v))
                 pass
             pass
+        dawgie.db.update_many(task, items)
         pass
     return
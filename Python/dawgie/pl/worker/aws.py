@@ -73,12 +73,15 @@ class Context(dawgie.pl.worker.Context):
             dawgie.pl.message.make(target=entry, typ=self.__cloud)
         ).values
 
-    def encode(self, value):
+    def encode(self, value, codec: str = None):
         return self._communicate(
-            dawgie.pl.message.make(typ=self.__cloud, val=value)
+            dawgie.pl.message.make(rev=codec, typ=self.__cloud, val=value)
         ).values
 
     def move(self, fn: str, result: str):
+        if fn is None:
+            # encode() found the blob already there so there is nothing to move
+            return result, True
         return self._communicate(
             dawgie.pl.message.make(rev=fn, target=result, typ=self.__cloud)
         ).values
@@ -116,8 +119,9 @@ class Contractor(dawgie.pl.farm.Hand):
                 result = dawgie.db.util.move(msg.revision, msg.target)
             elif not msg.revision and msg.target and not msg.values:
                 result = dawgie.db.util.decode(msg.target)
-            elif not msg.revision and not msg.target and msg.values:
-                result = dawgie.db.util.encode(msg.values)
+            elif not msg.target and msg.values:
+                # the revision of an encode request is the codec
+                result = dawgie.db.util.encode(msg.values, msg.revision)
             else:
                 self.log.error('Unexpected message: %s', str(msg))
                 self.transport.loseConnection()
@@ -70,7 +70,11 @@ def _copy(references):
         fn, nn = dawgie.db.util.encode(vr.impl.sv_as_dict()[vr.item][vr.feat])
         nfn = os.path.join(args.output_dir, nn)
 
-        if not os.path.isfile(nfn):
+        if os.path.isfile(nfn):
+            pass
+        elif fn is None:
+            shutil.copy(dawgie.db.util.locate(nn), nfn)
+        else:
             shutil.move(fn, nfn)
         if args.private_database:
             vn = '.'.join(
@@ -85,7 +89,7 @@ def _copy(references):
                 if k.endswith(vn):
                     fn = args.private_database[k]
                     nfn = os.path.join(args.output_dir, fn)
-                    ofn = os.path.join(dawgie.context.data_dbs, fn)
+                    ofn = dawgie.db.util.locate(fn)
 
                     if os.path.isfile(ofn) and not os.path.isfile(nfn):
                         shutil.copy(ofn, nfn)
@@ -48,24 +48,30 @@ class MetricStateVector(dawgie.StateVector):
     def __init__(self, db: dawgie.METRIC, task: dawgie.METRIC):
         dawgie.StateVector.__init__(self)
         self.units = {
+            'hits': ' (blob)',
             'input': ' (block)',
             'memory': ' (Kbytes)',
+            'misses': ' (blob)',
             'output': ' (block)',
             'pages': ' (page)',
             'system': ' (s)',
             'user': ' (s)',
             'wall': ' (s)',
         }
-        self._version_ = dawgie.VERSION(1, 1, 1)
+        self._version_ = dawgie.VERSION(1, 2, 0)
+        self['db_hits'] = MetricValue(db.hits)
         self['db_input'] = MetricValue(db.input)
         self['db_memory'] = MetricValue(db.mem)
+        self['db_misses'] = MetricValue(db.misses)
         self['db_output'] = MetricValue(db.output)
         self['db_pages'] = MetricValue(db.pages)
         self['db_system'] = MetricValue(db.sys)
         self['db_user'] = MetricValue(db.user)
         self['db_wall'] = MetricValue(db.wall)
+        self['task_hits'] = MetricValue(task.hits)
         self['task_input'] = MetricValue(task.input)
         self['task_memory'] = MetricValue(task.mem)
+        self['task_misses'] = MetricValue(task.misses)
         self['task_output'] = MetricValue(task.output)
         self['task_pages'] = MetricValue(task.pages)
         self['task_system'] = MetricValue(task.sys)
@@ -130,8 +136,10 @@ class LazyMetricValue(MetricValue):
 def filled(value: int = 0) -> dawgie.METRIC:
     '''create and fill a dawgie.METRIC with given value'''
     return dawgie.METRIC(
+        hits=value,
         input=value,
         mem=value,
+        misses=value,
         output=value,
         pages=value,
         sys=value,
@@ -0,0 +1,143 @@
+'''Benchmark the compression codecs of the DB data store
+
+Writes and reads payloads shaped like the state vectors of an AE through
+dawgie.db.util.encode() and decode() with every available codec, then prints
+the throughput of each against its compression ratio. The throughput is the
+size of the plain pickle over the best wall clock time of the operation. The
+read of oob only maps the arrays, which are read from disk when used.
+
+usage:
+  PYTHONPATH=../../Python python3 codecs.py --size 8
+
+--
+COPYRIGHT:
+Copyright (c) 2015-2026, California Institute of Technology ("Caltech").
+U.S. Government sponsorship acknowledged.
+
+All rights reserved.
+
+LICENSE:
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+- Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+- Neither the name of Caltech nor its operating division, the Jet
+Propulsion Laboratory, nor the names of its contributors may be used to
+endorse or promote products derived from this software without specific prior
+written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+
+NTR:
+'''
+
+import argparse
+import dawgie.context
+import dawgie.db.util
+import dawgie.db.util.codec
+import numpy
+import os
+import pickle
+import shutil
+import tempfile
+import time
+
+
+def payloads(size: int) -> {str: object}:
+    '''values of about size MiB each'''
+    count = size * 2**20 // 8
+    rng = numpy.random.default_rng(42)
+    x = numpy.linspace(0, 100, count)
+    return {
+        # measurements: noisy low bits defeat most compression
+        'noise': rng.normal(size=count),
+        # models: smooth curves
+        'model': numpy.sin(x) * numpy.exp(-x / 50),
+        # detector counts: small integers in a wide type
+        'counts': rng.poisson(10, size=(count // 512, 512)).astype(numpy.int64),
+        # catalogs: plain python containers
+        'catalog': {
+            'names': [f'target_{i:07d}' for i in range(count // 16)],
+            'values': [float(i) / 3 for i in range(count // 16)],
+        },
+    }
+
+
+def measure(value, codec: str, repeat: int) -> (float, float, int):
+    '''best seconds to encode, best seconds to decode, and stored bytes'''
+    best_enc = best_dec = None
+    stored = 0
+    for _i in range(repeat):
+        start = time.perf_counter()
+        fn, name = dawgie.db.util.encode(value, codec)
+        dawgie.db.util.move(fn, name)
+        elapsed = time.perf_counter() - start
+        best_enc = elapsed if best_enc is None else min(best_enc, elapsed)
+        stored = os.path.getsize(dawgie.db.util.locate(name))
+        start = time.perf_counter()
+        dawgie.db.util.decode(name)
+        elapsed = time.perf_counter() - start
+        best_dec = elapsed if best_dec is None else min(best_dec, elapsed)
+        # so that the next encode writes it again rather than deduplicating
+        os.unlink(dawgie.db.util.locate(name))
+        pass
+    return best_enc, best_dec, stored
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description='throughput against compression ratio of the codecs'
+    )
+    ap.add_argument(
+        '--repeat',
+        default=3,
+        type=int,
+        help='take the best of this many writes and reads [%(default)s]',
+    )
+    ap.add_argument(
+        '--size',
+        default=8,
+        type=int,
+        help='the MiB of each payload [%(default)s]',
+    )
+    args = ap.parse_args()
+    root = tempfile.mkdtemp()
+    try:
+        dawgie.context.data_dbs = os.path.join(root, 'dbs')
+        dawgie.context.data_stg = os.path.join(root, 'stg')
+        os.mkdir(dawgie.context.data_dbs)
+        os.mkdir(dawgie.context.data_stg)
+        print('payload  codec   ratio  write MiB/s  read MiB/s')
+        for label, value in payloads(args.size).items():
+            plain = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL)) / 2**20
+            for codec in dawgie.db.util.codec.names():
+                enc, dec, stored = measure(value, codec, args.repeat)
+                print(
+                    f'{label:8s} {codec:6s} {plain * 2**20 / stored:6.2f}'
+                    f'  {plain / enc:11.1f}  {plain / dec:10.1f}'
+                )
+                pass
+            pass
+    finally:
+        shutil.rmtree(root, True)
+    return
+
+
+if __name__ == '__main__':
+    main()
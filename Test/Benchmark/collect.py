@@ -0,0 +1,177 @@
+'''Benchmark Aspect collection time against the number of targets
+
+Fills a scratch postgres database with one algorithm whose state vectors were
+written for N targets and then times the collection of an Aspect over them.
+The Prime rows are written directly with fabricated blob names because only
+the collection, not the decoding, is being measured.
+
+usage:
+  PYTHONPATH=../../Python python3 collect.py --context-db-impl=post \\
+      --context-db-name=scratch --targets 10 100 1000 5000
+
+--
+COPYRIGHT:
+Copyright (c) 2015-2026, California Institute of Technology ("Caltech").
+U.S. Government sponsorship acknowledged.
+
+All rights reserved.
+
+LICENSE:
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+- Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+- Neither the name of Caltech nor its operating division, the Jet
+Propulsion Laboratory, nor the names of its contributors may be used to
+endorse or promote products derived from this software without specific prior
+written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+
+NTR:
+'''
+
+# benchmarks peek at internals so pylint: disable=protected-access
+
+import argparse
+import dawgie
+import dawgie.context
+import dawgie.db
+import dawgie.db.post
+import dawgie.db.testdata
+import time
+
+
+def factory_for(tsk):
+    '''a stand-in factory whose task_name() is the name of tsk'''
+
+    def factory():
+        pass
+
+    factory.__module__ = '.'.join([dawgie.context.ae_base_package, tsk._name()])
+    return factory
+
+
+def populate(tsk, alg, count: int):
+    '''make sure count targets have every value of alg written'''
+    dawgie.db.update(tsk, alg, None, None, None)
+    for sv in alg.state_vectors():
+        for vn, v in sv.items():
+            dawgie.db.update(tsk, alg, sv, vn, v)
+    conn = dawgie.db.post._conn()
+    cur = dawgie.db.post._cur(conn)
+    cur.execute('SELECT count(*) FROM Target WHERE name LIKE %s;', ['bench_%'])
+    have = cur.fetchone()[0]
+    task_ID = dawgie.db.post._dim_ID(
+        cur, dawgie.db.post.cache.task(tsk._name())
+    )
+    alg_ID = dawgie.db.post._dim_ID(
+        cur,
+        dawgie.db.post.cache.algorithm(
+            alg.name(),
+            task_ID,
+            alg.design(),
+            alg.implementation(),
+            alg.bugfix(),
+        ),
+    )
+    rows = []
+    for index in range(have, count):
+        tn_ID = dawgie.db.post._new_ID(
+            cur, dawgie.db.post.cache.target(f'bench_{index:06d}')
+        )
+        for sv in alg.state_vectors():
+            sv_ID = dawgie.db.post._dim_ID(
+                cur,
+                dawgie.db.post.cache.statevector(
+                    sv.name(),
+                    alg_ID,
+                    sv.design(),
+                    sv.implementation(),
+                    sv.bugfix(),
+                ),
+            )
+            for vn, v in sv.items():
+                val_ID = dawgie.db.post._dim_ID(
+                    cur,
+                    dawgie.db.post.cache.value(
+                        vn, sv_ID, v.design(), v.implementation(), v.bugfix()
+                    ),
+                )
+                # a few older runs so there is history to skip over
+                rows.extend(
+                    (runid, task_ID, tn_ID, alg_ID, sv_ID, val_ID, 'bench')
+                    for runid in (1, 2, 3)
+                )
+    cur.close()
+    conn.close()
+    dawgie.db.post._insert_primes(rows, 'Benchmark populate')
+    return
+
+
+def measure(tsk, alg, repeat: int) -> float:
+    '''best wall clock time to collect the Aspect'''
+    refs = [
+        dawgie.SV_REF(factory_for(tsk), alg, sv) for sv in alg.state_vectors()
+    ]
+    best = None
+    for _i in range(repeat):
+        aspect = dawgie.db.gather(alg, tsk)
+        start = time.perf_counter()
+        aspect._collect(refs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        pass
+    return best, len(aspect)
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description='time Aspect collection against the number of targets'
+    )
+    ap.add_argument(
+        '--repeat',
+        default=3,
+        type=int,
+        help='take the best of this many collections [%(default)s]',
+    )
+    ap.add_argument(
+        '--targets',
+        default=[10, 100, 1000],
+        nargs='+',
+        type=int,
+        help='the target counts to measure [%(default)s]',
+    )
+    dawgie.context.add_arguments(ap)
+    args = ap.parse_args()
+    dawgie.context.override(args)
+    _tgt, tsk, alg = dawgie.db.testdata.DATASETS[0]
+    dawgie.db.open()
+    print('targets  seconds  collected')
+    for count in sorted(args.targets):
+        populate(tsk, alg, count)
+        elapsed, collected = measure(tsk, alg, args.repeat)
+        print(f'{count:7d}  {elapsed:7.3f}  {collected:9d}')
+        pass
+    dawgie.db.close()
+    return
+
+
+if __name__ == '__main__':
+    main()
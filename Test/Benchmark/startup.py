@@ -0,0 +1,158 @@
+'''Benchmark pipeline startup time against the size of the catalog
+
+The pipeline calls dawgie.db.versions() every time it loads to learn the
+version of every task, algorithm, state vector and value. Fills a scratch
+postgres database with a catalog of N values (10 tasks of 10 algorithms of
+10 state vectors each) and then times versions() over it.
+
+usage:
+  PYTHONPATH=../../Python python3 startup.py --context-db-impl=post \\
+      --context-db-name=scratch --values 20000 200000
+
+--
+COPYRIGHT:
+Copyright (c) 2015-2026, California Institute of Technology ("Caltech").
+U.S. Government sponsorship acknowledged.
+
+All rights reserved.
+
+LICENSE:
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+- Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+- Neither the name of Caltech nor its operating division, the Jet
+Propulsion Laboratory, nor the names of its contributors may be used to
+endorse or promote products derived from this software without specific prior
+written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+
+NTR:
+'''
+
+# benchmarks peek at internals so pylint: disable=protected-access
+
+import argparse
+import dawgie.context
+import dawgie.db
+import dawgie.db.post
+import time
+
+FANOUT = 10
+
+
+def _bulk(cur, table: str, parent: str, rows: [tuple]):
+    cur.execute(
+        f'INSERT INTO {table} (name, {parent}, design, implementation, '
+        + 'bugfix) SELECT n, p, 1, 0, 0 FROM unnest(%s::varchar[], '
+        + '%s::bigint[]) AS u(n, p) ON CONFLICT DO NOTHING;',
+        [[r[0] for r in rows], [r[1] for r in rows]],
+    )
+    cur.execute(
+        f'SELECT PK FROM {table} WHERE {parent} = ANY(%s) ORDER BY PK;',
+        [sorted({r[1] for r in rows})],
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+def populate(count: int):
+    '''make sure the catalog has at least count values'''
+    conn = dawgie.db.post._conn()
+    cur = dawgie.db.post._cur(conn)
+    tasks = []
+    for index in range(FANOUT):
+        cur.execute(
+            'INSERT INTO Task (name) VALUES (%s) ON CONFLICT DO NOTHING;',
+            [f'bench_task_{index:02d}'],
+        )
+        cur.execute(
+            'SELECT PK FROM Task WHERE name = %s;', [f'bench_task_{index:02d}']
+        )
+        tasks.append(cur.fetchone()[0])
+        pass
+    algs = _bulk(
+        cur,
+        'Algorithm',
+        'task_ID',
+        [(f'alg_{i:02d}', t) for t in tasks for i in range(FANOUT)],
+    )
+    svs = _bulk(
+        cur,
+        'StateVector',
+        'alg_ID',
+        [(f'sv_{i:02d}', a) for a in algs for i in range(FANOUT)],
+    )
+    per = max(1, count // len(svs))
+    _bulk(
+        cur,
+        'Value',
+        'sv_ID',
+        [(f'value_{i:06d}', sv) for sv in svs for i in range(per)],
+    )
+    cur.close()
+    conn.close()
+    return
+
+
+def measure(repeat: int) -> (float, int):
+    '''best wall clock time for versions() and the values it found'''
+    best = None
+    for _i in range(repeat):
+        start = time.perf_counter()
+        vers = dawgie.db.versions()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        pass
+    return best, sum(len(v) for v in vers[3].values())
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description='time dawgie.db.versions() against the catalog size'
+    )
+    ap.add_argument(
+        '--repeat',
+        default=3,
+        type=int,
+        help='take the best of this many calls [%(default)s]',
+    )
+    ap.add_argument(
+        '--values',
+        default=[2000, 20000, 200000],
+        nargs='+',
+        type=int,
+        help='the catalog sizes to measure [%(default)s]',
+    )
+    dawgie.context.add_arguments(ap)
+    args = ap.parse_args()
+    dawgie.context.override(args)
+    dawgie.db.open()
+    print(' values  seconds  versions')
+    for count in sorted(args.values):
+        populate(count)
+        elapsed, found = measure(args.repeat)
+        print(f'{count:7d}  {elapsed:7.3f}  {found:8d}')
+        pass
+    dawgie.db.close()
+    return
+
+
+if __name__ == '__main__':
+    main()
@@ -107,15 +107,16 @@ class PromotionEngine(unittest.TestCase):
         dawgie.context.db_impl = cls.db_impl
         return
 
-    def mock_consistent(
+    def mock_consistent_many(
         self,
         inputs: [dawgie.db.REF],
         outputs: [dawgie.db.REF],
-        target_name: str,
-    ) -> ():
+        target_names: [str],
+    ) -> {str: ()}:
+        self.assertListEqual(['a'], target_names)
         if self.mock_behavior[0]:  # return a valid juncture
-            return ((1, 2, 3, 4, 5), (6, 7, 8, 9, 0))
-        return ()
+            return {'a': ((1, 2, 3, 4, 5), (6, 7, 8, 9, 0))}
+        return {'a': ()}
 
     def mock_organize(self, task_names, runid=None, targets=None, event=None):
         self.assertListEqual(['b.f.g.h'], task_names)
@@ -133,12 +134,12 @@ class PromotionEngine(unittest.TestCase):
         return
 
     def mock_promote(self, juncture: (), runid: int):
-        self.assertTupleEqual(((1, 2, 3, 4, 5), (6, 7, 8, 9, 0)), juncture)
+        self.assertListEqual([(1, 2, 3, 4, 5), (6, 7, 8, 9, 0)], juncture)
         return self.mock_behavior[1]
 
     def setUp(self):
         self.mock_behavior = [False, False]
-        setattr(dawgie.db.test, 'consistent', self.mock_consistent)
+        setattr(dawgie.db.test, 'consistent_many', self.mock_consistent_many)
         setattr(dawgie.db.test, 'promote', self.mock_promote)
         return
 
@@ -278,9 +279,15 @@ class PromotionEngine(unittest.TestCase):
         self.promote.todo(
             NodeMock('a.b', [NodeMock('c.d')]),
             1,
-            values=[('a', True), ('b', False), ('c', True)],
+            values=[
+                ('1.t.a.b.c.a', True),
+                ('1.t.a.b.c.b', False),
+                ('1.u.a.b.c.b', False),
+                ('1.t.a.b.c.c', True),
+            ],
         )
         self.assertTrue(self.promote.more())
+        self.assertEqual({'t', 'u'}, {key[1] for key in self.promote._todo})
         self.promote.clear()
         self.assertFalse(self.promote.more())
         return
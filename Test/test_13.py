@@ -38,11 +38,15 @@ NTR:
 '''
 
 import dawgie
+import dawgie.db.gc
 import dawgie.db.shelve.enums
 import dawgie.db.shelve.state
 import dawgie.db.testdata
 import dawgie.context
+import json
 import os
+import pickle
+import psycopg
 import shutil
 import tempfile
 import unittest
@@ -97,6 +101,26 @@ class DB:
             len(values),
         )
 
+    def test__iter_prime_keys(self):
+        dawgie.db.close()
+        self.assertRaises(RuntimeError, list, dawgie.db._iter_prime_keys())
+        dawgie.db.open()
+        self.assertEqual(
+            sorted(dawgie.db._prime_keys()),
+            sorted(dawgie.db._iter_prime_keys()),
+        )
+        dawgie.db.close()
+
+    def test__iter_prime_values(self):
+        dawgie.db.close()
+        self.assertRaises(RuntimeError, list, dawgie.db._iter_prime_values())
+        dawgie.db.open()
+        self.assertEqual(
+            sorted(dawgie.db._prime_values()),
+            sorted(dawgie.db._iter_prime_values()),
+        )
+        dawgie.db.close()
+
     def test_add(self):
         dawgie.db.close()
         self.assertRaises(
@@ -108,6 +132,31 @@ class DB:
     def test_archive(self):
         self.assertTrue(True)  # not testable in a reasonable sense
 
+    def test_collect(self):
+        tgt, tsk, alg = dawgie.db.testdata.DATASETS[0]
+
+        def factory():
+            pass
+
+        factory.__module__ = '.'.join(
+            [dawgie.context.ae_base_package, tsk._name()]
+        )
+        dawgie.db.open()
+        aspect = dawgie.db.gather(alg, tsk)
+        aspect._collect([dawgie.SV_REF(factory, alg, sv) for sv in alg.sv])
+        self.assertEqual([tgt], list(aspect))
+        self.assertEqual(dawgie.db.testdata.SVN_CNT, len(aspect[tgt]))
+        for fsvn in aspect[tgt]:
+            self.assertEqual(dawgie.db.testdata.VAL_CNT, len(aspect[tgt][fsvn]))
+            for value in aspect[tgt][fsvn].values():
+                self.assertIsInstance(value, dawgie.Value)
+        aspect = dawgie.db.gather(alg, tsk)
+        aspect._collect([dawgie.V_REF(factory, alg, alg.sv[0], 'Value_01')])
+        fsvn = '.'.join([tsk._name(), alg.name(), alg.sv[0].name()])
+        self.assertEqual([fsvn], list(aspect[tgt]))
+        self.assertEqual(['Value_01'], list(aspect[tgt][fsvn]))
+        dawgie.db.close()
+
     def test_connect(self):
         tgt, tsk, alg = dawgie.db.testdata.DATASETS[0]
         dawgie.db.close()
@@ -193,6 +242,42 @@ class DB:
         self.assertEqual(0, len(asp))
         dawgie.db.close()
 
+    def test_gc(self):
+        dawgie.db.close()
+        self.assertRaises(RuntimeError, dawgie.db._referenced, ['a'])
+        dawgie.db.open()
+        kept = next(dawgie.db._iter_prime_values())
+        fn, garbage = dawgie.db.util.encode('no key references this')
+        dawgie.db.util.move(fn, garbage)
+        self.assertEqual({kept}, dawgie.db._referenced([garbage, kept]))
+        # only blobs older than the grace can be garbage
+        old = os.stat(dawgie.db.util.locate(kept)).st_mtime - 7200
+        for name in [garbage, kept]:
+            os.utime(dawgie.db.util.locate(name), (old, old))
+        report = dawgie.db.gc.sweep(dry=True, grace=3600)
+        self.assertIsNone(report['cursor'])
+        self.assertEqual((1, 1), (report['garbage'], report['referenced']))
+        self.assertTrue(dawgie.db.util.exists(garbage))
+        # touched by encode because it is in use again
+        self.assertEqual(
+            (None, garbage), dawgie.db.util.encode('no key references this')
+        )
+        self.assertEqual(0, dawgie.db.gc.sweep(dry=True, grace=3600)['garbage'])
+        os.utime(dawgie.db.util.locate(garbage), (old, old))
+        # resumed a blob at a time until the end of the store
+        report = dawgie.db.gc.sweep(batch=1, grace=3600, limit=1)
+        self.assertEqual(1, report['examined'])
+        garbage_count = report['garbage']
+        while report['cursor'] is not None:
+            report = dawgie.db.gc.sweep(
+                after=report['cursor'], grace=3600, limit=1
+            )
+            garbage_count += report['garbage']
+        self.assertEqual(1, garbage_count)
+        self.assertFalse(dawgie.db.util.exists(garbage))
+        self.assertTrue(dawgie.db.util.exists(kept))
+        dawgie.db.close()
+
     def test_metrics(self):
         dawgie.db.close()
         self.assertRaises(RuntimeError, dawgie.db.metrics)
@@ -202,16 +287,79 @@ class DB:
         self.assertEqual(-2, metrics[-1].sv['task_memory'].value())
         dawgie.db.close()
 
+    def test_iter_metrics(self):
+        dawgie.db.close()
+        self.assertRaises(RuntimeError, list, dawgie.db.iter_metrics())
+        dawgie.db.open()
+        streamed = list(dawgie.db.iter_metrics())
+        self.assertEqual(dawgie.db.testdata.TSK_CNT, len(streamed))
+        self.assertEqual(
+            [(m.run_id, m.target, m.task, m.alg_name) for m in streamed],
+            [
+                (m.run_id, m.target, m.task, m.alg_name)
+                for m in dawgie.db.metrics()
+            ],
+        )
+        dawgie.db.close()
+
     def test_next(self):
         dawgie.db.close()
         self.assertRaises(RuntimeError, dawgie.db.next)
         dawgie.db.open()
+        self.assertEqual(dawgie.db.testdata.RUNID, dawgie.db.last_runid())
         self.assertEqual(dawgie.db.testdata.RUNID + 1, dawgie.db.next())
+        # every call allocates a new run ID and records what triggered it
+        self.assertEqual(dawgie.db.testdata.RUNID + 2, dawgie.db.next('event'))
+        self.assertEqual(dawgie.db.testdata.RUNID + 2, dawgie.db.last_runid())
+        runs = dawgie.db.runs(dawgie.db.testdata.RUNID)
+        self.assertEqual(
+            [dawgie.db.testdata.RUNID + 1, dawgie.db.testdata.RUNID + 2],
+            [run.run_id for run in runs],
+        )
+        self.assertEqual([None, 'event'], [run.event for run in runs])
+        self.assertEqual(str(dawgie.context.git_rev), runs[-1].revision)
+        self.assertEqual(runs[-1:], dawgie.db.runs(runs[0].run_id))
         dawgie.db.close()
 
     def test_open(self):
         self.assertFalse(True)
 
+    def test_prefetch(self):
+        tgt, tsk, alg = dawgie.db.testdata.DATASETS[0]
+
+        def factory():
+            pass
+
+        factory.__module__ = '.'.join(
+            [dawgie.context.ae_base_package, tsk._name()]
+        )
+        refs = [dawgie.SV_REF(factory, alg, sv) for sv in alg.sv]
+        dawgie.db.open()
+        lazy = dawgie.db.gather(alg, tsk)
+        lazy._collect(refs)
+        expected = {
+            fsvn: {vn: pickle.dumps(v) for vn, v in lazy[tgt][fsvn].items()}
+            for fsvn in lazy[tgt]
+        }
+        aspect = dawgie.db.gather(alg, tsk)
+        aspect._collect(refs)
+        self.assertIs(aspect, aspect.prefetch())
+        for fsvn in expected:
+            for vn, value in aspect[tgt][fsvn].items():
+                self.assertEqual(expected[fsvn][vn], pickle.dumps(value))
+        fsvn = sorted(expected)[0]
+        workers = dawgie.context.db_prefetch_workers
+        for dawgie.context.db_prefetch_workers in [0, 2]:
+            aspect = dawgie.db.gather(alg, tsk)
+            aspect._collect(refs)
+            slc = aspect[tgt][fsvn].prefetch()
+            self.assertEqual(
+                expected[fsvn],
+                {vn: pickle.dumps(value) for vn, value in slc.items()},
+            )
+        dawgie.context.db_prefetch_workers = workers
+        dawgie.db.close()
+
     def test_promote(self):
         ins = []
         outs = []
@@ -422,6 +570,25 @@ class DB:
                 )
             ),
         )
+        params = Params(17, ['test'], ['Task_03'])
+        whole = search.find(params)
+        self.assertLess(2, whole.total)
+        items, token = [], None
+        while True:
+            page = search.find(params, limit=2, token=token)
+            self.assertEqual(whole.total, page.total)
+            self.assertGreaterEqual(2, len(page.items))
+            items.extend(page.items)
+            token = page.token
+            if token is None:
+                break
+            pass
+        self.assertEqual(whole.items, items)
+        first = search.find(params, limit=1)
+        self.assertRaises(
+            ValueError, search.find, Params(17, ['test']), 0, 1, first.token
+        )
+        self.assertRaises(ValueError, search.find, params, 0, 1, 'garbage')
 
     def test_targets(self):
         dawgie.db.close()
@@ -499,6 +666,31 @@ class DB:
         )
         dawgie.db.close()
 
+    def test_update_many(self):
+        tsk, alg = dawgie.db.testdata.KNOWNS[0][:2]
+        newer = dawgie.db.testdata.Fake(alg.name(), 99)
+        newer.sv = alg.sv
+        items = [(newer, sv, vn, sv[vn]) for sv in newer.sv for vn in sv]
+        dawgie.db.close()
+        self.assertRaises(RuntimeError, dawgie.db.update_many, tsk, items)
+        dawgie.db.open()
+        dawgie.db.update_many(tsk, items)
+        dawgie.db.update_many(tsk, items)
+        _tskv, algv, _svv, vv = dawgie.db.versions()
+        self.assertIn(
+            newer.asstring(), algv['.'.join([tsk._name(), alg.name()])]
+        )
+        self.assertEqual(
+            (
+                dawgie.db.testdata.TSK_CNT
+                * dawgie.db.testdata.ALG_CNT
+                * dawgie.db.testdata.SVN_CNT
+                * dawgie.db.testdata.VAL_CNT
+            ),
+            len(vv),
+        )
+        dawgie.db.close()
+
     def test_versions(self):
         dawgie.db.close()
         self.assertRaises(RuntimeError, dawgie.db.versions)
@@ -563,6 +755,123 @@ class Post(DB, unittest.TestCase):
     def tearDownClass(cls):
         shutil.rmtree(cls.root, True)
 
+    def test_backup(self):
+        backup = dawgie.db.post.backup
+        path = tempfile.mkdtemp()
+        rotate = dawgie.context.db_rotate
+        incremental = dawgie.context.db_archive_incremental
+        increment = backup.incremental
+        bfn = os.path.join(path, dawgie.context.db_name + '.{:02d}.bck')
+        scratch = os.path.join(
+            path, backup.SCRATCH.format(dawgie.context.db_name)
+        )
+
+        def finish(fn, **kwds):
+            with open(os.path.join(fn, backup.MANIFEST), 'wt') as file:
+                file.write(json.dumps(kwds))
+            return
+
+        def fail(*_args):
+            raise OSError('no room')
+
+        try:
+            dawgie.context.db_rotate = 4
+            dawgie.context.db_archive_incremental = 0
+            for _i in range(2):
+                self.assertIsNone(backup.latest(path))
+                os.mkdir(scratch)
+                self.assertIsNone(backup.manifest(scratch))
+                finish(scratch, after=None, increments=0, written=0)
+                self.assertEqual(bfn.format(0), backup.rotate(path, scratch))
+                pass
+            dawgie.context.db_archive_incremental = 5
+            self.assertEqual(0, backup.latest(path)['written'])
+            self.assertTrue(os.path.isdir(bfn.format(1)))
+            # the incremental archive of everything
+            dawgie.db.open()
+            conn = psycopg.connect(dawgie.db.post._uri())
+            self.assertTrue(backup.start(conn, path))
+            backup._state['thread'].join()
+            self.assertFalse(backup.busy())
+            archived = backup.manifest(bfn.format(0))
+            self.assertEqual(0, archived['after'])
+            self.assertEqual(1, archived['increments'])
+            self.assertEqual(dawgie.db.last_runid(), archived['runid'])
+            with open(os.path.join(bfn.format(0), 'Prime'), 'rt') as file:
+                self.assertEqual(len(dawgie.db._prime_keys()), len(list(file)))
+            for table in backup.TABLES:
+                self.assertTrue(
+                    os.path.isfile(os.path.join(bfn.format(0), table))
+                )
+            self.assertTrue(os.path.isdir(os.path.join(bfn.format(0), 'blobs')))
+            # retargeted rows keep an old run ID but are in the next increment
+            tgt, tsk, alg = dawgie.db.testdata.DATASETS[0]
+
+            def factory():
+                pass
+
+            factory.__module__ = '.'.join(
+                [dawgie.context.ae_base_package, tsk._name()]
+            )
+            dawgie.db.connect(alg, tsk, tgt)._retarget(
+                'retargeted', [dawgie.ALG_REF(factory, alg)]
+            )
+            conn = psycopg.connect(dawgie.db.post._uri())
+            self.assertTrue(backup.start(conn, path))
+            backup._state['thread'].join()
+            self.assertEqual(
+                archived['written'], backup.manifest(bfn.format(0))['after']
+            )
+            with psycopg.connect(dawgie.db.post._uri()) as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    'SELECT p.PK, p.run_ID, b.name FROM Prime p JOIN Target b '
+                    + 'ON b.PK = p.tn_ID WHERE b.name = %s;',
+                    ['retargeted'],
+                )
+                retargeted = cur.fetchall()
+            self.assertTrue(retargeted)
+            self.assertTrue(
+                all(run <= archived['runid'] for _pk, run, _name in retargeted)
+            )
+            with open(os.path.join(bfn.format(0), 'Prime'), 'rt') as file:
+                pks = {int(line.split('\t')[0]) for line in file}
+            self.assertEqual({pk for pk, _run, _name in retargeted}, pks)
+            with psycopg.connect(dawgie.db.post._uri()) as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    'SELECT PK FROM Target WHERE name = %s;', ['retargeted']
+                )
+                tn_ID = cur.fetchone()[0]
+                cur.execute('DELETE FROM Latest WHERE tn_ID = %s;', [tn_ID])
+                cur.execute('DELETE FROM Prime WHERE tn_ID = %s;', [tn_ID])
+                cur.execute('DELETE FROM Target WHERE PK = %s;', [tn_ID])
+            dawgie.db.post.cache.clear()
+            archived = backup.manifest(bfn.format(0))
+            archives = sorted(os.listdir(path))
+            # a failed archive leaves the archives before it alone
+            setattr(backup, 'incremental', fail)
+            conn = psycopg.connect(dawgie.db.post._uri())
+            self.assertTrue(backup.start(conn, path))
+            backup._state['thread'].join()
+            self.assertFalse(os.path.exists(scratch))
+            self.assertEqual(archived, backup.manifest(bfn.format(0)))
+            self.assertEqual(archives, sorted(os.listdir(path)))
+            # an archive from before the written column starts a full one
+            finish(bfn.format(0), after=None, increments=0, runid=0)
+            self.assertIsNone(backup.latest(path))
+            # a chain must not outgrow the rotation
+            finish(bfn.format(0), after=None, increments=2, written=0)
+            self.assertEqual(2, backup.latest(path)['increments'])
+            finish(bfn.format(0), after=None, increments=3, written=0)
+            self.assertIsNone(backup.latest(path))
+            dawgie.db.close()
+        finally:
+            setattr(backup, 'incremental', increment)
+            dawgie.context.db_archive_incremental = incremental
+            dawgie.context.db_rotate = rotate
+            shutil.rmtree(path, True)
+
     def test_close(self):
         dawgie.db.close()
         self.assertFalse(dawgie.db.post._db)
@@ -570,12 +879,87 @@ class Post(DB, unittest.TestCase):
         dawgie.db.close()
         self.assertFalse(dawgie.db.post._db)
 
+    def test_consistent_many(self):
+        def refs(datasets):
+            return [
+                dawgie.db.REF(
+                    dawgie.db.ID(tsk._name(), None),
+                    dawgie.db.ID(alg.name(), alg),
+                    dawgie.db.ID(sv.name(), sv),
+                    dawgie.db.ID(vn, v),
+                )
+                for _tn, tsk, alg in datasets
+                for sv in alg.sv
+                for vn, v in sv.items()
+            ]
+
+        ins = refs(dawgie.db.testdata.DATASETS[:2])
+        outs = refs(dawgie.db.testdata.DATASETS[2:3])
+        dawgie.db.open()
+        tns = dawgie.db.targets()
+        junctures = dawgie.db.consistent_many(ins, outs, tns)
+        self.assertEqual(set(tns), set(junctures))
+        for tn in tns:
+            self.assertEqual(dawgie.db.consistent(ins, outs, tn), junctures[tn])
+        self.assertTrue(junctures[dawgie.db.testdata.TARGET])
+        self.assertRaises(
+            RuntimeError, dawgie.db.consistent_many, ins, outs, ['unknown']
+        )
+        dawgie.db.close()
+
     def test_copy(self):
         self.assertRaises(NotImplementedError, dawgie.db.copy, 1, 2, 3)
 
+    def test_latest(self):
+        dawgie.db.open()
+        conn = dawgie.db.post._conn()
+        cur = dawgie.db.post._cur(conn)
+        cur.execute(
+            'SELECT tn_ID, task_ID, alg_ID, sv_ID, MAX(run_ID) FROM Prime '
+            + 'GROUP BY tn_ID, task_ID, alg_ID, sv_ID;'
+        )
+        expected = set(cur.fetchall())
+        self.assertTrue(expected)
+        cur.execute('SELECT tn_ID, task_ID, alg_ID, sv_ID, run_ID FROM Latest;')
+        self.assertEqual(expected, set(cur.fetchall()))
+        # backfilled when migrating an existing database
+        cur.execute('DELETE FROM Latest;')
+        cur.execute('DELETE FROM SchemaVersion WHERE version > 1;')
+        dawgie.db.post.schema.migrate(cur)
+        cur.execute('SELECT tn_ID, task_ID, alg_ID, sv_ID, run_ID FROM Latest;')
+        self.assertEqual(expected, set(cur.fetchall()))
+        cur.close()
+        conn.close()
+        dawgie.db.close()
+
     def test_locks(self):
         self.assertTrue(True)  # locks not used in postgres
 
+    def test_new_IDs(self):
+        dawgie.db.open()
+        conn = dawgie.db.post._conn()
+        cur = dawgie.db.post._cur(conn)
+        cur.execute(
+            'SELECT name,sv_ID,design,implementation,bugfix FROM Value;'
+        )
+        old = [dawgie.db.post.cache.value(*row) for row in cur.fetchall()[:3]]
+        new = [
+            dawgie.db.post.cache.value(f'bulk_{i}', old[0][2], 1, 2, 3)
+            for i in range(3)
+        ]
+        dawgie.db.post.cache.clear()
+        pks = dawgie.db.post._new_IDs(old + new + new[:1])
+        self.assertEqual(6, len(pks))
+        for key in old + new:
+            self.assertEqual(dawgie.db.post._dim_ID(cur, key), pks[key])
+        dawgie.db.post.cache.clear()
+        self.assertEqual(pks, dawgie.db.post._new_IDs(old + new))
+        cur.execute('DELETE FROM Value WHERE name LIKE %s;', ['bulk_%'])
+        dawgie.db.post.cache.clear()
+        cur.close()
+        conn.close()
+        dawgie.db.close()
+
     def test_open(self):
         dawgie.db.close()
         self.assertFalse(dawgie.db.post._db)
@@ -584,6 +968,83 @@ class Post(DB, unittest.TestCase):
         dawgie.db.close()
         self.assertFalse(dawgie.db.post._db)
 
+    def test_partition(self):
+        partition = dawgie.db.post.partition
+        name = dawgie.context.db_name
+        conn = dawgie.db.post._conn()
+        conn.execute('DROP DATABASE IF EXISTS testspace_partition;')
+        conn.execute('CREATE DATABASE testspace_partition;')
+        conn.close()
+        dawgie.context.db_name = 'testspace_partition'
+        try:
+            DB.setup()
+            dawgie.db.open()
+            keys = dawgie.db._prime_keys()
+            conn = dawgie.db.post._conn()
+            cur = dawgie.db.post._cur(conn)
+            self.assertFalse(partition.is_partitioned(cur))
+            dawgie.context.db_partition_size = 10
+            # converted in place when opened
+            dawgie.db.close()
+            dawgie.db.open()
+            lo = dawgie.db.testdata.RUNID - dawgie.db.testdata.RUNID % 10 + 10
+            self.assertEqual(
+                {'prime_default': (None, None), 'prime_legacy': (None, lo)},
+                {bound[0]: bound[1:] for bound in partition.bounds(cur)},
+            )
+            # extended as run IDs are allocated
+            while dawgie.db.next() < lo:
+                pass
+            dawgie.context.db_partition_size = 0
+            self.assertTrue(partition.is_partitioned(cur))
+            self.assertFalse(partition.convert(cur, 10))
+            self.assertEqual(keys, dawgie.db._prime_keys())
+            self.assertEqual(
+                (lo, lo + 10),
+                dict((b[0], b[1:]) for b in partition.bounds(cur))[
+                    f'prime_{lo}_{lo + 10}'
+                ],
+            )
+            # a run ID range only scans its own partition
+            cur.execute(
+                'EXPLAIN SELECT * FROM Prime WHERE run_ID >= %s AND '
+                + 'run_ID < %s;',
+                [lo, lo + 10],
+            )
+            plan = '\n'.join(row[0] for row in cur)
+            self.assertIn(f'prime_{lo}_{lo + 10}', plan)
+            self.assertNotIn('prime_legacy', plan)
+            # written to the partition of its run ID
+            cur.execute(
+                'SELECT task_ID, tn_ID, alg_ID, sv_ID, val_ID, blob_name '
+                + 'FROM Prime WHERE run_ID = 0 LIMIT 1;'
+            )
+            row = cur.fetchone()
+            dawgie.db.post._insert_primes([(0, *row), (lo, *row)], 'test')
+            cur.execute(f'SELECT run_ID FROM prime_{lo}_{lo + 10};')
+            self.assertEqual([(lo,)], cur.fetchall())
+            # old partitions come off on their own
+            self.assertRaises(
+                ValueError, partition.archive, cur, 'prime_legacy'
+            )
+            partition.detach(cur, 'prime_legacy')
+            self.assertNotIn(
+                'prime_legacy', {b[0] for b in partition.bounds(cur)}
+            )
+            self.assertEqual(1, len(dawgie.db._prime_keys()))
+            cur.execute('SELECT * FROM Latest;')
+            self.assertEqual({(row[1], row[0], *row[2:4], lo)}, set(cur))
+            self.assertRaises(ValueError, partition.detach, cur, 'prime_legacy')
+            cur.close()
+            conn.close()
+        finally:
+            dawgie.context.db_name = name
+            dawgie.context.db_partition_size = 0
+            dawgie.db.close()
+        conn = dawgie.db.post._conn()
+        conn.execute('DROP DATABASE testspace_partition WITH (FORCE);')
+        conn.close()
+
     def test_reopen(self):
         dawgie.db.close()
         self.assertFalse(dawgie.db.post._db)
@@ -592,6 +1053,157 @@ class Post(DB, unittest.TestCase):
         dawgie.db.close()
         self.assertFalse(dawgie.db.post._db)
 
+    def test_schema(self):
+        dawgie.db.open()
+        conn = dawgie.db.post._conn()
+        cur = dawgie.db.post._cur(conn)
+        version = len(dawgie.db.post.schema.MIGRATIONS)
+        self.assertEqual(version, dawgie.db.post.schema._version(cur))
+        # upgrade in place
+        cur.execute('DROP INDEX prime_blob_name_idx;')
+        cur.execute('DELETE FROM SchemaVersion;')
+        self.assertEqual(version, dawgie.db.post.schema.migrate(cur))
+        # a failed migration is raised and leaves the lock free
+        migrations = dawgie.db.post.schema.MIGRATIONS
+        try:
+            dawgie.db.post.schema.MIGRATIONS = migrations + [['NOT SQL;']]
+            self.assertRaises(psycopg.Error, dawgie.db.post.schema.migrate, cur)
+        finally:
+            dawgie.db.post.schema.MIGRATIONS = migrations
+        self.assertEqual(version, dawgie.db.post.schema._version(cur))
+        cur.execute(
+            'SELECT pg_try_advisory_lock(%s);', [dawgie.db.post.schema.LOCK]
+        )
+        self.assertTrue(cur.fetchone()[0])
+        cur.execute(
+            'SELECT pg_advisory_unlock(%s);', [dawgie.db.post.schema.LOCK]
+        )
+        # make sure the hot predicates use the indexes
+        cur.execute('SET enable_seqscan = off;')
+        for index, query, args in [
+            (
+                'prime_latest_idx',
+                'SELECT MAX(run_ID) FROM Prime WHERE tn_ID = %s AND '
+                + 'task_ID = %s AND alg_ID = %s AND sv_ID = %s;',
+                [1, 1, 1, 1],
+            ),
+            (
+                'prime_sv_idx',
+                'SELECT * FROM Prime WHERE sv_ID = ANY(%s) AND '
+                + '(run_ID > %s OR run_ID = %s);',
+                [[1, 2], 1, 0],
+            ),
+            (
+                'prime_blob_name_idx',
+                'SELECT DISTINCT blob_name FROM Prime WHERE '
+                + 'blob_name = ANY(%s);',
+                [['a', 'b']],
+            ),
+        ]:
+            cur.execute('EXPLAIN ' + query, args)
+            self.assertIn(index, '\n'.join(row[0] for row in cur))
+        cur.execute('RESET enable_seqscan;')
+        cur.close()
+        conn.close()
+        dawgie.db.close()
+
+    def test_stream(self):
+        dawgie.db.open()
+        fetch_size = dawgie.context.db_fetch_size
+        dawgie.context.db_fetch_size = 7
+        try:
+            keys = list(dawgie.db._iter_prime_keys())
+        finally:
+            dawgie.context.db_fetch_size = fetch_size
+        self.assertEqual(sorted(set(keys)), keys)
+        # an abandoned stream gives its connection back to the pool
+        available = dawgie.db.stats()['pool']['pool_available']
+        stream = dawgie.db._iter_prime_values()
+        self.assertTrue(next(stream))
+        stream.close()
+        self.assertEqual(available, dawgie.db.stats()['pool']['pool_available'])
+        self.assertEqual(keys, dawgie.db._prime_keys())
+        dawgie.db.close()
+
+    def test_stats(self):
+        dawgie.db.open()
+        checkouts = dawgie.db.stats()['pool']['requests_num']
+        dawgie.db.targets()
+        dawgie.db.targets()
+        self.assertEqual(
+            checkouts + 2, dawgie.db.stats()['pool']['requests_num']
+        )
+        self.assertIn('requests_wait_ms', dawgie.db.stats()['pool'])
+        dawgie.db.close()
+
+    def test_search_cache(self):
+        dawgie.db.open()
+        params = Params(17, ['test'], ['Task_03'])
+        search = dawgie.db.search()
+        search.find(params)
+        hits = dawgie.db.stats()['search']['hits']
+        search.find(params)
+        self.assertLess(hits, dawgie.db.stats()['search']['hits'])
+        self.assertLess(0, dawgie.db.stats()['search']['size'])
+        dawgie.db.next()
+        self.assertEqual(0, dawgie.db.stats()['search']['size'])
+        # a facet is one checkout and then none until invalidated
+        params = Params(17, ['test'], ['Task_03'], [])
+        checkouts = dawgie.db.stats()['pool']['requests_num']
+        algs = search.facet(params)
+        self.assertEqual(
+            checkouts + 1, dawgie.db.stats()['pool']['requests_num']
+        )
+        self.assertEqual(algs, search.facet(params))
+        self.assertEqual(
+            checkouts + 1, dawgie.db.stats()['pool']['requests_num']
+        )
+        dawgie.db.close()
+
+    def test_statements(self):
+        dawgie.db.open()
+        before = dawgie.db.stats()['statements']
+        calls = before.get('targets', {}).get('calls', 0)
+        rows = before.get('targets', {}).get('rows', 0)
+        names = dawgie.db.targets(fulllist=True)
+        after = dawgie.db.stats()['statements']
+        self.assertEqual(calls + 1, after['targets']['calls'])
+        self.assertEqual(rows + len(names), after['targets']['rows'])
+        self.assertLessEqual(0, after['targets']['seconds'])
+        list(dawgie.db._iter_prime_values())
+        self.assertIn('prime_values', dawgie.db.stats()['statements'])
+        # prepared on the connection that executed it
+        conn = dawgie.db.post._conn()
+        cur = dawgie.db.post._cur(conn)
+        dawgie.db.post.statements.execute(cur, 'targets')
+        cur.execute(
+            'SELECT count(*) FROM pg_prepared_statements WHERE statement = %s;',
+            [dawgie.db.post.statements.sql('targets')],
+        )
+        self.assertEqual(1, cur.fetchone()[0])
+        cur.close()
+        conn.close()
+        dawgie.db.close()
+
+    def test_warm(self):
+        cache = dawgie.db.post.cache
+        bogus = cache.task('not a task')
+        dawgie.db.close()
+        dawgie.db.open()
+        cache.store(bogus, -1)
+        dawgie.db.close()
+        dawgie.db.open()
+        # the same database is not warmed again
+        self.assertEqual(-1, cache.fetch(bogus))
+        dawgie.db.close()
+        # as though it was dropped and created again at the same URI
+        uri, oid = cache._state['source']
+        cache._state['source'] = (uri, oid + 1)
+        dawgie.db.open()
+        self.assertIsNone(cache.fetch(bogus))
+        self.assertEqual((uri, oid), cache._state['source'])
+        dawgie.db.close()
+
 
 class Shelve(DB, unittest.TestCase):
     @classmethod
@@ -641,6 +1253,11 @@ class Shelve(DB, unittest.TestCase):
     def test_consistent(self):
         self.assertRaises(NotImplementedError, dawgie.db.consistent, [], [], '')
 
+    def test_consistent_many(self):
+        self.assertRaises(
+            NotImplementedError, dawgie.db.consistent_many, [], [], []
+        )
+
     def test_copy(self):
         super().test_copy()
         root = os.path.join(self.root, 'connector')
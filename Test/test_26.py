@@ -0,0 +1,85 @@
+'''
+
+COPYRIGHT:
+Copyright (c) 2015-2026, California Institute of Technology ("Caltech").
+U.S. Government sponsorship acknowledged.
+
+All rights reserved.
+
+LICENSE:
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+- Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+- Neither the name of Caltech nor its operating division, the Jet
+Propulsion Laboratory, nor the names of its contributors may be used to
+endorse or promote products derived from this software without specific prior
+written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+
+NTR:
+'''
+
+import dawgie.context
+import dawgie.db.post.cache
+import unittest
+
+
+class Cache(unittest.TestCase):
+    def setUp(self):
+        self.size = dawgie.context.db_cache_size
+        dawgie.db.post.cache.clear()
+
+    def tearDown(self):
+        dawgie.context.db_cache_size = self.size
+        dawgie.db.post.cache.clear()
+
+    def test_disabled(self):
+        dawgie.context.db_cache_size = 0
+        dawgie.db.post.cache.store(dawgie.db.post.cache.task('a'), 1)
+        self.assertIsNone(
+            dawgie.db.post.cache.fetch(dawgie.db.post.cache.task('a'))
+        )
+
+    def test_keys(self):
+        self.assertNotEqual(
+            dawgie.db.post.cache.algorithm('a', 1, 1, 2, 3),
+            dawgie.db.post.cache.statevector('a', 1, 1, 2, 3),
+        )
+        self.assertNotEqual(
+            dawgie.db.post.cache.target('a'), dawgie.db.post.cache.task('a')
+        )
+
+    def test_lru(self):
+        dawgie.context.db_cache_size = 2
+        a = dawgie.db.post.cache.value('a', 1, 0, 0, 0)
+        b = dawgie.db.post.cache.value('b', 1, 0, 0, 0)
+        c = dawgie.db.post.cache.value('c', 1, 0, 0, 0)
+        dawgie.db.post.cache.store(a, 1)
+        dawgie.db.post.cache.store(b, 2)
+        self.assertEqual(1, dawgie.db.post.cache.fetch(a))
+        dawgie.db.post.cache.store(c, 3)
+        self.assertEqual(1, dawgie.db.post.cache.fetch(a))
+        self.assertIsNone(dawgie.db.post.cache.fetch(b))
+        self.assertEqual(3, dawgie.db.post.cache.fetch(c))
+        stats = dawgie.db.post.cache.stats()
+        self.assertEqual(3, stats['hits'])
+        self.assertEqual(1, stats['misses'])
+        self.assertEqual(2, stats['size'])
@@ -0,0 +1,342 @@
+'''the helpers of dawgie.db.util that every database implementation shares
+
+--
+COPYRIGHT:
+Copyright (c) 2015-2026, California Institute of Technology ("Caltech").
+U.S. Government sponsorship acknowledged.
+
+All rights reserved.
+
+LICENSE:
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+- Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+- Neither the name of Caltech nor its operating division, the Jet
+Propulsion Laboratory, nor the names of its contributors may be used to
+endorse or promote products derived from this software without specific prior
+written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+
+NTR:
+'''
+
+import dawgie.base
+import dawgie.context
+import dawgie.db.util
+import dawgie.db.util.codec
+import hashlib
+import numpy
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+class _Drift:
+    '''pickles differently every time it is pickled'''
+
+    count = [0]
+
+    def __reduce__(self):
+        _Drift.count[0] += 1
+        return (_Drift, (), {'stamp': _Drift.count[0]})
+
+    pass
+
+
+class Util(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.root = tempfile.mkdtemp()
+        cls.dbs = dawgie.context.data_dbs
+        cls.stg = dawgie.context.data_stg
+        dawgie.context.data_dbs = os.path.join(cls.root, 'dbs')
+        dawgie.context.data_stg = os.path.join(cls.root, 'stg')
+        os.mkdir(dawgie.context.data_dbs)
+        os.mkdir(dawgie.context.data_stg)
+
+        os.mkdir(os.path.join(cls.root, 'log'))
+
+    @classmethod
+    def tearDownClass(cls):
+        dawgie.context.data_dbs = cls.dbs
+        dawgie.context.data_stg = cls.stg
+        shutil.rmtree(cls.root, True)
+
+    def test_decode_cache(self):
+        capacity = dawgie.context.data_dbs_cache
+        values = [list(range(i, i + 1000)) for i in [5000, 6000, 7000]]
+        names = []
+        for value in values:
+            fn, name = dawgie.db.util.encode(value, 'zlib')
+            dawgie.db.util.move(fn, name)
+            names.append(name)
+            pass
+        try:
+            dawgie.db.util.clear()
+            dawgie.db.util.decode(names[0]).append('changed')
+            # a hit is unpickled again so every caller gets its own value
+            self.assertEqual(values[0], dawgie.db.util.decode(names[0]))
+            stats = dawgie.db.util.stats()
+            self.assertEqual(
+                (1, 1, 1), tuple(stats[k] for k in ['count', 'hits', 'misses'])
+            )
+            # the least recently used are dropped to stay within capacity
+            dawgie.context.data_dbs_cache = stats['size'] + 10
+            self.assertEqual(values[1], dawgie.db.util.decode(names[1]))
+            self.assertEqual(values[1], dawgie.db.util.decode(names[1]))
+            self.assertEqual(values[0], dawgie.db.util.decode(names[0]))
+            stats = dawgie.db.util.stats()
+            self.assertEqual(
+                (1, 2, 3), tuple(stats[k] for k in ['count', 'hits', 'misses'])
+            )
+            # nothing is kept when there is no room for it
+            dawgie.context.data_dbs_cache = 0
+            dawgie.db.util.clear()
+            self.assertEqual(values[2], dawgie.db.util.decode(names[2]))
+            self.assertEqual(values[2], dawgie.db.util.decode(names[2]))
+            stats = dawgie.db.util.stats()
+            self.assertEqual(
+                (0, 0, 2, 0),
+                tuple(stats[k] for k in ['count', 'hits', 'misses', 'size']),
+            )
+        finally:
+            dawgie.context.data_dbs_cache = capacity
+            dawgie.db.util.clear()
+
+    def test_decode_metric(self):
+        fn, name = dawgie.db.util.encode('measured')
+        dawgie.db.util.move(fn, name)
+        dawgie.db.util.clear()
+        metric = dawgie.base._Metric()  # pylint: disable=protected-access
+        for _ in range(3):
+            metric.measure(dawgie.db.util.decode, (name,))
+            pass
+        self.assertEqual((2, 1), (metric.sum().hits, metric.sum().misses))
+        dawgie.db.util.clear()
+
+    def test_encode(self):
+        value = {'a': list(range(10000)), 'b': 'text' * 1000}
+        fn, name = dawgie.db.util.encode(value)
+        # same name as the md5sum and sha1sum of the pickle
+        expected = '_'.join(
+            subprocess.check_output([cmd, '-b', fn]).decode().split()[0]
+            for cmd in ['md5sum', 'sha1sum']
+        )
+        self.assertEqual(expected, name)
+        self.assertEqual((name, False), dawgie.db.util.move(fn, name))
+        self.assertEqual(value, dawgie.db.util.decode(name))
+        # nothing is written when the blob already exists but it is touched
+        os.utime(dawgie.db.util.locate(name), (0, 0))
+        staged = os.listdir(dawgie.context.data_stg)
+        self.assertEqual((None, name), dawgie.db.util.encode(value))
+        self.assertEqual(staged, os.listdir(dawgie.context.data_stg))
+        self.assertLess(0, os.stat(dawgie.db.util.locate(name)).st_mtime)
+        self.assertEqual((name, True), dawgie.db.util.move(None, name))
+
+    def test_blobs(self):
+        dbs = dawgie.context.data_dbs
+        try:
+            dawgie.context.data_dbs = os.path.join(self.root, 'blobs')
+            # a flat store part way through being sharded
+            names = ['ab01', 'ab02', 'ab03', 'ac01', 'ff00']
+            for name, where in zip(names, ['ab', '', 'ab', 'ac', '']):
+                os.makedirs(
+                    os.path.join(dawgie.context.data_dbs, where), exist_ok=True
+                )
+                with open(
+                    os.path.join(dawgie.context.data_dbs, where, name), 'wb'
+                ):
+                    pass
+            os.mkdir(os.path.join(dawgie.context.data_dbs, 'chronicles'))
+            self.assertEqual(
+                names, [name for name, _ in dawgie.db.util.blobs()]
+            )
+            self.assertEqual(
+                names[2:], [name for name, _ in dawgie.db.util.blobs('ab02')]
+            )
+            self.assertEqual(
+                os.path.join(dawgie.context.data_dbs, 'ab', 'ab03'),
+                dict(dawgie.db.util.blobs('ab02'))['ab03'],
+            )
+        finally:
+            dawgie.context.data_dbs = dbs
+
+    def test_codec(self):
+        value = {'a': list(range(10000)), 'b': 'text' * 1000}
+        names = set()
+        for codec in dawgie.db.util.codec.names():
+            fn, name = dawgie.db.util.encode(value, codec)
+            names.add(name)
+            with open(fn, 'rb') as file:
+                head = file.read(len(dawgie.db.util.codec.MAGIC))
+            self.assertEqual(
+                codec != 'none', head == dawgie.db.util.codec.MAGIC
+            )
+            with open(fn, 'rb') as file:
+                self.assertEqual(value, dawgie.db.util.codec.load(file))
+            os.unlink(fn)
+            pass
+        # the name is of the value and not how it is stored
+        self.assertEqual(1, len(names))
+        self.assertRaises(ValueError, dawgie.db.util.encode, value, 'bogus')
+
+    def test_encode_buffer(self):
+        # large buffers like those of numpy arrays are written by reference
+        data = bytearray(os.urandom(2**18))
+        fn, name = dawgie.db.util.encode(pickle.PickleBuffer(data), 'zlib')
+        self.assertEqual((name, False), dawgie.db.util.move(fn, name))
+        self.assertEqual(data, dawgie.db.util.decode(name))
+
+    def test_encode_large(self):
+        spool = dawgie.db.util.SPOOL
+        value = list(range(1000))
+        try:
+            dawgie.db.util.SPOOL = 64
+            fn, name = dawgie.db.util.encode(value)
+            zfn, zname = dawgie.db.util.encode(value, 'zlib')
+        finally:
+            dawgie.db.util.SPOOL = spool
+        small, same = dawgie.db.util.encode(value)
+        self.assertEqual(name, same)
+        self.assertEqual(name, zname)
+        with open(zfn, 'rb') as file:
+            self.assertEqual(
+                value, pickle.load(dawgie.db.util.codec.reader(file))
+            )
+        os.unlink(zfn)
+        with open(fn, 'rb') as large, open(small, 'rb') as spooled:
+            self.assertEqual(spooled.read(), large.read())
+        os.unlink(small)
+        self.assertEqual((name, False), dawgie.db.util.move(fn, name))
+        self.assertEqual(value, dawgie.db.util.decode(name))
+
+    def test_encode_once(self):
+        spool = dawgie.db.util.SPOOL
+        value = [_Drift() for _i in range(50)]
+        staged = sorted(os.listdir(dawgie.context.data_stg))
+        try:
+            dawgie.db.util.SPOOL = 64
+            for codec in ['none', 'zlib', 'oob']:
+                _Drift.count[0] = 0
+                fn, name = dawgie.db.util.encode(value, codec)
+                with open(fn, 'rb') as file:
+                    result = dawgie.db.util.codec.load(file)
+                if codec == 'oob':
+                    # written from the value its digested pickle loads to
+                    self.assertEqual(100, _Drift.count[0])
+                    self.assertEqual(50, len(result))
+                else:
+                    # the blob holds the one pickle of value that was digested
+                    self.assertEqual(50, _Drift.count[0])
+                    self.assertEqual(
+                        list(range(1, 51)), [d.stamp for d in result]
+                    )
+                    with open(fn, 'rb') as file:
+                        data = dawgie.db.util.codec.reader(file).read()
+                    digest = [hashlib.md5(data), hashlib.sha1(data)]
+                    self.assertEqual(
+                        name, '_'.join(d.hexdigest() for d in digest)
+                    )
+                    pass
+                os.unlink(fn)
+                pass
+            # the spilled pickle is removed when the blob already exists
+            value = list(range(-1000, 0))
+            fn, name = dawgie.db.util.encode(value)
+            dawgie.db.util.move(fn, name)
+            self.assertEqual((None, name), dawgie.db.util.encode(value))
+        finally:
+            dawgie.db.util.SPOOL = spool
+        self.assertEqual(staged, sorted(os.listdir(dawgie.context.data_stg)))
+
+    def test_oob(self):
+        big = numpy.arange(2**17, dtype=numpy.float64).reshape(2**9, 2**8)
+        value = {'big': big, 'fortran': numpy.asfortranarray(big), 'small': 1}
+        fn, name = dawgie.db.util.encode(value, 'oob')
+        dawgie.db.util.move(fn, name)
+        self.assertEqual((None, name), dawgie.db.util.encode(value))
+        result = dawgie.db.util.decode(name)
+        self.assertEqual(1, result['small'])
+        for key in ['big', 'fortran']:
+            numpy.testing.assert_array_equal(big, result[key])
+            # a view of the mapped blob rather than a copy
+            self.assertFalse(result[key].flags.writeable)
+            self.assertFalse(result[key].flags.owndata)
+            pass
+        self.assertTrue(result['fortran'].flags.f_contiguous)
+        # mapping is cheap so mapped blobs are not kept
+        dawgie.db.util.decode(name)
+        self.assertNotIn(name, dawgie.db.util._lru)
+
+    def test_shard(self):
+        levels = dawgie.context.data_dbs_levels
+        try:
+            value = 'flat'
+            fn, name = dawgie.db.util.encode(value)
+            dawgie.db.util.move(fn, name)
+            flat = os.path.join(dawgie.context.data_dbs, name)
+            self.assertEqual(flat, dawgie.db.util.locate(name))
+            dawgie.context.data_dbs_levels = 2
+            sharded = os.path.join(
+                dawgie.context.data_dbs, name[:2], name[2:4], name
+            )
+            self.assertEqual(sharded, dawgie.db.util.shard(name))
+            # a flat blob is still found after sharding is turned on
+            self.assertTrue(os.path.isfile(flat))
+            self.assertEqual(flat, dawgie.db.util.locate(name))
+            self.assertEqual(value, dawgie.db.util.decode(name))
+            self.assertEqual((None, name), dawgie.db.util.encode(value))
+            # new blobs go into the shards
+            fn, other = dawgie.db.util.encode('sharded')
+            self.assertEqual((other, False), dawgie.db.util.move(fn, other))
+            self.assertTrue(os.path.isfile(dawgie.db.util.shard(other)))
+            os.mkdir(os.path.join(dawgie.context.data_dbs, 'chronicles'))
+            found = dict(dawgie.db.util.blobs())
+            self.assertEqual(flat, found[name])
+            self.assertEqual(dawgie.db.util.shard(other), found[other])
+            subprocess.run(
+                [
+                    sys.executable,
+                    '-m',
+                    'dawgie.db.tools.shard',
+                    '--context-data-dbs',
+                    dawgie.context.data_dbs,
+                    '--context-data-dbs-levels',
+                    '2',
+                    '--context-data-log',
+                    os.path.join(self.root, 'log'),
+                ],
+                check=True,
+                env=dict(
+                    os.environ,
+                    DAWGIE_DOCKERIZED_AE_GIT_REVISION='test',
+                    PYTHONPATH=os.pathsep.join(sys.path),
+                ),
+            )
+            self.assertFalse(os.path.exists(flat))
+            self.assertEqual(sharded, dawgie.db.util.locate(name))
+            self.assertEqual(value, dawgie.db.util.decode(name))
+        finally:
+            dawgie.context.data_dbs_levels = levels